@@ -0,0 +1 @@
+"""Benchmark suite based on reproducible synthetic source trees"""
@@ -0,0 +1,8 @@
+import sys
+
+from benchmarks.main import main
+
+
+if __name__ == '__main__':
+    sys.argv[0] = 'benchmarks'
+    sys.exit(main())
@@ -0,0 +1,1053 @@
+"""Benchmark runner
+
+Each benchmark builds wheel from synthetic tree (see `benchmarks.trees`)
+in new Python process, using one of targets:
+
+    * ``api`` - `mkwhl.create_wheel`
+    * ``cli`` - ``python -m mkwhl``
+    * ``stream`` - ``python -m mkwhl --output -`` with stdout redirected to
+      file
+    * ``backend`` - PEP517 hooks as called by build frontend
+    * ``incremental`` - ``python -m mkwhl --incremental`` after single
+      source file is modified (initial build is not measured)
+    * ``reuse`` - ``python -m mkwhl --lock`` after identical build
+      (initial build is not measured)
+    * ``sdist`` - PEP517 ``build_sdist`` hook (source distribution is
+      built instead of wheel)
+
+Measured wall time includes interpreter startup. Peak RSS is maximum
+resident set size of build process.
+
+Editable benchmark compares import time of modules in environment with
+editable wheel installed using ``.pth`` file which adds source directory
+to ``sys.path`` and using meta path finder (``editable_finder``).
+
+Precompile benchmark compares import time of all modules from wheel
+created with and without precompiled bytecode (``--precompile``). Bytecode
+is not written during imports, same as in read-only environments.
+
+Reproducible check builds wheel with ``--reproducible`` repeatedly, with
+different number of jobs, source file modification times and
+``SOURCE_DATE_EPOCH`` values, and fails if wheels built with same
+``SOURCE_DATE_EPOCH`` are not byte-identical or if wheels built with
+different ``SOURCE_DATE_EPOCH`` are identical.
+
+Copy check builds wheel with large data files stored without compression
+and fails if ratio of bytes copied through user space buffers to
+uncompressed size (``copy_ratio`` reported by ``--stats``) exceeds limit -
+stored content of large files should be copied by kernel.
+
+Scan check compares files selected by `mkwhl.scan.get_paths` with files
+selected by `pathlib.Path.glob` (include pattern matches without
+directories and exclude pattern matches) for `scan_patterns` and randomly
+generated patterns applied to trees with symbolic links (see
+`benchmarks.trees.create_link_tree`), and fails if they differ.
+
+Imports check measures import time of mkwhl modules with ``python -X
+importtime`` and fails if any of `import_heavy_modules` is imported or if
+import time exceeds budget.
+
+"""
+
+from pathlib import Path
+import argparse
+import itertools
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+import typing
+import zipfile
+
+from benchmarks import trees
+
+
+default_work_dir = Path('build/benchmarks')
+default_repeat = 3
+default_threshold = 0.1
+default_editable_scenario = 'medium-package'
+default_editable_repeat = 20
+default_precompile_scenario = 'medium-package'
+default_precompile_repeat = 5
+default_reproducible_scenario = 'medium-package'
+default_copy_scenario = 'large-data'
+default_copy_max_ratio = 0.01
+default_scan_cases = 400
+default_import_repeat = 5
+default_import_budget = 0.05
+
+editable_modes: list[str] = ['pth', 'finder']
+"""Compared editable modes"""
+
+editable_stdlib_modules: list[str] = ['argparse', 'asyncio', 'decimal',
+                                      'email.parser', 'http.client', 'json',
+                                      'logging', 'xml.etree.ElementTree']
+"""Unrelated modules imported in editable benchmark"""
+
+precompile_modes: list[str] = ['source', 'bytecode']
+"""Compared precompile modes"""
+
+reproducible_jobs: list[int] = [1, 4]
+"""Number of jobs used by reproducible check"""
+
+reproducible_epochs: list[int | None] = [None, 1700000000]
+"""``SOURCE_DATE_EPOCH`` values used by reproducible check (``None`` if
+not set)"""
+
+copy_jobs: list[int] = [1, 4]
+"""Number of jobs used by copy check"""
+
+scan_patterns: list[tuple[list[str], list[str]]] = [
+    (['**/loop/*'], ['pkg/**/*']),
+    (['**/*'], ['pkg/**/*']),
+    (['**/link/**/*'], ['other/**/*']),
+    (['a/**/self/*', '**/up/*.py'], ['**/*']),
+    (['*/broken', 'pkg/*', '**/x.py'], ['**/sub/**/*'])]
+"""Include and exclude patterns checked by scan check on each tree"""
+
+scan_segments: list[str] = ['**', '*', 'pkg', 'loop', 'link', 'sub', 'a',
+                            '*.py', 'x*', 'broken']
+"""Segments of randomly generated patterns used by scan check"""
+
+import_modules: list[str] = ['mkwhl', 'mkwhl.main']
+"""Modules checked by imports check"""
+
+import_heavy_modules: list[str] = ['concurrent', 'hashlib', 'mkwhl.wheel',
+                                   'tomllib', 'zipfile']
+"""Modules (including submodules) which should not be imported by
+`import_modules`"""
+
+targets: list[str] = ['api', 'cli', 'stream', 'backend', 'incremental',
+                      'reuse', 'sdist']
+"""Available targets"""
+
+_root_dir = Path(__file__).resolve().parent.parent
+
+_api_code = r"""
+from pathlib import Path
+import sys
+import mkwhl
+from mkwhl import common
+tool_conf = common.get_conf()['tool']['mkwhl']
+mkwhl.create_wheel(
+    src_dir=Path(tool_conf['src-dir']),
+    build_dir=Path(sys.argv[1]),
+    src_include_patterns=tool_conf['src-include-patterns'],
+    src_exclude_patterns=tool_conf['src-exclude-patterns'],
+    data_paths=[(Path(i['src']), Path(i['dst']))
+                for i in tool_conf['data-paths']])
+"""
+
+_editable_code = r"""
+from pathlib import Path
+import sys
+import mkwhl
+from mkwhl import common
+tool_conf = common.get_conf()['tool']['mkwhl']
+print(mkwhl.create_wheel(
+    src_dir=Path(tool_conf['src-dir']),
+    build_dir=Path(sys.argv[1]),
+    src_include_patterns=tool_conf['src-include-patterns'],
+    src_exclude_patterns=tool_conf['src-exclude-patterns'],
+    editable=True,
+    editable_finder=sys.argv[2] == 'finder'))
+"""
+
+_import_code = r"""
+import site
+import sys
+import time
+start = time.perf_counter()
+site.addsitedir(sys.argv[1])
+for name in sys.argv[2:]:
+    __import__(name)
+print(time.perf_counter() - start)
+"""
+
+_backend_code = r"""
+import sys
+import tempfile
+import mkwhl
+mkwhl.get_requires_for_build_wheel()
+if hasattr(mkwhl, 'prepare_metadata_for_build_wheel'):
+    with tempfile.TemporaryDirectory() as metadata_dir:
+        mkwhl.prepare_metadata_for_build_wheel(metadata_dir)
+mkwhl.build_wheel(sys.argv[1])
+"""
+
+_sdist_code = r"""
+import sys
+import mkwhl
+mkwhl.build_sdist(sys.argv[1])
+"""
+
+
+class Result(typing.NamedTuple):
+    """Single benchmark result"""
+    wall: float
+    files_per_s: float
+    mb_per_s: float
+    peak_rss: int
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='benchmarks',
+        description="Run mkwhl benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser(
+        'run', help="run benchmarks")
+    run_parser.add_argument(
+        '--work-dir', metavar='PATH', type=Path, default=default_work_dir,
+        help=f"directory containing generated trees and wheels "
+             f"(default {repr(str(default_work_dir))})")
+    run_parser.add_argument(
+        '--scale', metavar='FACTOR', type=float, default=1.0,
+        help="tree size scale factor (default 1.0)")
+    run_parser.add_argument(
+        '--scenario', metavar='NAME', action='append',
+        choices=list(trees.scenarios),
+        help="run only selected scenarios (default all)")
+    run_parser.add_argument(
+        '--target', metavar='NAME', action='append', choices=targets,
+        help=f"run only selected targets (default all - {', '.join(targets)})")  # NOQA
+    run_parser.add_argument(
+        '--repeat', metavar='N', type=int, default=default_repeat,
+        help=f"number of runs of each benchmark - best result is reported "
+             f"(default {default_repeat})")
+    run_parser.add_argument(
+        '--output', metavar='PATH', type=Path, default=None,
+        help="write JSON results to file")
+    run_parser.add_argument(
+        '--baseline', metavar='PATH', type=Path, default=None,
+        help="compare results with baseline JSON results")
+    run_parser.add_argument(
+        '--threshold', metavar='RATIO', type=float, default=default_threshold,
+        help=f"relative increase of wall time or peak RSS considered "
+             f"regression (default {default_threshold})")
+
+    editable_parser = subparsers.add_parser(
+        'editable', help="compare import time of editable modes")
+    editable_parser.add_argument(
+        '--work-dir', metavar='PATH', type=Path, default=default_work_dir,
+        help=f"directory containing generated trees and wheels "
+             f"(default {repr(str(default_work_dir))})")
+    editable_parser.add_argument(
+        '--scale', metavar='FACTOR', type=float, default=1.0,
+        help="tree size scale factor (default 1.0)")
+    editable_parser.add_argument(
+        '--scenario', metavar='NAME', default=default_editable_scenario,
+        choices=list(trees.scenarios),
+        help=f"scenario providing source tree "
+             f"(default {default_editable_scenario})")
+    editable_parser.add_argument(
+        '--repeat', metavar='N', type=int, default=default_editable_repeat,
+        help=f"number of imports in new process for each mode - best result "
+             f"is reported (default {default_editable_repeat})")
+    editable_parser.add_argument(
+        '--output', metavar='PATH', type=Path, default=None,
+        help="write JSON results to file")
+
+    precompile_parser = subparsers.add_parser(
+        'precompile',
+        help="compare import time with and without precompiled bytecode")
+    precompile_parser.add_argument(
+        '--work-dir', metavar='PATH', type=Path, default=default_work_dir,
+        help=f"directory containing generated trees and wheels "
+             f"(default {repr(str(default_work_dir))})")
+    precompile_parser.add_argument(
+        '--scale', metavar='FACTOR', type=float, default=1.0,
+        help="tree size scale factor (default 1.0)")
+    precompile_parser.add_argument(
+        '--scenario', metavar='NAME', default=default_precompile_scenario,
+        choices=list(trees.scenarios),
+        help=f"scenario providing source tree "
+             f"(default {default_precompile_scenario})")
+    precompile_parser.add_argument(
+        '--repeat', metavar='N', type=int, default=default_precompile_repeat,
+        help=f"number of imports in new process for each mode - best result "
+             f"is reported (default {default_precompile_repeat})")
+    precompile_parser.add_argument(
+        '--output', metavar='PATH', type=Path, default=None,
+        help="write JSON results to file")
+
+    reproducible_parser = subparsers.add_parser(
+        'reproducible', help="check that reproducible wheels are identical")
+    reproducible_parser.add_argument(
+        '--work-dir', metavar='PATH', type=Path, default=default_work_dir,
+        help=f"directory containing generated trees and wheels "
+             f"(default {repr(str(default_work_dir))})")
+    reproducible_parser.add_argument(
+        '--scale', metavar='FACTOR', type=float, default=1.0,
+        help="tree size scale factor (default 1.0)")
+    reproducible_parser.add_argument(
+        '--scenario', metavar='NAME', default=default_reproducible_scenario,
+        choices=list(trees.scenarios),
+        help=f"scenario providing source tree "
+             f"(default {default_reproducible_scenario})")
+
+    copy_parser = subparsers.add_parser(
+        'copy', help="check that large stored files are copied by kernel")
+    copy_parser.add_argument(
+        '--work-dir', metavar='PATH', type=Path, default=default_work_dir,
+        help=f"directory containing generated trees and wheels "
+             f"(default {repr(str(default_work_dir))})")
+    copy_parser.add_argument(
+        '--scale', metavar='FACTOR', type=float, default=1.0,
+        help="tree size scale factor (default 1.0)")
+    copy_parser.add_argument(
+        '--scenario', metavar='NAME', default=default_copy_scenario,
+        choices=list(trees.scenarios),
+        help=f"scenario providing source tree "
+             f"(default {default_copy_scenario})")
+    copy_parser.add_argument(
+        '--max-ratio', metavar='RATIO', type=float,
+        default=default_copy_max_ratio,
+        help=f"maximum ratio of copied bytes to uncompressed size "
+             f"(default {default_copy_max_ratio})")
+
+    scan_parser = subparsers.add_parser(
+        'scan', help="compare scanned files with pathlib glob results")
+    scan_parser.add_argument(
+        '--work-dir', metavar='PATH', type=Path, default=default_work_dir,
+        help=f"directory containing generated trees "
+             f"(default {repr(str(default_work_dir))})")
+    scan_parser.add_argument(
+        '--cases', metavar='N', type=int, default=default_scan_cases,
+        help=f"number of randomly generated pattern sets "
+             f"(default {default_scan_cases})")
+
+    imports_parser = subparsers.add_parser(
+        'imports', help="check import time and imported modules")
+    imports_parser.add_argument(
+        '--module', metavar='NAME', action='append',
+        help=f"check only selected modules "
+             f"(default {', '.join(import_modules)})")
+    imports_parser.add_argument(
+        '--repeat', metavar='N', type=int, default=default_import_repeat,
+        help=f"number of imports in new process for each module - best "
+             f"result is reported (default {default_import_repeat})")
+    imports_parser.add_argument(
+        '--budget', metavar='SECONDS', type=float,
+        default=default_import_budget,
+        help=f"maximum import time of each module "
+             f"(default {default_import_budget})")
+    imports_parser.add_argument(
+        '--output', metavar='PATH', type=Path, default=None,
+        help="write JSON results to file")
+
+    compare_parser = subparsers.add_parser(
+        'compare', help="compare JSON results")
+    compare_parser.add_argument(
+        '--threshold', metavar='RATIO', type=float, default=default_threshold,
+        help=f"relative increase of wall time or peak RSS considered "
+             f"regression (default {default_threshold})")
+    compare_parser.add_argument(
+        'baseline', metavar='BASELINE', type=Path,
+        help="baseline JSON results")
+    compare_parser.add_argument(
+        'results', metavar='RESULTS', type=Path,
+        help="JSON results")
+
+    return parser
+
+
+def main() -> int:
+    """Main entry point"""
+    parser = create_argument_parser()
+    args = parser.parse_args()
+
+    if args.command == 'editable':
+        results = run_editable(work_dir=args.work_dir,
+                               scale=args.scale,
+                               scenario_name=args.scenario,
+                               repeat=args.repeat)
+
+        if args.output:
+            args.output.write_text(json.dumps(results, indent=2), 'utf-8')
+
+        return 0
+
+    if args.command == 'precompile':
+        results = run_precompile(work_dir=args.work_dir,
+                                 scale=args.scale,
+                                 scenario_name=args.scenario,
+                                 repeat=args.repeat)
+
+        if args.output:
+            args.output.write_text(json.dumps(results, indent=2), 'utf-8')
+
+        return 0
+
+    if args.command == 'reproducible':
+        failed = run_reproducible(work_dir=args.work_dir,
+                                  scale=args.scale,
+                                  scenario_name=args.scenario)
+        return 1 if failed else 0
+
+    if args.command == 'copy':
+        failed = run_copy(work_dir=args.work_dir,
+                          scale=args.scale,
+                          scenario_name=args.scenario,
+                          max_ratio=args.max_ratio)
+        return 1 if failed else 0
+
+    if args.command == 'scan':
+        failed = run_scan(work_dir=args.work_dir,
+                          cases=args.cases)
+        return 1 if failed else 0
+
+    if args.command == 'imports':
+        results = run_imports(module_names=args.module or import_modules,
+                              repeat=args.repeat,
+                              budget=args.budget)
+
+        if args.output:
+            args.output.write_text(json.dumps(results, indent=2), 'utf-8')
+
+        return 1 if results['failed'] else 0
+
+    if args.command == 'compare':
+        baseline = json.loads(args.baseline.read_text('utf-8'))
+        results = json.loads(args.results.read_text('utf-8'))
+        return 1 if compare(baseline, results, args.threshold) else 0
+
+    results = run(work_dir=args.work_dir,
+                  scale=args.scale,
+                  scenario_names=args.scenario or list(trees.scenarios),
+                  target_names=args.target or targets,
+                  repeat=args.repeat)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), 'utf-8')
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text('utf-8'))
+        return 1 if compare(baseline, results, args.threshold) else 0
+
+    return 0
+
+
+def run(work_dir: Path,
+        scale: float,
+        scenario_names: list[str],
+        target_names: list[str],
+        repeat: int
+        ) -> dict[str, typing.Any]:
+    """Run benchmarks and return JSON serializable results"""
+    work_dir = work_dir.resolve()
+    results = {}
+
+    for scenario_name in scenario_names:
+        scenario = trees.scenarios[scenario_name]
+
+        print(f"creating tree {scenario.name} ({scenario.description})",
+              file=sys.stderr)
+        tree_dir = trees.get_tree(work_dir / 'trees', scenario, scale)
+
+        for target in target_names:
+            build_dir = work_dir / 'out' / scenario.name / target
+            result = min((_run_once(tree_dir, build_dir, scenario, target)
+                          for _ in range(max(repeat, 1))),
+                         key=lambda i: i.wall)
+
+            name = f'{scenario.name}/{target}'
+            results[name] = result._asdict()
+
+            print(f"{name:<28} {result.wall:9.3f} s "
+                  f"{result.files_per_s:11.1f} files/s "
+                  f"{result.mb_per_s:9.1f} MB/s "
+                  f"{result.peak_rss / 1024 / 1024:9.1f} MB RSS")
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': scale,
+            'results': results}
+
+
+def run_editable(work_dir: Path,
+                 scale: float,
+                 scenario_name: str,
+                 repeat: int
+                 ) -> dict[str, typing.Any]:
+    """Run editable benchmark and return JSON serializable results
+
+    Editable wheel is created and extracted to site directory for each
+    mode. Measured time includes processing of site directory ``.pth``
+    files and importing `editable_stdlib_modules` and all top-level
+    packages of tree.
+
+    """
+    work_dir = work_dir.resolve()
+    scenario = trees.scenarios[scenario_name]
+
+    print(f"creating tree {scenario.name} ({scenario.description})",
+          file=sys.stderr)
+    tree_dir = trees.get_tree(work_dir / 'trees', scenario, scale)
+
+    src_dir = tree_dir / scenario.src_dir
+    module_names = _get_module_names(src_dir, top_level=True)
+
+    results = {}
+    for mode in editable_modes:
+        build_dir = work_dir / 'editable' / scenario.name / mode
+        site_dir = build_dir / 'site'
+        shutil.rmtree(build_dir, ignore_errors=True)
+        build_dir.mkdir(parents=True)
+
+        wheel_name = subprocess.run(
+            [sys.executable, '-c', _editable_code, str(build_dir), mode],
+            cwd=tree_dir, env=_get_env(), check=True, capture_output=True,
+            text=True).stdout.strip()
+
+        with zipfile.ZipFile(build_dir / wheel_name) as whl:
+            whl.extractall(site_dir)
+
+        import_time = _measure_import(
+            site_dir=site_dir,
+            module_names=[*editable_stdlib_modules, *module_names],
+            repeat=repeat)
+
+        name = f'{scenario.name}/editable-{mode}'
+        results[name] = {'import_time': import_time}
+
+        print(f"{name:<36} {import_time * 1000:9.2f} ms")
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': scale,
+            'results': results}
+
+
+def run_precompile(work_dir: Path,
+                   scale: float,
+                   scenario_name: str,
+                   repeat: int
+                   ) -> dict[str, typing.Any]:
+    """Run precompile benchmark and return JSON serializable results
+
+    Wheel is created with command line interface and extracted to site
+    directory for each mode. Measured time includes importing all modules
+    of tree without writing bytecode.
+
+    """
+    work_dir = work_dir.resolve()
+    scenario = trees.scenarios[scenario_name]
+
+    print(f"creating tree {scenario.name} ({scenario.description})",
+          file=sys.stderr)
+    tree_dir = trees.get_tree(work_dir / 'trees', scenario, scale)
+
+    src_dir = tree_dir / scenario.src_dir
+    module_names = _get_module_names(src_dir, top_level=False)
+
+    results = {}
+    for mode in precompile_modes:
+        build_dir = work_dir / 'precompile' / scenario.name / mode
+        site_dir = build_dir / 'site'
+        shutil.rmtree(build_dir, ignore_errors=True)
+        build_dir.mkdir(parents=True)
+
+        args = _get_cli_args(build_dir, scenario)
+        if mode == 'bytecode':
+            args.append('--precompile')
+
+        subprocess.run(args, cwd=tree_dir, env=_get_env(), check=True)
+
+        for wheel_path in build_dir.glob('*.whl'):
+            with zipfile.ZipFile(wheel_path) as whl:
+                whl.extractall(site_dir)
+
+        import_time = _measure_import(site_dir=site_dir,
+                                      module_names=module_names,
+                                      repeat=repeat,
+                                      write_bytecode=False)
+
+        name = f'{scenario.name}/precompile-{mode}'
+        results[name] = {'import_time': import_time}
+
+        print(f"{name:<36} {import_time * 1000:9.2f} ms")
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': scale,
+            'results': results}
+
+
+def run_reproducible(work_dir: Path,
+                     scale: float,
+                     scenario_name: str
+                     ) -> bool:
+    """Run reproducible check and return ``True`` if check failed
+
+    For each of `reproducible_epochs` and `reproducible_jobs`, wheel is
+    built twice with command line interface. Modification times of all
+    files in tree are changed before each build.
+
+    """
+    work_dir = work_dir.resolve()
+    scenario = trees.scenarios[scenario_name]
+
+    print(f"creating tree {scenario.name} ({scenario.description})",
+          file=sys.stderr)
+    tree_dir = trees.get_tree(work_dir / 'trees', scenario, scale)
+
+    failed = False
+    epoch_digests = {}
+
+    for epoch in reproducible_epochs:
+        env = _get_env()
+        env.pop('SOURCE_DATE_EPOCH', None)
+        if epoch is not None:
+            env['SOURCE_DATE_EPOCH'] = str(epoch)
+
+        digests = set()
+        for jobs in reproducible_jobs:
+            for i in range(2):
+                build_dir = (work_dir / 'reproducible' / scenario.name /
+                             f'{epoch}-{jobs}-{i}')
+                shutil.rmtree(build_dir, ignore_errors=True)
+                build_dir.mkdir(parents=True)
+
+                _touch_tree(tree_dir, time.time() + i)
+
+                args = [*_get_cli_args(build_dir, scenario),
+                        '--reproducible', '--jobs', str(jobs)]
+                subprocess.run(args, cwd=tree_dir, env=env, check=True)
+
+                for wheel_path in sorted(build_dir.glob('*.whl')):
+                    digest = hashlib.sha256(
+                        wheel_path.read_bytes()).hexdigest()
+                    digests.add(digest)
+
+                    print(f"{epoch}/jobs-{jobs}/{i} {wheel_path.name} "
+                          f"{digest}")
+
+        if len(digests) != 1:
+            print(f"epoch {epoch}: wheels differ", file=sys.stderr)
+            failed = True
+
+        epoch_digests[epoch] = digests
+
+    for epoch, digests in epoch_digests.items():
+        for other_epoch, other_digests in epoch_digests.items():
+            if epoch != other_epoch and digests & other_digests:
+                print(f"epoch {epoch}: wheels identical to epoch "
+                      f"{other_epoch}", file=sys.stderr)
+                failed = True
+
+    return failed
+
+
+def run_copy(work_dir: Path,
+             scale: float,
+             scenario_name: str,
+             max_ratio: float
+             ) -> bool:
+    """Run copy check and return ``True`` if check failed
+
+    For each of `copy_jobs`, wheel is built with command line interface
+    with all members stored without compression and all non-empty files
+    handled by large file I/O path. Check fails if ``copy_ratio`` of build
+    statistics exceeds `max_ratio`.
+
+    """
+    work_dir = work_dir.resolve()
+    scenario = trees.scenarios[scenario_name]
+
+    print(f"creating tree {scenario.name} ({scenario.description})",
+          file=sys.stderr)
+    tree_dir = trees.get_tree(work_dir / 'trees', scenario, scale)
+
+    failed = False
+
+    for jobs in copy_jobs:
+        build_dir = work_dir / 'copy' / scenario.name / f'jobs-{jobs}'
+        stats_path = build_dir / 'stats.json'
+        shutil.rmtree(build_dir, ignore_errors=True)
+        build_dir.mkdir(parents=True)
+
+        args = [*_get_cli_args(build_dir, scenario),
+                '--compression-rule', '*:stored',
+                '--large-file-size', '1',
+                '--jobs', str(jobs),
+                '--stats', str(stats_path)]
+        subprocess.run(args, cwd=tree_dir, env=_get_env(), check=True)
+
+        copy_ratio = json.loads(
+            stats_path.read_text('utf-8'))['copy_ratio'] or 0
+        if copy_ratio > max_ratio:
+            failed = True
+
+        name = f'{scenario.name}/jobs-{jobs}'
+        print(f"{name:<36} {copy_ratio:9.4f} copy ratio"
+              + (" FAILED" if copy_ratio > max_ratio else ''))
+
+    return failed
+
+
+def run_scan(work_dir: Path,
+             cases: int
+             ) -> bool:
+    """Run scan check and return ``True`` if check failed
+
+    New tree is created for every 20 generated pattern sets. Each pattern
+    set contains one or two include patterns and up to two exclude
+    patterns, each with up to three `scan_segments`.
+
+    """
+    from mkwhl import scan
+
+    tree_dir = work_dir.resolve() / 'scan'
+    rng = random.Random(trees.seed)
+    checked = 0
+    differ = 0
+
+    for i in range(max(cases, 1)):
+        if i % 20 == 0:
+            trees.create_link_tree(tree_dir, rng)
+            pattern_sets = list(scan_patterns)
+
+        else:
+            pattern_sets = []
+
+        pattern_sets.append(
+            ([_get_scan_pattern(rng) for _ in range(rng.randrange(1, 3))],
+             [_get_scan_pattern(rng) for _ in range(rng.randrange(3))]))
+
+        for include_patterns, exclude_patterns in pattern_sets:
+            expected = _glob_paths(tree_dir, include_patterns,
+                                   exclude_patterns)
+            result = set(scan.get_paths(tree_dir, include_patterns,
+                                        exclude_patterns))
+            checked += 1
+
+            if result == expected:
+                continue
+
+            differ += 1
+            print(f"include {include_patterns} exclude {exclude_patterns}: "
+                  f"missing {_get_names(tree_dir, expected - result)} "
+                  f"unexpected {_get_names(tree_dir, result - expected)}",
+                  file=sys.stderr)
+
+    print(f"{'scan':<36} {checked:9} pattern sets"
+          + (f" FAILED ({differ} differ)" if differ else ''))
+
+    return bool(differ)
+
+
+def run_imports(module_names: list[str],
+                repeat: int,
+                budget: float
+                ) -> dict[str, typing.Any]:
+    """Run imports check and return JSON serializable results
+
+    Each module is imported in new process with ``-X importtime``.
+    Reported import time is cumulative time of module as reported by
+    interpreter (interpreter startup is not included). Check fails if
+    any of `import_heavy_modules` is imported or if import time of module
+    exceeds `budget` seconds.
+
+    """
+    results = {}
+    failed = False
+
+    for module_name in module_names:
+        import_time = None
+        heavy_names = set()
+
+        for _ in range(max(repeat, 1)):
+            times = _get_import_times(module_name)
+            heavy_names.update(
+                name for name in times
+                if any(name == i or name.startswith(f'{i}.')
+                       for i in import_heavy_modules))
+
+            if import_time is None or times[module_name] < import_time:
+                import_time = times[module_name]
+
+        flags = []
+        if heavy_names:
+            flags.append(f"imports {', '.join(sorted(heavy_names))}")
+
+        if import_time > budget:
+            flags.append('over budget')
+
+        if flags:
+            failed = True
+
+        results[module_name] = {'import_time': import_time,
+                                'heavy_modules': sorted(heavy_names)}
+
+        print(f"{module_name:<36} {import_time * 1000:9.2f} ms"
+              + (f" FAILED ({'; '.join(flags)})" if flags else ''))
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'budget': budget,
+            'failed': failed,
+            'results': results}
+
+
+def compare(baseline: dict[str, typing.Any],
+            results: dict[str, typing.Any],
+            threshold: float
+            ) -> bool:
+    """Print comparison and return ``True`` if regression is detected
+
+    Wall time or peak RSS larger than baseline value increased by
+    `threshold` ratio is considered regression.
+
+    """
+    if baseline.get('scale') != results.get('scale'):
+        print("warning: results created with different scale",
+              file=sys.stderr)
+
+    regression = False
+
+    for name, result in results['results'].items():
+        baseline_result = baseline['results'].get(name)
+        if baseline_result is None:
+            print(f"{name:<28} no baseline")
+            continue
+
+        flags = []
+        for key in ['wall', 'peak_rss']:
+            if result[key] > baseline_result[key] * (1 + threshold):
+                flags.append(key)
+
+        if flags:
+            regression = True
+
+        wall_change = _get_change(baseline_result['wall'], result['wall'])
+        rss_change = _get_change(baseline_result['peak_rss'],
+                                 result['peak_rss'])
+
+        print(f"{name:<28} "
+              f"wall {baseline_result['wall']:.3f} -> {result['wall']:.3f} s "
+              f"({wall_change:+.1%}) "
+              f"rss {baseline_result['peak_rss'] / 1024 / 1024:.1f} -> "
+              f"{result['peak_rss'] / 1024 / 1024:.1f} MB "
+              f"({rss_change:+.1%})"
+              + (f" REGRESSION ({', '.join(flags)})" if flags else ''))
+
+    return regression
+
+
+def _get_change(baseline: float, value: float) -> float:
+    return (value - baseline) / baseline if baseline else 0
+
+
+def _run_once(tree_dir: Path,
+              build_dir: Path,
+              scenario: trees.Scenario,
+              target: str
+              ) -> Result:
+    shutil.rmtree(build_dir, ignore_errors=True)
+    build_dir.mkdir(parents=True)
+
+    if target == 'api':
+        args = [sys.executable, '-c', _api_code, str(build_dir)]
+
+    elif target in ('cli', 'stream'):
+        args = _get_cli_args(build_dir, scenario)
+
+    elif target == 'backend':
+        args = [sys.executable, '-c', _backend_code, str(build_dir)]
+
+    elif target == 'incremental':
+        args = [*_get_cli_args(build_dir, scenario), '--incremental']
+
+    elif target == 'reuse':
+        args = [*_get_cli_args(build_dir, scenario), '--lock']
+
+    elif target == 'sdist':
+        args = [sys.executable, '-c', _sdist_code, str(build_dir)]
+
+    else:
+        raise ValueError('unsupported target')
+
+    name = f'{scenario.name}/{target}'
+    changed_path = None
+
+    try:
+        if target in ('incremental', 'reuse'):
+            _run_process(args, tree_dir, name)
+
+        if target == 'incremental':
+            changed_path = min((tree_dir / scenario.src_dir).rglob('*.py'))
+            original = changed_path.read_bytes()
+            changed_path.write_bytes(original + b'\n# changed\n')
+
+        if target == 'stream':
+            with open(build_dir / 'stream.whl', 'wb') as f:
+                wall, peak_rss = _run_process([*args, '--output', '-'],
+                                              tree_dir, name, stdout=f)
+
+        else:
+            wall, peak_rss = _run_process(args, tree_dir, name)
+
+    finally:
+        if changed_path:
+            changed_path.write_bytes(original)
+
+    count = 0
+    size = 0
+    for wheel_path in build_dir.glob('*.whl'):
+        with zipfile.ZipFile(wheel_path) as whl:
+            for zinfo in whl.infolist():
+                count += 1
+                size += zinfo.file_size
+
+    for sdist_path in build_dir.glob('*.tar.gz'):
+        with tarfile.open(sdist_path) as tar:
+            for tarinfo in tar:
+                count += 1
+                size += tarinfo.size
+
+    return Result(wall=wall,
+                  files_per_s=count / wall,
+                  mb_per_s=size / wall / 1024 / 1024,
+                  peak_rss=peak_rss)
+
+
+def _get_cli_args(build_dir: Path,
+                  scenario: trees.Scenario
+                  ) -> list[str]:
+    args = [sys.executable, '-m', 'mkwhl',
+            '--quiet',
+            '--build-dir', str(build_dir),
+            '--src-dir', scenario.src_dir]
+    for pattern in scenario.src_include_patterns:
+        args.extend(['--src-include', pattern])
+    for pattern in scenario.src_exclude_patterns:
+        args.extend(['--src-exclude', pattern])
+    for src, dst in scenario.data_paths:
+        args.extend(['--data', f'{src}:{dst}'])
+
+    return args
+
+
+def _get_module_names(src_dir: Path,
+                      top_level: bool
+                      ) -> list[str]:
+    names = set()
+
+    for path in src_dir.rglob('*.py'):
+        parts = path.relative_to(src_dir).with_suffix('').parts
+        if top_level:
+            parts = parts[:1]
+
+        elif parts[-1] == '__init__':
+            parts = parts[:-1]
+
+        if parts and all(i.isidentifier() for i in parts):
+            names.add('.'.join(parts))
+
+    return sorted(names)
+
+
+def _measure_import(site_dir: Path,
+                    module_names: list[str],
+                    repeat: int,
+                    write_bytecode: bool = True
+                    ) -> float:
+    # site module is imported explicitly so that only benchmark site
+    # directory is processed
+    args = [sys.executable, '-S', *([] if write_bytecode else ['-B']),
+            '-c', _import_code, str(site_dir), *module_names]
+
+    return min(float(subprocess.run(args, cwd=site_dir.parent,
+                                    env=_get_env(), check=True,
+                                    capture_output=True, text=True).stdout)
+               for _ in range(max(repeat, 1)))
+
+
+def _get_scan_pattern(rng: random.Random) -> str:
+    return '/'.join(rng.choice(scan_segments)
+                    for _ in range(rng.randrange(1, 4)))
+
+
+def _glob_paths(src_dir: Path,
+                include_patterns: list[str],
+                exclude_patterns: list[str]
+                ) -> set[Path]:
+    include_paths = set(itertools.chain.from_iterable(
+        src_dir.glob(pattern) for pattern in include_patterns))
+    exclude_paths = set(itertools.chain.from_iterable(
+        src_dir.glob(pattern) for pattern in exclude_patterns))
+
+    return {path for path in include_paths
+            if not path.is_dir() and path not in exclude_paths}
+
+
+def _get_names(src_dir: Path, paths: set[Path]) -> list[str]:
+    return sorted(path.relative_to(src_dir).as_posix() for path in paths)
+
+
+def _touch_tree(tree_dir: Path, mtime: float):
+    for path in tree_dir.rglob('*'):
+        if path.is_file() and not path.is_symlink():
+            os.utime(path, (mtime, mtime))
+
+
+def _get_import_times(module_name: str) -> dict[str, float]:
+    # each line of importtime output (written to stderr) contains self
+    # time, cumulative time (both in microseconds) and indented module name
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=_root_dir, env=_get_env(), check=True, capture_output=True,
+        text=True).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+
+        times[name.strip()] = int(cumulative) / 1_000_000
+
+    if module_name not in times:
+        raise Exception(f'{module_name} import time not reported')
+
+    return times
+
+
+def _get_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(_root_dir), *filter(None, [env.get('PYTHONPATH')])])
+    return env
+
+
+def _run_process(args: list[str],
+                 tree_dir: Path,
+                 name: str,
+                 stdout: typing.BinaryIO | None = None
+                 ) -> tuple[float, int]:
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=tree_dir, env=_get_env(),
+                               stdout=stdout)
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode:
+        raise Exception(f'{name} failed')
+
+    # ru_maxrss is in kilobytes on linux and in bytes on macos
+    peak_rss = rusage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+    return wall, peak_rss
@@ -0,0 +1,334 @@
+"""Reproducible synthetic project trees
+
+Each tree is project directory containing ``pyproject.toml`` and source
+files generated with seeded pseudo-random generator. Same scenario and
+scale always produce identical tree.
+
+"""
+
+from pathlib import Path
+import json
+import os
+import random
+import shutil
+import typing
+
+
+seed: int = 42
+"""Pseudo-random generator seed"""
+
+
+class Scenario(typing.NamedTuple):
+    """Benchmark scenario
+
+    Function `create` populates empty project directory for provided
+    scale factor. Source and data paths are relative to project directory.
+
+    """
+    name: str
+    description: str
+    create: typing.Callable[[Path, float, random.Random], None]
+    src_dir: str = 'src'
+    src_include_patterns: list[str] = ['**/*']
+    src_exclude_patterns: list[str] = ['**/__pycache__/**/*']
+    data_paths: list[tuple[str, str]] = []
+    readme: str | None = None
+
+
+def get_tree(work_dir: Path,
+             scenario: Scenario,
+             scale: float
+             ) -> Path:
+    """Get project directory of scenario tree
+
+    Tree is created in `work_dir` only if previously created tree does not
+    exist or was created with different parameters.
+
+    """
+    tree_dir = work_dir / scenario.name
+    marker_path = tree_dir / '.benchmark.json'
+    marker = {'scenario': scenario.name,
+              'scale': scale,
+              'seed': seed}
+
+    try:
+        if json.loads(marker_path.read_text('utf-8')) == marker:
+            return tree_dir
+
+    except (FileNotFoundError, ValueError):
+        pass
+
+    shutil.rmtree(tree_dir, ignore_errors=True)
+    tree_dir.mkdir(parents=True)
+
+    _write_pyproject(tree_dir, scenario)
+    scenario.create(tree_dir, scale, random.Random(seed))
+
+    marker_path.write_text(json.dumps(marker), 'utf-8')
+    return tree_dir
+
+
+def create_link_tree(tree_dir: Path, rng: random.Random):
+    """Create small tree containing symbolic links
+
+    Tree contains symbolic links to sibling and parent directories
+    (cycles), to files and to missing paths. Some additional links are
+    created at random locations. Existing `tree_dir` is removed.
+
+    """
+    shutil.rmtree(tree_dir, ignore_errors=True)
+
+    dir_paths = [tree_dir]
+    for name in ['pkg', 'pkg/sub', 'pkg/sub/deep', 'a', 'a/b', 'other']:
+        dir_paths.append(tree_dir / name)
+        dir_paths[-1].mkdir(parents=True)
+
+    for dir_path in dir_paths:
+        for name in rng.sample(['x.py', 'y.txt', 'loop.py', 'sub.py'], 2):
+            (dir_path / name).write_text('', 'utf-8')
+
+    links = [('pkg/loop', '../other'),
+             ('pkg/sub/up', '..'),
+             ('a/b/self', '.'),
+             ('pkg/broken', 'missing'),
+             ('other/link', '../pkg/sub')]
+
+    for _ in range(rng.randrange(1, 4)):
+        dir_path = rng.choice(dir_paths)
+        target = rng.choice([*dir_paths, tree_dir / 'missing'])
+        name = rng.choice(['loop', 'link', 'sub'])
+        links.append(((dir_path / name).relative_to(tree_dir).as_posix(),
+                      os.path.relpath(target, dir_path)))
+
+    for path, target in links:
+        link_path = tree_dir / path
+        if not link_path.exists() and not link_path.is_symlink():
+            link_path.symlink_to(target)
+
+
+def _write_pyproject(tree_dir: Path, scenario: Scenario):
+    lines = ['[project]',
+             f'name = "bench-{scenario.name}"',
+             'version = "1.0"',
+             'dependencies = ["packaging >=23.1"]']
+
+    if scenario.readme:
+        lines.append(f'readme = "{scenario.readme}"')
+
+    lines.extend(['',
+                  '[tool.mkwhl]',
+                  f'src-dir = "{scenario.src_dir}"',
+                  f'src-include-patterns = {json.dumps(scenario.src_include_patterns)}',  # NOQA
+                  f'src-exclude-patterns = {json.dumps(scenario.src_exclude_patterns)}',  # NOQA
+                  'data-paths = ['])
+
+    for src, dst in scenario.data_paths:
+        lines.append(f'    {{src = "{src}", dst = "{dst}"}},')
+
+    lines.extend([']', ''])
+
+    (tree_dir / 'pyproject.toml').write_text('\n'.join(lines), 'utf-8')
+
+
+def _get_py_source(rng: random.Random) -> str:
+    names = [f'name_{rng.randrange(1000)}' for _ in range(rng.randrange(1, 8))]
+    lines = ['"""Generated module"""', '']
+
+    for name in names:
+        lines.extend(['',
+                      f'def {name}(value: int) -> int:',
+                      f'    return value * {rng.randrange(100)}',
+                      ''])
+
+    return '\n'.join(lines)
+
+
+def _write_random_file(path: Path,
+                       size: int,
+                       rng: random.Random):
+    chunk_size = 1024 * 1024
+
+    with open(path, 'wb') as f:
+        while size > 0:
+            # half of each chunk is incompressible
+            half = min(size, chunk_size) // 2
+            chunk = rng.randbytes(half) + bytes(min(size, chunk_size) - half)
+            f.write(chunk)
+            size -= len(chunk)
+
+
+def _create_tiny_files(tree_dir: Path,
+                       scale: float,
+                       rng: random.Random):
+    count = max(1, int(50_000 * scale))
+    per_package = 100
+
+    for i in range(count):
+        package_dir = tree_dir / 'src' / 'pkg' / f'sub{i // per_package}'
+        if i % per_package == 0:
+            package_dir.mkdir(parents=True)
+            (package_dir / '__init__.py').write_text('', 'utf-8')
+
+        (package_dir / f'mod{i}.py').write_text(_get_py_source(rng), 'utf-8')
+
+
+def _create_medium_package(tree_dir: Path,
+                           scale: float,
+                           rng: random.Random):
+    count = max(1, int(20_000 * scale))
+    per_package = 200
+
+    for i in range(count):
+        package_dir = tree_dir / 'src' / 'pkg' / f'sub{i // per_package}'
+        if i % per_package == 0:
+            package_dir.mkdir(parents=True)
+            (package_dir / '__init__.py').write_text('', 'utf-8')
+
+        if i % 10 == 0:
+            (package_dir / f'data{i}.json').write_text(
+                json.dumps([rng.randrange(1000) for _ in range(500)]),
+                'utf-8')
+
+        else:
+            (package_dir / f'mod{i}.py').write_text(_get_py_source(rng),
+                                                    'utf-8')
+
+
+def _create_data_dir(tree_dir: Path,
+                     scale: float,
+                     rng: random.Random):
+    count = max(1, int(30_000 * scale))
+    per_dir = 500
+
+    package_dir = tree_dir / 'src' / 'pkg'
+    package_dir.mkdir(parents=True)
+    (package_dir / '__init__.py').write_text(_get_py_source(rng), 'utf-8')
+
+    for i in range(count):
+        data_dir = tree_dir / 'share' / f'dir{i // per_dir}'
+        if i % per_dir == 0:
+            data_dir.mkdir(parents=True)
+
+        (data_dir / f'item{i}.json').write_text(
+            json.dumps([rng.randrange(1000) for _ in range(100)]), 'utf-8')
+
+
+def _create_large_data(tree_dir: Path,
+                       scale: float,
+                       rng: random.Random):
+    size = max(1024 * 1024, int(2 * 1024 * 1024 * 1024 * scale))
+
+    package_dir = tree_dir / 'src' / 'pkg'
+    package_dir.mkdir(parents=True)
+    (package_dir / '__init__.py').write_text(_get_py_source(rng), 'utf-8')
+
+    data_dir = tree_dir / 'data'
+    data_dir.mkdir()
+
+    for i in range(2):
+        _write_random_file(data_dir / f'blob{i}.bin', size, rng)
+
+    _write_random_file(package_dir / 'model.bin', size // 4, rng)
+
+
+def _create_exclude_heavy(tree_dir: Path,
+                          scale: float,
+                          rng: random.Random):
+    # about 200k excluded files (80k in .git, 60k in build, 64k in
+    # node_modules, __pycache__ and temporary files) and 3k source files
+    depth = 6
+    width = max(1, round(4 * scale ** (1 / depth)))
+    src_dir = tree_dir / 'src'
+
+    git_count = max(1, int(80_000 * scale))
+    for i in range(git_count):
+        object_dir = src_dir / '.git' / 'objects' / f'{i % 256:02x}'
+        object_dir.mkdir(parents=True, exist_ok=True)
+        (object_dir / f'{rng.getrandbits(152):038x}').write_bytes(
+            rng.randbytes(rng.randrange(64, 256)))
+
+    build_count = max(1, int(60_000 * scale))
+    for i in range(build_count):
+        build_dir = src_dir / 'build' / 'lib' / f'pkg{i // 100}'
+        build_dir.mkdir(parents=True, exist_ok=True)
+        (build_dir / f'module{i % 100}.py').write_text(
+            '"""Generated module"""\n', 'utf-8')
+
+    def create(path, level):
+        path.mkdir(parents=True)
+        (path / '__init__.py').write_text(_get_py_source(rng), 'utf-8')
+        (path / 'module.py').write_text(_get_py_source(rng), 'utf-8')
+        (path / 'notes.tmp').write_text('tmp', 'utf-8')
+
+        cache_dir = path / '__pycache__'
+        cache_dir.mkdir()
+        for name in ['__init__', 'module']:
+            (cache_dir / f'{name}.cpython-311.pyc').write_bytes(
+                rng.randbytes(256))
+
+        node_dir = path / 'node_modules' / 'dep' / 'lib'
+        node_dir.mkdir(parents=True)
+        for i in range(44):
+            (node_dir / f'file{i}.js').write_text('module.exports = 1;\n',
+                                                  'utf-8')
+
+        if level < depth:
+            for i in range(width):
+                create(path / f'pkg{i}', level + 1)
+
+    create(src_dir / 'pkg', 1)
+
+
+def _create_readme_heavy(tree_dir: Path,
+                         scale: float,
+                         rng: random.Random):
+    size = max(1024, int(32 * 1024 * 1024 * scale))
+    words = ['wheel', 'archive', 'metadata', 'record', 'build', 'python',
+             'package', 'distribution', 'compression', 'benchmark']
+
+    with open(tree_dir / 'README.rst', 'w', encoding='utf-8') as f:
+        f.write('Readme\n======\n\n')
+        written = 0
+
+        while written < size:
+            line = ' '.join(rng.choice(words) for _ in range(12)) + '\n'
+            if rng.randrange(20) == 0:
+                line += '\n'
+
+            f.write(line)
+            written += len(line)
+
+    package_dir = tree_dir / 'src' / 'pkg'
+    package_dir.mkdir(parents=True)
+    (package_dir / '__init__.py').write_text(_get_py_source(rng), 'utf-8')
+
+
+scenarios: dict[str, Scenario] = {i.name: i for i in [
+    Scenario(name='tiny-files',
+             description='50k tiny .py files',
+             create=_create_tiny_files),
+    Scenario(name='medium-package',
+             description='20k .py and data files',
+             create=_create_medium_package),
+    Scenario(name='data-dir',
+             description='30k files in single data directory',
+             create=_create_data_dir,
+             data_paths=[('share', 'share/bench')]),
+    Scenario(name='large-data',
+             description='multi-GB data files',
+             create=_create_large_data,
+             data_paths=[('data/blob0.bin', 'data/blob0.bin'),
+                         ('data/blob1.bin', 'data/blob1.bin')]),
+    Scenario(name='exclude-heavy',
+             description='200k excluded files in .git, build and node_modules',
+             create=_create_exclude_heavy,
+             src_exclude_patterns=['.git/**/*',
+                                   'build/**/*',
+                                   '**/__pycache__/**/*',
+                                   '**/node_modules/**/*',
+                                   '**/*.tmp']),
+    Scenario(name='readme-heavy',
+             description='large readme included in METADATA',
+             create=_create_readme_heavy,
+             readme='README.rst')]}
+"""Available scenarios identified by name"""
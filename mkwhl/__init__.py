@@ -1,18 +1,74 @@
-"""Wheel creation utility"""
+"""Wheel creation utility
 
-from mkwhl.build import (UnsupportedOperation,
-                         build_wheel,
-                         build_editable,
-                         build_sdist,
-                         get_requires_for_build_wheel,
-                         get_requires_for_build_editable)
-from mkwhl.wheel import create_wheel
+Attributes are imported lazily from `mkwhl.build`, `mkwhl.wheel`,
+`mkwhl.sdist` and `mkwhl.aio` on first access, so that importing package
+(e.g. by build frontend calling only `get_requires_for_build_wheel`) does
+not load unused dependencies.
+
+"""
+
+import importlib
+import typing
 
 
 __all__ = ['UnsupportedOperation',
            'build_wheel',
            'build_editable',
            'build_sdist',
+           'prepare_metadata_for_build_wheel',
+           'prepare_metadata_for_build_editable',
            'get_requires_for_build_wheel',
            'get_requires_for_build_editable',
-           'create_wheel']
+           'create_wheel',
+           'write_wheel',
+           'create_tagged_wheels',
+           'create_wheel_async',
+           'create_dist_info',
+           'create_sdist']
+
+
+_attr_modules = {'UnsupportedOperation': 'mkwhl.build',
+                 'build_wheel': 'mkwhl.build',
+                 'build_editable': 'mkwhl.build',
+                 'build_sdist': 'mkwhl.build',
+                 'prepare_metadata_for_build_wheel': 'mkwhl.build',
+                 'prepare_metadata_for_build_editable': 'mkwhl.build',
+                 'get_requires_for_build_wheel': 'mkwhl.build',
+                 'get_requires_for_build_editable': 'mkwhl.build',
+                 'create_wheel': 'mkwhl.wheel',
+                 'write_wheel': 'mkwhl.wheel',
+                 'create_tagged_wheels': 'mkwhl.wheel',
+                 'create_wheel_async': 'mkwhl.aio',
+                 'create_dist_info': 'mkwhl.wheel',
+                 'create_sdist': 'mkwhl.sdist'}
+
+
+def __getattr__(name: str) -> typing.Any:
+    module_name = _attr_modules.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
+
+
+if typing.TYPE_CHECKING:
+    from mkwhl.build import (UnsupportedOperation,  # NOQA
+                             build_wheel,
+                             build_editable,
+                             build_sdist,
+                             prepare_metadata_for_build_wheel,
+                             prepare_metadata_for_build_editable,
+                             get_requires_for_build_wheel,
+                             get_requires_for_build_editable)
+    from mkwhl.wheel import (create_wheel,  # NOQA
+                             write_wheel,
+                             create_tagged_wheels,
+                             create_dist_info)
+    from mkwhl.sdist import create_sdist  # NOQA
+    from mkwhl.aio import create_wheel_async  # NOQA
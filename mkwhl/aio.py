@@ -0,0 +1,162 @@
+"""Asyncio wheel creation API"""
+
+from pathlib import Path
+import asyncio
+import functools
+import threading
+import typing
+
+from mkwhl import common
+from mkwhl.wheel import create_wheel
+
+
+class WheelBuild:
+    """Wheel creation running in background thread
+
+    Instance is created with `create_wheel_async`. Awaiting instance
+    returns created wheel name.
+
+    Asynchronous iteration yields `mkwhl.common.Progress` until wheel
+    creation finishes. If progress changes multiple times between
+    iterations, only latest progress is yielded, so slow consumers do not
+    delay wheel creation.
+
+    Wheel creation is aborted if instance (or task awaiting it) is
+    cancelled. Cancellation completes once wheel creation is stopped and
+    partially written wheel is removed. Wheel completed before abort was
+    noticed is also removed, unless it is existing wheel reused by
+    `mkwhl.wheel.create_wheel` (see its `lock` argument).
+
+    """
+
+    def __init__(self,
+                 loop: asyncio.AbstractEventLoop,
+                 build_dir: Path,
+                 kwargs: dict[str, typing.Any]):
+        self._loop = loop
+        self._build_dir = build_dir
+        self._lock = threading.Lock()
+        self._aborted = threading.Event()
+        self._written = False
+        self._progress = None
+        self._notify_pending = False
+        self._progress_event = asyncio.Event()
+
+        self._future = loop.run_in_executor(
+            None, functools.partial(create_wheel,
+                                    build_dir=build_dir,
+                                    progress=self._on_progress,
+                                    abort=self._aborted,
+                                    **kwargs))
+        self._task = loop.create_task(self._wait())
+        self._task.add_done_callback(self._on_done)
+
+    @property
+    def progress(self) -> common.Progress | None:
+        """Latest progress"""
+        with self._lock:
+            return self._progress
+
+    def done(self) -> bool:
+        """Is wheel creation finished, failed or cancelled"""
+        return self._task.done()
+
+    def cancel(self):
+        """Abort wheel creation"""
+        self._task.cancel()
+
+    def __await__(self) -> typing.Generator[typing.Any, None, str]:
+        return self._task.__await__()
+
+    def __aiter__(self) -> typing.AsyncIterator[common.Progress]:
+        return self._iter_progress()
+
+    async def _wait(self) -> str:
+        try:
+            return await asyncio.shield(self._future)
+
+        except asyncio.CancelledError:
+            self._aborted.set()
+            await asyncio.wait([self._future])
+            self._remove_written()
+            raise
+
+        finally:
+            self._progress_event.set()
+
+    def _on_done(self, task: asyncio.Task):
+        # task cancelled before it started running does not execute
+        # `_wait`, so wheel creation is aborted without waiting for it
+        if not task.cancelled() or self._aborted.is_set():
+            return
+
+        self._aborted.set()
+        self._future.add_done_callback(lambda _: self._remove_written())
+        self._progress_event.set()
+
+    def _remove_written(self):
+        # wheel created before abort was noticed is also removed - progress
+        # is reported only if wheel is written (existing wheel is not
+        # reused)
+        if self._future.exception() or not self._written:
+            return
+
+        (self._build_dir / self._future.result()).unlink(missing_ok=True)
+
+    async def _iter_progress(self) -> typing.AsyncIterator[common.Progress]:
+        last_progress = None
+
+        while True:
+            self._progress_event.clear()
+
+            progress = self.progress
+            if progress is not None and progress != last_progress:
+                last_progress = progress
+                yield progress
+                continue
+
+            if self._task.done():
+                break
+
+            await self._progress_event.wait()
+
+    def _on_progress(self, progress: common.Progress):
+        # called from wheel creation thread
+        self._written = True
+        common.check_abort(self._aborted)
+
+        with self._lock:
+            self._progress = progress
+            if self._notify_pending:
+                return
+
+            self._notify_pending = True
+
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self):
+        with self._lock:
+            self._notify_pending = False
+
+        self._progress_event.set()
+
+
+def create_wheel_async(src_dir: Path,
+                       build_dir: Path,
+                       **kwargs
+                       ) -> WheelBuild:
+    """Start wheel creation in running event loop
+
+    Wheel is created by `mkwhl.wheel.create_wheel`, called with provided
+    arguments in event loop's default executor. Arguments `progress` and
+    `abort` are reserved for reporting progress to returned `WheelBuild`
+    and aborting wheel creation once it is cancelled.
+
+    To overlap reading and compression of multiple files, `executor`
+    argument can be provided. Single bounded executor can be shared
+    between concurrent builds to limit total number of worker threads.
+
+    """
+    return WheelBuild(loop=asyncio.get_running_loop(),
+                      build_dir=build_dir,
+                      kwargs={'src_dir': src_dir, **kwargs})
@@ -0,0 +1,557 @@
+"""Zip archive member compression and writing"""
+
+from pathlib import Path
+import copy
+import hashlib
+import io
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import typing
+import zipfile
+import zlib
+
+from mkwhl import common
+from mkwhl import stats as stats_
+
+
+chunk_size: int = 1024 * 1024
+"""Size of chunks used for reading and writing member content"""
+
+spool_size: int = 16 * 1024 * 1024
+"""Maximum size of compressed member data held in memory"""
+
+default_large_file_size: int = common.default_large_file_size
+"""Default minimum size of files read with large file I/O path"""
+
+compress_types: dict[str, int] = common.compress_types
+"""Supported compression types identified by name"""
+
+
+class Compression(typing.NamedTuple):
+    """Compression parameters of single member"""
+    compress_type: int
+    compress_level: int | None
+    min_ratio: float | None
+
+
+class CompressedData(typing.NamedTuple):
+    """Compressed member data
+
+    Attribute `data` is readable binary stream, positioned at the
+    beginning of compressed data, which should be closed once data is
+    written.
+
+    If `verify` is set, `data` is source file itself, which could be
+    modified after it was hashed - digest of data is verified against
+    `sha256` once it is written (see `write_compressed`).
+
+    """
+    compress_type: int
+    crc: int
+    sha256: bytes
+    size: int
+    compress_size: int
+    data: typing.BinaryIO
+    verify: bool = False
+
+
+def get_compression(policy: common.CompressionPolicy,
+                    path: Path,
+                    size: int
+                    ) -> Compression:
+    """Get compression parameters of member based on compression policy
+
+    Argument `path` is member path and `size` is uncompressed size.
+
+    """
+    if size < policy.min_size:
+        return Compression(compress_type=zipfile.ZIP_STORED,
+                           compress_level=None,
+                           min_ratio=None)
+
+    for rule in policy.rules:
+        if not path.match(rule.pattern):
+            continue
+
+        if rule.compress_type == zipfile.ZIP_STORED:
+            return Compression(compress_type=zipfile.ZIP_STORED,
+                               compress_level=None,
+                               min_ratio=None)
+
+        compress_level = (rule.compress_level
+                          if rule.compress_level is not None
+                          else policy.compress_level)
+        return Compression(compress_type=rule.compress_type,
+                           compress_level=compress_level,
+                           min_ratio=policy.min_ratio)
+
+    return Compression(compress_type=zipfile.ZIP_DEFLATED,
+                       compress_level=policy.compress_level,
+                       min_ratio=policy.min_ratio)
+
+
+def compress_file(path: Path,
+                  compress_type: int = zipfile.ZIP_DEFLATED,
+                  compress_level: int | None = None,
+                  min_ratio: float | None = None,
+                  spool_dir: Path | None = None,
+                  stats: stats_.Stats | None = None,
+                  large_file_size: int | None = default_large_file_size,
+                  abort: threading.Event | None = None
+                  ) -> CompressedData:
+    """Read, hash and compress file content
+
+    Compressed data larger than `spool_size` is stored in temporary file
+    created in `spool_dir`.
+
+    If `min_ratio` is not ``None`` and compressed size exceeds `min_ratio`
+    of original size, file content is stored without compression.
+
+    Files not smaller than `large_file_size` (if not ``None``) are memory
+    mapped and hashed and compressed directly from mapping, with kernel
+    advised that content is read sequentially and not needed once
+    compressed. Content of these files is not copied if it is stored
+    without compression - resulting data is file itself.
+
+    If content is stored without compression and is not copied (large
+    files and files exceeding `min_ratio`), resulting data has
+    `CompressedData.verify` set, so that file modified after it was
+    hashed is detected once it is written to archive.
+
+    If `stats` is provided, time spent reading, hashing and compressing and
+    number of bytes copied is recorded.
+
+    If `abort` is set while file is read, `mkwhl.common.AbortedError` is
+    raised.
+
+    """
+    if compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(
+            compress_level if compress_level is not None
+            else zlib.Z_DEFAULT_COMPRESSION,
+            zlib.DEFLATED, -15)
+
+    elif compress_type == zipfile.ZIP_STORED:
+        compressor = None
+
+    else:
+        raise ValueError('unsupported compression type')
+
+    data = None
+    try:
+        crc = 0
+        sha256 = hashlib.sha256()
+        size = 0
+
+        with open(path, 'rb') as f:
+            large = is_large_file(f, large_file_size)
+
+            # small files are spooled even if not compressed so that data
+            # is not affected by later file changes
+            if compressor or not large:
+                data = tempfile.SpooledTemporaryFile(max_size=spool_size,
+                                                     dir=spool_dir)
+
+            for chunk in read_chunks(f,
+                                     mapped=large,
+                                     drop_cache=large and bool(compressor),
+                                     stats=stats):
+                common.check_abort(abort)
+
+                with stats_.measure(stats, 'hash'):
+                    crc = zlib.crc32(chunk, crc)
+                    sha256.update(chunk)
+                size += len(chunk)
+
+                if data:
+                    with stats_.measure(stats, 'compress'):
+                        data.write(compressor.compress(chunk) if compressor
+                                   else chunk)
+
+        if compressor:
+            with stats_.measure(stats, 'compress'):
+                data.write(compressor.flush())
+
+        compress_size = data.tell() if data else size
+        if data:
+            data.seek(0)
+
+            if stats:
+                stats.add_copied(compress_size)
+
+    except BaseException:
+        if data:
+            data.close()
+        raise
+
+    if not data or (compressor and
+                    min_ratio is not None and
+                    compress_size > size * min_ratio):
+        if data:
+            data.close()
+
+        return CompressedData(compress_type=zipfile.ZIP_STORED,
+                              crc=crc,
+                              sha256=sha256.digest(),
+                              size=size,
+                              compress_size=size,
+                              data=open(path, 'rb'),
+                              verify=True)
+
+    return CompressedData(compress_type=compress_type,
+                          crc=crc,
+                          sha256=sha256.digest(),
+                          size=size,
+                          compress_size=compress_size,
+                          data=data)
+
+
+def read_chunks(f: typing.BinaryIO,
+                mapped: bool = False,
+                drop_cache: bool = False,
+                stats: stats_.Stats | None = None
+                ) -> typing.Iterator[bytes | memoryview]:
+    """Read file content from current position in chunks of `chunk_size`
+
+    If `mapped` is set, whole file is memory mapped and chunks are
+    `memoryview` slices of mapping, which are released once next chunk is
+    requested. Kernel is advised that file is read sequentially and, if
+    `drop_cache` is set, that its content is not needed once read.
+
+    If `stats` is provided, time spent reading and number of bytes copied
+    is recorded.
+
+    """
+    if not mapped:
+        while True:
+            with stats_.measure(stats, 'read'):
+                chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            if stats:
+                stats.add_copied(len(chunk))
+
+            yield chunk
+
+        return
+
+    _fadvise(f.fileno(), 0, 0, 'POSIX_FADV_SEQUENTIAL')
+
+    with stats_.measure(stats, 'read'):
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        advise = hasattr(mapping, 'madvise')
+        if advise:
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+
+        with memoryview(mapping) as view:
+            for i in range(f.tell(), len(view), chunk_size):
+                chunk = view[i:i + chunk_size]
+                try:
+                    yield chunk
+
+                finally:
+                    chunk.release()
+
+                # already read pages are unmapped so that they are not
+                # accounted as process resident memory
+                if advise:
+                    start = i - i % mmap.PAGESIZE
+                    mapping.madvise(mmap.MADV_DONTNEED, start,
+                                    i + chunk_size - start)
+
+    finally:
+        try:
+            mapping.close()
+
+        except BufferError:
+            # caller still references views of chunk (e.g. from traceback
+            # of exception raised while chunk was written) - mapping is
+            # unmapped once they are released
+            pass
+
+    if drop_cache:
+        _fadvise(f.fileno(), 0, 0, 'POSIX_FADV_DONTNEED')
+
+
+def is_large_file(f: typing.BinaryIO,
+                  large_file_size: int | None
+                  ) -> bool:
+    """Check if file should be read with large file I/O path
+
+    Empty files are never considered large.
+
+    """
+    if large_file_size is None:
+        return False
+
+    size = os.fstat(f.fileno()).st_size
+    return size > 0 and size >= large_file_size
+
+
+def write_compressed(whl: zipfile.ZipFile,
+                     zinfo: zipfile.ZipInfo,
+                     compressed: CompressedData,
+                     stats: stats_.Stats | None = None):
+    """Add already compressed member to archive
+
+    Compressed data is copied to archive without recompression. Member
+    timestamp, name and attributes are defined by `zinfo`. If both data
+    and archive are regular files, data is copied by kernel (see
+    `copy_data`).
+
+    If `compressed` has `CompressedData.verify` set, exception is raised
+    if digest of written data differs from `CompressedData.sha256`.
+
+    """
+    zinfo.compress_type = compressed.compress_type
+    zinfo.CRC = compressed.crc
+    zinfo.file_size = compressed.size
+    zinfo.compress_size = compressed.compress_size
+    zinfo.flag_bits = 0
+
+    _write_raw(whl, zinfo, compressed.data, stats,
+               compressed.sha256 if compressed.verify else None)
+
+
+def copy_member(src_whl: zipfile.ZipFile,
+                zinfo: zipfile.ZipInfo,
+                dst_whl: zipfile.ZipFile,
+                stats: stats_.Stats | None = None):
+    """Copy member between archives without decompression
+
+    Compressed data, CRC, sizes, timestamp and attributes of `src_whl`
+    member `zinfo` are preserved.
+
+    """
+    if zinfo.flag_bits & 0x01:
+        raise ValueError('encrypted members are not supported')
+
+    # compressed data starts after local file header whose name and extra
+    # field lengths can differ from central directory
+    src_whl.fp.seek(zinfo.header_offset)
+    header = src_whl.fp.read(zipfile.sizeFileHeader)
+    if (len(header) != zipfile.sizeFileHeader or
+            header[:4] != zipfile.stringFileHeader):
+        raise zipfile.BadZipFile('invalid local file header')
+
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    src_whl.fp.seek(zinfo.header_offset + zipfile.sizeFileHeader +
+                    name_len + extra_len)
+
+    dst_zinfo = copy.copy(zinfo)
+    dst_zinfo.flag_bits = 0
+    # zip64 extra field is regenerated based on sizes and offset
+    dst_zinfo.extra = zipfile._strip_extra(zinfo.extra, (0x0001,))
+
+    _write_raw(dst_whl, dst_zinfo, src_whl.fp, stats, None)
+
+
+def copy_data(src: typing.BinaryIO,
+              dst: typing.BinaryIO,
+              size: int,
+              stats: stats_.Stats | None = None,
+              sha256: bytes | None = None):
+    """Copy `size` bytes from current position of `src` to `dst`
+
+    If both streams are seekable regular file objects, data is copied by
+    kernel with ``os.copy_file_range`` (or ``os.sendfile`` if not
+    supported) without passing through user space buffers. Otherwise,
+    data is copied in chunks.
+
+    If `sha256` is provided, exception is raised if digest of copied data
+    differs (`src` was modified while copied). Data copied by kernel is
+    hashed from memory mapping of `dst`, usually without reading it from
+    disk again - if `dst` is not readable, data is copied in chunks.
+
+    """
+    name = getattr(src, 'name', 'data')
+    hash_obj = hashlib.sha256() if sha256 is not None else None
+
+    if (size > 0 and _is_file(src) and _is_file(dst) and
+            (hash_obj is None or dst.readable())):
+        dst.flush()
+        src_offset = src.tell()
+        dst_offset = dst.tell()
+
+        copied = _copy_file_range(src_fd=src.fileno(),
+                                  dst_fd=dst.fileno(),
+                                  src_offset=src_offset,
+                                  dst_offset=dst_offset,
+                                  size=size)
+
+        if copied >= spool_size:
+            _fadvise(src.fileno(), src_offset, copied,
+                     'POSIX_FADV_DONTNEED')
+
+        if hash_obj and copied:
+            _hash_range(update=hash_obj.update,
+                        fd=dst.fileno(),
+                        offset=dst_offset,
+                        size=copied,
+                        stats=stats)
+
+        src.seek(src_offset + copied)
+        dst.seek(dst_offset + copied)
+        size -= copied
+
+    while size > 0:
+        chunk = src.read(min(chunk_size, size))
+        if not chunk:
+            if hash_obj:
+                raise Exception(f"{name} changed while being copied")
+
+            raise EOFError('unexpected end of data')
+
+        if hash_obj:
+            hash_obj.update(chunk)
+
+        dst.write(chunk)
+        size -= len(chunk)
+
+        if stats:
+            stats.add_copied(2 * len(chunk))
+
+    if hash_obj and hash_obj.digest() != sha256:
+        raise Exception(f"{name} changed while being copied")
+
+
+def _is_file(f: typing.BinaryIO) -> bool:
+    return (isinstance(f, (io.BufferedReader, io.BufferedWriter,
+                           io.BufferedRandom, io.FileIO)) and
+            f.seekable())
+
+
+def _hash_range(update: typing.Callable[[bytes | memoryview], None],
+                fd: int,
+                offset: int,
+                size: int,
+                stats: stats_.Stats | None):
+    # mapping offset has to be multiple of allocation granularity
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+
+    try:
+        mapping = mmap.mmap(fd, offset + size - start,
+                            access=mmap.ACCESS_READ, offset=start)
+
+    except (OSError, ValueError):
+        mapping = None
+
+    if mapping is None:
+        while size > 0:
+            chunk = os.pread(fd, min(chunk_size, size), offset)
+            if not chunk:
+                raise EOFError('unexpected end of data')
+
+            update(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+
+            if stats:
+                stats.add_copied(len(chunk))
+
+        return
+
+    with mapping:
+        advise = hasattr(mapping, 'madvise')
+
+        with memoryview(mapping) as view:
+            for i in range(offset - start, len(view), chunk_size):
+                with view[i:i + chunk_size] as chunk:
+                    update(chunk)
+
+                # already hashed pages are unmapped so that they are not
+                # accounted as process resident memory
+                if advise:
+                    page_start = i - i % mmap.PAGESIZE
+                    mapping.madvise(mmap.MADV_DONTNEED, page_start,
+                                    i + chunk_size - page_start)
+
+
+def _copy_file_range(src_fd: int,
+                     dst_fd: int,
+                     src_offset: int,
+                     dst_offset: int,
+                     size: int
+                     ) -> int:
+    copied = 0
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                count = os.copy_file_range(src_fd, dst_fd, size - copied,
+                                           src_offset + copied,
+                                           dst_offset + copied)
+                if not count:
+                    break
+
+                copied += count
+
+            return copied
+
+        except OSError:
+            pass
+
+    if hasattr(os, 'sendfile'):
+        try:
+            # sendfile writes at current position of destination
+            os.lseek(dst_fd, dst_offset + copied, os.SEEK_SET)
+
+            while copied < size:
+                count = os.sendfile(dst_fd, src_fd, src_offset + copied,
+                                    size - copied)
+                if not count:
+                    break
+
+                copied += count
+
+        except OSError:
+            pass
+
+    return copied
+
+
+def _fadvise(fd: int,
+             offset: int,
+             length: int,
+             advice: str):
+    if not hasattr(os, 'posix_fadvise'):
+        return
+
+    try:
+        os.posix_fadvise(fd, offset, length, getattr(os, advice))
+
+    except OSError:
+        pass
+
+
+def _write_raw(whl: zipfile.ZipFile,
+               zinfo: zipfile.ZipInfo,
+               data: typing.BinaryIO,
+               stats: stats_.Stats | None,
+               sha256: bytes | None):
+    # zipfile does not provide public API for adding already compressed
+    # members - this mirrors `ZipFile.open(..., 'w')` with data written
+    # directly to underlying file
+    with whl._lock:
+        if whl._writing:
+            raise ValueError("archive is already being written")
+
+        whl._writecheck(zinfo)
+        whl._didModify = True
+
+        if whl._seekable:
+            whl.fp.seek(whl.start_dir)
+        zinfo.header_offset = whl.fp.tell()
+
+        whl.fp.write(zinfo.FileHeader())
+        copy_data(data, whl.fp, zinfo.compress_size, stats, sha256)
+
+        whl.filelist.append(zinfo)
+        whl.NameToInfo[zinfo.filename] = zinfo
+        whl.start_dir = whl.fp.tell()
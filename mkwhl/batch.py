@@ -0,0 +1,161 @@
+"""Concurrent building of multiple projects"""
+
+from pathlib import Path
+import concurrent.futures
+import concurrent.futures.process
+import os
+import time
+import traceback
+import typing
+
+from mkwhl import build
+
+
+class BuildResult(typing.NamedTuple):
+    """Single project build result
+
+    If build failed, `wheel_name` is ``None`` and `error` contains error
+    description.
+
+    """
+    project_dir: Path
+    wheel_name: str | None
+    error: str | None
+    duration: float
+
+
+def find_projects(root_dir: Path,
+                  patterns: typing.Iterable[str]
+                  ) -> list[Path]:
+    """Find project directories
+
+    Patterns are `pathlib.Path.glob` patterns applied to `root_dir`. Each
+    matching directory containing ``pyproject.toml`` is considered project
+    directory. Resulting list is sorted.
+
+    """
+    project_dirs = set()
+
+    for pattern in patterns:
+        for path in root_dir.glob(pattern):
+            if (path / 'pyproject.toml').is_file():
+                project_dirs.add(path)
+
+    return sorted(project_dirs)
+
+
+def create_wheels(project_dirs: typing.Iterable[Path],
+                  build_dir: Path | None = None,
+                  *,
+                  editable: bool = False,
+                  processes: int | None = None
+                  ) -> list[BuildResult]:
+    """Build wheels of multiple projects concurrently
+
+    Each project is built in its own directory, based on its
+    ``pyproject.toml``, same as with build backend (see
+    `mkwhl.build.build_wheel`). Resulting wheels are created in
+    `build_dir` or, if `build_dir` is ``None``, in ``build`` directory of
+    each project.
+
+    Projects are built in pool of at most `processes` worker processes
+    (defaults to number of CPUs). Results are returned in same order as
+    `project_dirs`. Failure of single project build does not affect other
+    builds. If worker process terminates abruptly, pool is broken and its
+    unfinished builds are repeated, each in its own worker process, so
+    that only build which terminated worker process is reported as failed.
+
+    """
+    project_dirs = [Path(i).resolve() for i in project_dirs]
+    if build_dir is not None:
+        build_dir = build_dir.resolve()
+
+    if not project_dirs:
+        return []
+
+    max_workers = min(processes or os.cpu_count() or 1, len(project_dirs))
+    args = [{'project_dir': project_dir,
+             'build_dir': (build_dir if build_dir is not None
+                           else project_dir / 'build'),
+             'editable': editable}
+            for project_dir in project_dirs]
+    results = [None] * len(project_dirs)
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers) as executor:
+        futures = [executor.submit(_build_project, **i) for i in args]
+
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+
+            except concurrent.futures.process.BrokenProcessPool:
+                pass
+
+            except Exception as e:
+                results[i] = BuildResult(project_dir=project_dirs[i],
+                                         wheel_name=None,
+                                         error=_format_error(e),
+                                         duration=0)
+
+    retry = [i for i, result in enumerate(results) if result is None]
+    if retry:
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(max_workers, len(retry))) as executor:
+            for i, result in zip(retry, executor.map(
+                    lambda i: _build_project_isolated(**args[i]), retry)):
+                results[i] = result
+
+    return results
+
+
+def _build_project_isolated(project_dir: Path,
+                            build_dir: Path,
+                            editable: bool
+                            ) -> BuildResult:
+    start = time.monotonic()
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1) as executor:
+            return executor.submit(_build_project,
+                                   project_dir=project_dir,
+                                   build_dir=build_dir,
+                                   editable=editable).result()
+
+    except Exception as e:
+        return BuildResult(project_dir=project_dir,
+                           wheel_name=None,
+                           error=_format_error(e),
+                           duration=time.monotonic() - start)
+
+
+def _build_project(project_dir: Path,
+                   build_dir: Path,
+                   editable: bool
+                   ) -> BuildResult:
+    start = time.monotonic()
+
+    try:
+        os.chdir(project_dir)
+
+        if editable:
+            wheel_name = build.build_editable(str(build_dir))
+
+        else:
+            wheel_name = build.build_wheel(str(build_dir))
+
+        error = None
+
+    except Exception as e:
+        wheel_name = None
+        error = _format_error(e)
+
+    return BuildResult(project_dir=project_dir,
+                       wheel_name=wheel_name,
+                       error=error,
+                       duration=time.monotonic() - start)
+
+
+def _format_error(e: Exception) -> str:
+    return ''.join(traceback.format_exception_only(e)).strip()
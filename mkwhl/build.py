@@ -2,10 +2,20 @@
 
 from pathlib import Path
 import collections
+import json
+import os
+import sys
 import typing
 
 from mkwhl import common
-from mkwhl.wheel import create_wheel
+from mkwhl import config
+
+
+conf_cache_dir_env: str = 'MKWHL_CONF_CACHE_DIR'
+"""Environment variable defining pyproject configuration cache directory"""
+
+stats_config_setting: str = 'stats'
+"""Config settings key defining path of JSON build statistics file"""
 
 
 class UnsupportedOperation(Exception):
@@ -18,7 +28,10 @@ def build_wheel(wheel_directory: str,
                 ) -> str:
     """Build wheel (PEP517)"""
     return _build_wheel(build_dir=Path(wheel_directory),
-                        editable=False)
+                        editable=False,
+                        metadata_dir=(Path(metadata_directory)
+                                      if metadata_directory else None),
+                        config_settings=config_settings)
 
 
 def build_editable(wheel_directory: str,
@@ -27,14 +40,59 @@ def build_editable(wheel_directory: str,
                    ) -> str:
     """Build editable wheel (PEP660)"""
     return _build_wheel(build_dir=Path(wheel_directory),
-                        editable=True)
+                        editable=True,
+                        metadata_dir=(Path(metadata_directory)
+                                      if metadata_directory else None),
+                        config_settings=config_settings)
 
 
 def build_sdist(sdist_directory: str,
                 config_settings: typing.Any = None
                 ) -> str:
     """Build source distribution (PEP517)"""
-    raise UnsupportedOperation()
+    from mkwhl.sdist import create_sdist
+
+    conf = _get_config()
+    tool_conf = conf.tool
+
+    src_dir = _get_src_dir(tool_conf)
+    license_path = tool_conf.get('license-path')
+    src_include_patterns = tool_conf.get('src-include-patterns',
+                                         ['**/*'])
+    src_exclude_patterns = tool_conf.get('src-exclude-patterns',
+                                         ['**/__pycache__/**/*'])
+    data_paths = tool_conf.get('data-paths', [])
+    jobs = _get_jobs(tool_conf)
+    compress_level = tool_conf.get('compress-level')
+
+    if license_path is not None:
+        license_path = Path(license_path)
+
+    data_paths = [_get_data_path(i) for i in data_paths]
+
+    return create_sdist(src_dir=src_dir,
+                        build_dir=Path(sdist_directory),
+                        conf=conf,
+                        license_path=license_path,
+                        src_include_patterns=src_include_patterns,
+                        src_exclude_patterns=src_exclude_patterns,
+                        data_paths=data_paths,
+                        jobs=jobs,
+                        compress_level=compress_level)
+
+
+def prepare_metadata_for_build_wheel(metadata_directory: str,
+                                     config_settings: typing.Any = None
+                                     ) -> str:
+    """Prepare wheel metadata (PEP517)"""
+    return _prepare_metadata(metadata_dir=Path(metadata_directory))
+
+
+def prepare_metadata_for_build_editable(metadata_directory: str,
+                                        config_settings: typing.Any = None
+                                        ) -> str:
+    """Prepare editable wheel metadata (PEP660)"""
+    return _prepare_metadata(metadata_dir=Path(metadata_directory))
 
 
 def get_requires_for_build_wheel(config_settings: typing.Any = None
@@ -50,57 +108,142 @@ def get_requires_for_build_editable(config_settings: typing.Any = None
 
 
 def _build_wheel(build_dir: Path,
-                 editable: bool
+                 editable: bool,
+                 metadata_dir: Path | None,
+                 config_settings: typing.Any
                  ) -> str:
-    conf = common.get_conf()
-    tool_conf = conf.get('tool', {}).get('mkwhl', {})
+    # heavy modules are imported only when needed - build frontends import
+    # backend and call `get_requires_for_build_wheel` in separate process
+    from mkwhl import archive
+    from mkwhl import cache
+    from mkwhl import stats
+    from mkwhl.wheel import create_wheel
 
-    src_dir = tool_conf.get('src-dir')
+    conf = _get_config()
+    tool_conf = conf.tool
+
+    src_dir = _get_src_dir(tool_conf)
     license_path = tool_conf.get('license-path')
     src_include_patterns = tool_conf.get('src-include-patterns',
                                          ['**/*'])
     src_exclude_patterns = tool_conf.get('src-exclude-patterns',
                                          ['**/__pycache__/**/*'])
     data_paths = tool_conf.get('data-paths', [])
+    precompile = tool_conf.get('precompile', False)
+    precompile_optimize = tool_conf.get('precompile-optimize', 0)
+    precompile_python = tool_conf.get('precompile-python')
     build_tag = tool_conf.get('build-tag')
     python_tag = tool_conf.get('python-tag', 'py3')
     abi_tag = tool_conf.get('abi-tag', 'none')
     platform_tag = tool_conf.get('platform-tag', 'any')
     is_purelib = tool_conf.get('is-purelib', True)
-
-    if src_dir is None:
-        for i in [Path('src_py'), Path('src')]:
-            if i.is_dir():
-                src_dir = i
-                break
-        else:
-            raise Exception('cound not detect src dir')
-    else:
-        src_dir = Path(src_dir)
+    jobs = _get_jobs(tool_conf)
+    editable_finder = tool_conf.get('editable-finder', False)
+    cache_dir = tool_conf.get('cache-dir')
+    cache_size = tool_conf.get('cache-size', cache.default_max_size)
+    compress_level = tool_conf.get('compress-level')
+    compression_rules = tool_conf.get('compression-rules', [])
+    compress_min_size = tool_conf.get('compress-min-size', 0)
+    compress_min_ratio = tool_conf.get('compress-min-ratio')
+    large_file_size = tool_conf.get('large-file-size',
+                                    archive.default_large_file_size)
+    reproducible = tool_conf.get('reproducible', False)
+    incremental = tool_conf.get('incremental', False)
+    lock = tool_conf.get('lock', False)
 
     if license_path is not None:
         license_path = Path(license_path)
 
-    data_paths = [(Path(i['src']), Path(i['dst'])) for i in data_paths]
+    data_paths = [_get_data_path(i) for i in data_paths]
 
-    return create_wheel(src_dir=src_dir,
-                        build_dir=build_dir,
-                        license_path=license_path,
-                        editable=editable,
-                        src_include_patterns=src_include_patterns,
-                        src_exclude_patterns=src_exclude_patterns,
-                        data_paths=data_paths,
-                        build_tag=build_tag,
-                        python_tag=python_tag,
-                        abi_tag=abi_tag,
-                        platform_tag=platform_tag,
-                        is_purelib=is_purelib)
+    if precompile_python is not None:
+        precompile_python = Path(precompile_python)
+
+    compression = common.CompressionPolicy(
+        compress_level=compress_level,
+        rules=[common.CompressionRule(
+                pattern=i['pattern'],
+                compress_type=archive.compress_types[i['type']],
+                compress_level=i.get('level'))
+               for i in compression_rules],
+        min_size=compress_min_size,
+        min_ratio=compress_min_ratio)
+
+    stats_path = (config_settings or {}).get(stats_config_setting)
+    build_stats = stats.Stats() if stats_path else None
+
+    entry_cache = (cache.Cache(Path(cache_dir), cache_size)
+                   if cache_dir is not None else None)
+
+    wheel_name = create_wheel(src_dir=src_dir,
+                              build_dir=build_dir,
+                              license_path=license_path,
+                              editable=editable,
+                              editable_finder=editable_finder,
+                              src_include_patterns=src_include_patterns,
+                              src_exclude_patterns=src_exclude_patterns,
+                              data_paths=data_paths,
+                              precompile=precompile,
+                              precompile_optimize=precompile_optimize,
+                              precompile_python=precompile_python,
+                              build_tag=build_tag,
+                              python_tag=python_tag,
+                              abi_tag=abi_tag,
+                              platform_tag=platform_tag,
+                              is_purelib=is_purelib,
+                              jobs=jobs,
+                              cache=entry_cache,
+                              compression=compression,
+                              large_file_size=large_file_size,
+                              dist_info_dir=metadata_dir,
+                              stats=build_stats,
+                              reproducible=reproducible,
+                              incremental=incremental,
+                              lock=lock,
+                              conf=conf)
+
+    if entry_cache:
+        print(f"cache: {entry_cache.hits} hits, {entry_cache.misses} misses",
+              file=sys.stderr)
+
+    if build_stats:
+        Path(stats_path).write_text(json.dumps(build_stats.get_report(),
+                                               indent=2),
+                                    'utf-8')
+
+    return wheel_name
+
+
+def _prepare_metadata(metadata_dir: Path) -> str:
+    from mkwhl.wheel import create_dist_info
+
+    conf = _get_config()
+    tool_conf = conf.tool
+
+    license_path = tool_conf.get('license-path')
+    build_tag = tool_conf.get('build-tag')
+    python_tag = tool_conf.get('python-tag', 'py3')
+    abi_tag = tool_conf.get('abi-tag', 'none')
+    platform_tag = tool_conf.get('platform-tag', 'any')
+    is_purelib = tool_conf.get('is-purelib', True)
+
+    if license_path is not None:
+        license_path = Path(license_path)
+
+    return create_dist_info(metadata_dir=metadata_dir,
+                            license_path=license_path,
+                            build_tag=build_tag,
+                            python_tag=python_tag,
+                            abi_tag=abi_tag,
+                            platform_tag=platform_tag,
+                            is_purelib=is_purelib,
+                            conf=conf)
 
 
 def _get_requires() -> list[str]:
-    conf = common.get_conf()
-    project_conf = conf.get('project', {})
-    tool_conf = conf.get('tool', {}).get('mkwhl', {})
+    conf = _get_config()
+    project_conf = conf.project.conf if conf.project else {}
+    tool_conf = conf.tool
 
     dependencies = collections.deque(project_conf.get('dependencies', []))
 
@@ -109,3 +252,38 @@ def _get_requires() -> list[str]:
             project_conf.get('optional-dependencies', {}).get(i, []))
 
     return list(dependencies)
+
+
+def _get_src_dir(tool_conf: dict[str, typing.Any]) -> Path:
+    src_dir = tool_conf.get('src-dir')
+    if src_dir is not None:
+        return Path(src_dir)
+
+    for i in [Path('src_py'), Path('src')]:
+        if i.is_dir():
+            return i
+
+    raise Exception('cound not detect src dir')
+
+
+def _get_jobs(tool_conf: dict[str, typing.Any]) -> int:
+    jobs = tool_conf.get('jobs', 1)
+    if not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 1:
+        raise Exception(f'invalid jobs: {jobs!r} (expected positive integer)')
+
+    return jobs
+
+
+def _get_data_path(data_conf: dict[str, typing.Any]) -> common.DataPath:
+    return common.DataPath(
+        src=Path(data_conf['src']),
+        dst=Path(data_conf['dst']),
+        scheme=data_conf.get('scheme', 'data'),
+        include_patterns=data_conf.get('include-patterns', ['**/*']),
+        exclude_patterns=data_conf.get('exclude-patterns', []))
+
+
+def _get_config() -> common.Config:
+    cache_dir = os.environ.get(conf_cache_dir_env)
+    return config.get_config(cache_dir=(Path(cache_dir) if cache_dir
+                                        else None))
@@ -0,0 +1,159 @@
+"""Bytecode precompilation"""
+
+from pathlib import Path
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import threading
+import typing
+
+from mkwhl import common
+
+
+_abort_poll_interval: float = 0.1
+
+# executed by target interpreter which is not required to have mkwhl
+# installed - result is list of cache paths (``None`` if compilation failed)
+_worker_code: str = r"""
+import importlib.util
+import json
+import os
+import py_compile
+import sys
+
+params = json.load(sys.stdin)
+dst_dir = params['dst_dir']
+optimize = params['optimize']
+result = []
+
+for path, src_path in params['paths']:
+    cache_path = importlib.util.cache_from_source(
+        path, optimization=(optimize if optimize else ''))
+    try:
+        py_compile.compile(
+            src_path,
+            cfile=os.path.join(dst_dir, cache_path),
+            dfile=path,
+            doraise=True,
+            optimize=optimize,
+            invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+        result.append(cache_path)
+
+    except py_compile.PyCompileError:
+        result.append(None)
+
+json.dump(result, sys.stdout)
+"""
+
+
+def compile_files(paths: typing.Iterable[tuple[Path, Path]],
+                  dst_dir: Path,
+                  *,
+                  optimize: int = 0,
+                  python: Path | None = None,
+                  processes: int | None = None,
+                  abort: threading.Event | None = None
+                  ) -> list[tuple[Path, Path]]:
+    """Compile python sources to bytecode
+
+    Argument `paths` contains (path, source path) pairs, where path is
+    relative path of source file in installed package (e.g. wheel member
+    path). For each successfully compiled source, bytecode is written to
+    `dst_dir` at location relative to `dst_dir` same as location of
+    ``__pycache__`` entry relative to installed source. Resulting list
+    contains (cache path, bytecode path) pairs in same order as `paths`.
+    Sources which can not be compiled are skipped.
+
+    Sources are compiled by target interpreter `python` (defaults to
+    current interpreter) with optimization level `optimize`. Bytecode is
+    hash based (checked), so it remains valid regardless of modification
+    time of installed sources.
+
+    Compilation is done by pool of at most `processes` worker processes
+    (defaults to number of CPUs). Each worker process compiles batch of
+    sources with similar total size.
+
+    If `abort` is set during compilation, worker processes are killed and
+    `mkwhl.common.AbortedError` is raised.
+
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+
+    processes = min(processes or os.cpu_count() or 1, len(paths))
+    batches = [[] for _ in range(processes)]
+    batch_sizes = [0] * processes
+    sizes = [src_path.stat().st_size for _, src_path in paths]
+
+    # sources are assigned largest first to least loaded batch
+    for i in sorted(range(len(paths)), key=sizes.__getitem__, reverse=True):
+        batch = min(range(processes), key=batch_sizes.__getitem__)
+        batches[batch].append(i)
+        batch_sizes[batch] += sizes[i]
+
+    results = [None] * len(paths)
+
+    # threads only wait for worker processes
+    with concurrent.futures.ThreadPoolExecutor(processes) as executor:
+        futures = [(batch, executor.submit(_run_worker,
+                                           paths=[paths[i] for i in batch],
+                                           dst_dir=dst_dir,
+                                           optimize=optimize,
+                                           python=python,
+                                           abort=abort))
+                   for batch in batches]
+
+        for batch, future in futures:
+            for i, cache_path in zip(batch, future.result()):
+                results[i] = cache_path
+
+    return [(Path(cache_path), dst_dir / cache_path)
+            for cache_path in results
+            if cache_path is not None]
+
+
+def _run_worker(paths: list[tuple[Path, Path]],
+                dst_dir: Path,
+                optimize: int,
+                python: Path | None,
+                abort: threading.Event | None
+                ) -> list[str | None]:
+    params = {'dst_dir': str(dst_dir),
+              'optimize': optimize,
+              'paths': [[path.as_posix(), str(src_path)]
+                        for path, src_path in paths]}
+
+    # isolated mode prevents shadowing of standard modules by sources in
+    # current working directory
+    with subprocess.Popen([str(python or sys.executable), '-I', '-c',
+                           _worker_code],
+                          stdin=subprocess.PIPE,
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          text=True) as process:
+        stdin = json.dumps(params)
+
+        try:
+            # process is polled so that abort is noticed during compilation
+            while True:
+                try:
+                    stdout, stderr = process.communicate(
+                        stdin, timeout=_abort_poll_interval)
+                    break
+
+                except subprocess.TimeoutExpired:
+                    stdin = None
+                    common.check_abort(abort)
+
+        except BaseException:
+            process.kill()
+            raise
+
+    if process.returncode:
+        raise Exception(f"bytecode compilation failed: "
+                        f"{stderr.strip()}")
+
+    return json.loads(stdout)
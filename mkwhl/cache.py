@@ -0,0 +1,257 @@
+"""Persistent cache of compressed wheel members"""
+
+from pathlib import Path
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+
+from mkwhl import archive
+from mkwhl import common
+from mkwhl import fs
+from mkwhl import stats as stats_
+
+
+default_max_size: int = common.default_cache_size
+"""Default maximum size of cached compressed data"""
+
+max_entry_ratio: float = 0.25
+"""Maximum ratio of cache maximum size occupied by single entry - larger
+compressed data is not cached"""
+
+orphan_age: float = 60 * 60
+"""Minimum age (in seconds since last modification) of files not
+referenced by cache index which are removed during `Cache.flush`"""
+
+
+class Cache:
+    """Persistent cache of compressed wheel members
+
+    Cache entries are stored in `path` directory and are identified by
+    source file path, size, modification time, inode and compression
+    parameters. Each entry contains SHA-256 and CRC32 of source file
+    content together with compressed content which can be added to archive
+    without additional compression.
+
+    Once total size of cached data exceeds `max_size`, least recently used
+    entries are removed during `flush`. Compressed data larger than
+    `max_entry_ratio` of `max_size` is not cached, so that single large
+    member does not evict all other entries. Content of large files stored
+    without compression (see `mkwhl.archive.compress_file`) is not cached
+    either, because reading it from source file is not more expensive than
+    reading it from cache. Same cache directory can be used by multiple
+    concurrent processes.
+
+    """
+
+    def __init__(self,
+                 path: Path,
+                 max_size: int = default_max_size):
+        self._path = path
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._used = set()
+        self._hits = 0
+        self._misses = 0
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._entries = self._read_index()
+
+    @property
+    def path(self) -> Path:
+        """Cache directory path"""
+        return self._path
+
+    @property
+    def max_size(self) -> int:
+        """Maximum size of cached compressed data"""
+        return self._max_size
+
+    @property
+    def hits(self) -> int:
+        """Number of cache hits"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of cache misses"""
+        return self._misses
+
+    @property
+    def _index_path(self) -> Path:
+        return self._path / 'index.json'
+
+    @property
+    def _lock_path(self) -> Path:
+        return self._path / 'index.lock'
+
+    def compress_file(self,
+                      path: Path,
+                      compress_type: int = zipfile.ZIP_DEFLATED,
+                      compress_level: int | None = None,
+                      min_ratio: float | None = None,
+                      spool_dir: Path | None = None,
+                      stats: stats_.Stats | None = None,
+                      large_file_size: int | None = archive.default_large_file_size,  # NOQA
+                      abort: threading.Event | None = None
+                      ) -> archive.CompressedData:
+        """Get cached compressed data or compress and cache file content
+
+        Arguments are same as for `mkwhl.archive.compress_file`.
+
+        """
+        with stats_.measure(stats, 'cache'):
+            key = _get_key(path, (compress_type, compress_level, min_ratio))
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self._used.add(key)
+
+            if entry is not None:
+                try:
+                    data = open(self._path / key, 'rb')
+
+                except FileNotFoundError:
+                    entry = None
+
+        if entry is not None:
+            with self._lock:
+                self._hits += 1
+
+            return archive.CompressedData(
+                compress_type=entry['compress_type'],
+                crc=entry['crc'],
+                sha256=bytes.fromhex(entry['sha256']),
+                size=entry['size'],
+                compress_size=entry['compress_size'],
+                data=data)
+
+        compressed = archive.compress_file(path=path,
+                                           compress_type=compress_type,
+                                           compress_level=compress_level,
+                                           min_ratio=min_ratio,
+                                           spool_dir=spool_dir,
+                                           stats=stats,
+                                           large_file_size=large_file_size,
+                                           abort=abort)
+
+        if (compressed.verify or
+                compressed.compress_size > self._max_size * max_entry_ratio):
+            with self._lock:
+                self._misses += 1
+
+            return compressed
+
+        try:
+            with stats_.measure(stats, 'cache'):
+                with tempfile.NamedTemporaryFile(dir=self._path,
+                                                 delete=False) as f:
+                    archive.copy_data(src=compressed.data,
+                                      dst=f.file,
+                                      size=compressed.compress_size,
+                                      stats=stats)
+
+                os.replace(f.name, self._path / key)
+                compressed.data.seek(0)
+
+        except BaseException:
+            compressed.data.close()
+            raise
+
+        with self._lock:
+            self._misses += 1
+            self._used.add(key)
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                'compress_type': compressed.compress_type,
+                'crc': compressed.crc,
+                'sha256': compressed.sha256.hex(),
+                'size': compressed.size,
+                'compress_size': compressed.compress_size}
+
+        return compressed
+
+    def flush(self):
+        """Remove least recently used entries and write cache index
+
+        While holding cache directory lock (see `mkwhl.fs.lock`), index
+        is merged with index written by other processes since it was read -
+        entries used by this instance are added to those entries as most
+        recently used. Files not referenced by resulting index, which were
+        not modified for `orphan_age` seconds (left by interrupted or
+        concurrent builds), are removed.
+
+        """
+        with fs.lock(self._lock_path):
+            entries = self._read_index()
+
+            with self._lock:
+                for key, entry in self._entries.items():
+                    if key in self._used:
+                        entries.pop(key, None)
+                        entries[key] = entry
+
+                total_size = sum(entry['compress_size']
+                                 for entry in entries.values())
+
+                while entries and total_size > self._max_size:
+                    key, entry = entries.popitem(last=False)
+                    total_size -= entry['compress_size']
+                    (self._path / key).unlink(missing_ok=True)
+
+                self._entries = entries
+                self._used = set()
+                index = list(entries.items())
+
+            _remove_orphans(self._path,
+                            {*entries, self._index_path.name,
+                             self._lock_path.name})
+
+            with fs.write_atomic(self._index_path) as f:
+                f.write(json.dumps(index).encode('utf-8'))
+
+    def _read_index(self) -> collections.OrderedDict[str, dict]:
+        entries = collections.OrderedDict()
+
+        try:
+            index = json.loads(self._index_path.read_text('utf-8'))
+            for key, entry in index:
+                entries[key] = entry
+
+        except (FileNotFoundError, ValueError):
+            pass
+
+        return entries
+
+
+def _remove_orphans(path: Path, names: set[str]):
+    min_mtime = time.time() - orphan_age
+
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name in names:
+                continue
+
+            try:
+                if (entry.is_file(follow_symlinks=False) and
+                        entry.stat(follow_symlinks=False).st_mtime <
+                        min_mtime):
+                    os.unlink(entry.path)
+
+            except FileNotFoundError:
+                pass
+
+
+def _get_key(path: Path,
+             compression: tuple
+             ) -> str:
+    stat = path.stat()
+    identity = (str(path.resolve()), stat.st_size, stat.st_mtime_ns,
+                stat.st_ino, compression)
+    return hashlib.sha256(repr(identity).encode('utf-8')).hexdigest()
@@ -3,21 +3,48 @@
 from pathlib import Path
 import base64
 import datetime
+import itertools
+import os
 import re
+import signal
 import sys
+import threading
 import typing
 
-import packaging.tags
-import packaging.version
 
-if sys.version_info[:2] >= (3, 11):
-    import tomllib as toml
-else:
-    import tomli as toml
+now: datetime.datetime
+"""Time instance of first access to this attribute
 
+Evaluated lazily (together with other heavy dependencies such as
+`packaging` and TOML parser) so that importing this module stays cheap.
+If ``SOURCE_DATE_EPOCH`` environment variable is set, its value is used
+instead of current time.
 
-now: datetime.datetime = datetime.datetime.now()
-"""Time instance of module loading"""
+"""
+
+default_large_file_size: int = 64 * 1024 * 1024
+"""Default minimum size of files read with large file I/O path (see
+`mkwhl.archive.compress_file`)"""
+
+default_cache_size: int = 1024 * 1024 * 1024
+"""Default maximum size of cached compressed data (see `mkwhl.cache.Cache`)"""
+
+# values are same as `zipfile.ZIP_STORED` and `zipfile.ZIP_DEFLATED` -
+# zipfile is not imported so that command line client stays cheap
+compress_types: dict[str, int] = {'stored': 0,
+                                  'deflated': 8}
+"""Supported compression types identified by name"""
+
+data_schemes: list[str] = ['data', 'scripts', 'headers', 'purelib',
+                           'platlib']
+"""Install schemes supported as wheel data directory subdirectories"""
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name == 'now':
+        return _get_now()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class EntryPointsProps(typing.NamedTuple):
@@ -58,6 +85,39 @@ class WheelProps(typing.NamedTuple):
     build: int | None
 
 
+class TagSet(typing.NamedTuple):
+    """Wheel tag set"""
+    python_tag: str
+    abi_tag: str
+    platform_tag: str
+    build_tag: int | None = None
+
+
+class DataPath(typing.NamedTuple):
+    """Data path included in wheel data directory
+
+    If `src` is file, it is included as `dst`. If `src` is directory, all
+    files matching at least one of `include_patterns` and not matching any
+    of `exclude_patterns` (`pathlib.Path.glob` patterns applied to `src`)
+    are included in `dst` directory, preserving their paths relative to
+    `src`. Destination path is relative to `scheme` subdirectory of wheel
+    data directory (see `data_schemes`).
+
+    """
+    src: Path
+    dst: Path
+    scheme: str = 'data'
+    include_patterns: list[str] = ['**/*']
+    exclude_patterns: list[str] = []
+
+
+class WheelOutput(typing.NamedTuple):
+    """Wheel written to binary stream"""
+    name: str
+    sha256: bytes
+    size: int
+
+
 class WheelRecord(typing.NamedTuple):
     """Single wheel record"""
     path: Path
@@ -65,15 +125,78 @@ class WheelRecord(typing.NamedTuple):
     size: int | None
 
 
+class Progress(typing.NamedTuple):
+    """Wheel creation progress
+
+    Only source, data and license file members are counted. Size is
+    uncompressed size of members already added to wheel.
+
+    """
+    files: int
+    total_files: int
+    size: int
+
+
+class CompressionRule(typing.NamedTuple):
+    """Compression rule applied to wheel members matching pattern
+
+    Pattern is matched against member path with `pathlib.PurePath.match`
+    (e.g. ``*.png``). Compression type is `zipfile.ZIP_STORED` or
+    `zipfile.ZIP_DEFLATED`. If compression level is ``None``, policy's
+    compression level is used.
+
+    """
+    pattern: str
+    compress_type: int
+    compress_level: int | None = None
+
+
+class CompressionPolicy(typing.NamedTuple):
+    """Wheel members compression policy
+
+    Members are compressed based on first matching rule. Members not
+    matching any rule are deflated with `compress_level` (``None`` for zlib
+    default). Members smaller than `min_size` are always stored. If
+    `min_ratio` is not ``None``, deflated members whose compressed size
+    exceeds `min_ratio` of original size are stored instead.
+
+    """
+    compress_level: int | None = None
+    rules: list[CompressionRule] = []
+    min_size: int = 0
+    min_ratio: float | None = None
+
+
 class Project(typing.NamedTuple):
     """Project definition"""
     conf: dict[str, typing.Any]
     path: Path
 
 
+class Config(typing.NamedTuple):
+    """Resolved pyproject configuration
+
+    Attribute `project` is based on ``[project]`` table (``None`` if table
+    is not defined) and `tool` contains ``[tool.mkwhl]`` table.
+
+    """
+    path: Path
+    project: Project | None
+    tool: dict[str, typing.Any]
+
+
+class AbortedError(Exception):
+    """Operation aborted by setting abort event (see `check_abort`)"""
+
+
 def get_conf(path: Path = Path('pyproject.toml')
              ) -> dict[str, typing.Any]:
     """Get TOML configuration"""
+    if sys.version_info[:2] >= (3, 11):
+        import tomllib as toml
+    else:
+        import tomli as toml
+
     conf_str = path.read_text()
     return toml.loads(conf_str)
 
@@ -83,6 +206,11 @@ def urlsafe_b64encode_nopad(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).rstrip(b'=').decode('utf-8')
 
 
+def urlsafe_b64decode_nopad(data: str) -> bytes:
+    """Record hash decoding"""
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
 def normalize_name(name: str) -> str:
     """Normalize project name"""
     return re.sub(r"[-_.]+", "-", name).lower()
@@ -90,8 +218,10 @@ def normalize_name(name: str) -> str:
 
 def parse_version(version: str) -> str:
     """Parse and return canonical version identifier"""
+    import packaging.version
+
     if version.endswith('dev'):
-        version += now.strftime("%Y%m%d")
+        version += _get_now().strftime("%Y%m%d")
 
     return str(packaging.version.parse(version))
 
@@ -100,11 +230,73 @@ def parse_tags(python_tag: str,
                abi_tag: str,
                platform_tag: str
                ) -> typing.Iterable[str]:
-    """Create all tags from possibly compressed tag segments"""
-    tags = packaging.tags.parse_tag(f"{python_tag}-{abi_tag}-{platform_tag}")
+    """Create all tags from possibly compressed tag segments
+
+    Each segment can contain multiple dot separated values (compressed tag
+    set) - resulting tags are all combinations of segment values, same as
+    with `packaging.tags.parse_tag`.
+
+    """
+    for tag in itertools.product(python_tag.lower().split('.'),
+                                 abi_tag.lower().split('.'),
+                                 platform_tag.lower().split('.')):
+        yield '-'.join(tag)
+
+
+def check_abort(abort: threading.Event | None):
+    """Raise `AbortedError` if `abort` is set"""
+    if abort is not None and abort.is_set():
+        raise AbortedError()
 
-    for tag in tags:
-        yield str(tag)
+
+def exit_on_sigterm():
+    """Handle ``SIGTERM`` by raising `SystemExit`
+
+    Termination is handled same as `KeyboardInterrupt` - stack is unwound
+    and cleanup (e.g. removal of temporary files and sockets) is done.
+    Handler can be installed only from main thread - otherwise this
+    function has no effect.
+
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+
+def reset_now():
+    """Clear evaluated `now`, so that it is evaluated again on next access
+
+    Used by long running processes (e.g. build server) which should not
+    reuse time of previous build or previous ``SOURCE_DATE_EPOCH`` value.
+
+    """
+    globals().pop('now', None)
+
+
+def _on_sigterm(signum, frame):
+    sys.exit(128 + signum)
+
+
+def _get_now() -> datetime.datetime:
+    global now
+
+    if 'now' not in globals():
+        epoch = get_source_date_epoch()
+        now = (datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc)
+               if epoch is not None else datetime.datetime.now())
+
+    return now
+
+
+def get_source_date_epoch() -> int | None:
+    """Get ``SOURCE_DATE_EPOCH`` environment variable value
+
+    See https://reproducible-builds.org/specs/source-date-epoch/.
+
+    """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    return int(epoch) if epoch else None
 
 
 def get_wheel_name(name: str,
@@ -129,6 +321,18 @@ def get_wheel_name(name: str,
     return wheel_name
 
 
+def get_sdist_name(name: str,
+                   version: str
+                   ) -> str:
+    """Get source distribution name
+
+    Provided name should be previously normalized (see `normalize_name`)
+    and version should be in canonical form (see `parse_version`).
+
+    """
+    return f"{name.replace('-', '_')}-{version}.tar.gz"
+
+
 def get_dist_info_name(name: str,
                        version: str
                        ) -> str:
@@ -0,0 +1,114 @@
+"""Memoized pyproject configuration"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import typing
+
+from mkwhl import common
+
+
+_lock: threading.Lock = threading.Lock()
+_configs: dict[Path, tuple[tuple[int, int], common.Config]] = {}
+
+
+def get_config(path: Path = Path('pyproject.toml'),
+               cache_dir: Path | None = None
+               ) -> common.Config:
+    """Get resolved pyproject configuration
+
+    Configuration is parsed once and reused for as long as file's
+    modification time and size stay unchanged. Memoized configurations are
+    shared by all callers in current process.
+
+    If `cache_dir` is provided, parsed configuration is additionally stored
+    in this directory and reused by other processes (e.g. consecutive build
+    backend invocations).
+
+    """
+    resolved_path = path.resolve()
+    stat = resolved_path.stat()
+    key = stat.st_mtime_ns, stat.st_size
+
+    with _lock:
+        memoized = _configs.get(resolved_path)
+
+    if memoized and memoized[0] == key:
+        conf = memoized[1]
+        if conf.path == path:
+            return conf
+
+        return conf._replace(path=path,
+                             project=(conf.project._replace(path=path.parent)
+                                      if conf.project else None))
+
+    data = None
+    if cache_dir is not None:
+        data = _read_cached(cache_dir, resolved_path, key)
+
+    if data is None:
+        data = common.get_conf(path)
+
+        if cache_dir is not None:
+            _write_cached(cache_dir, resolved_path, key, data)
+
+    conf = common.Config(
+        path=path,
+        project=(common.Project(conf=data['project'],
+                                path=path.parent)
+                 if 'project' in data else None),
+        tool=data.get('tool', {}).get('mkwhl', {}))
+
+    with _lock:
+        _configs[resolved_path] = key, conf
+
+    return conf
+
+
+def _get_cache_path(cache_dir: Path,
+                    resolved_path: Path
+                    ) -> Path:
+    name = hashlib.sha256(str(resolved_path).encode('utf-8')).hexdigest()
+    return cache_dir / f'{name}.json'
+
+
+def _read_cached(cache_dir: Path,
+                 resolved_path: Path,
+                 key: tuple[int, int]
+                 ) -> dict[str, typing.Any] | None:
+    try:
+        cached = json.loads(
+            _get_cache_path(cache_dir, resolved_path).read_text('utf-8'))
+
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if cached.get('key') != list(key):
+        return None
+
+    return cached.get('conf')
+
+
+def _write_cached(cache_dir: Path,
+                  resolved_path: Path,
+                  key: tuple[int, int],
+                  data: dict[str, typing.Any]):
+    try:
+        cached = json.dumps({'key': list(key),
+                             'conf': data})
+
+    except (TypeError, ValueError):
+        # TOML date and time values are not supported
+        return
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8',
+                                     dir=cache_dir,
+                                     delete=False) as f:
+        f.write(cached)
+
+    os.replace(f.name, _get_cache_path(cache_dir, resolved_path))
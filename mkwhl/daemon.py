@@ -0,0 +1,277 @@
+"""Build server and client communicating over Unix socket
+
+Client sends single JSON encoded request line containing working
+directory, environment variables affecting build output (see `env_names`)
+and `mkwhl.wheel.create_tagged_wheels` arguments. Server processes
+requests sequentially, in client's working directory and environment, and
+responds with single JSON encoded line containing resulting wheel names
+and cache statistics or error description.
+
+Client functions do not import wheel creation modules, so that sending
+request stays cheap.
+
+"""
+
+from pathlib import Path
+import json
+import os
+import socket
+import typing
+
+from mkwhl import common
+
+if typing.TYPE_CHECKING:
+    from mkwhl.cache import Cache
+
+
+class BuildResult(typing.NamedTuple):
+    """Build result returned by server
+
+    If statistics were requested, `stats` contains statistics report (see
+    `mkwhl.stats.Stats.get_report`).
+
+    """
+    wheel_names: list[str]
+    cache_hits: int
+    cache_misses: int
+    stats: dict[str, typing.Any] | None = None
+
+
+class CacheParams(typing.NamedTuple):
+    """Compressed entry cache parameters
+
+    Can be sent instead of `mkwhl.cache.Cache` - cache is opened only by
+    server.
+
+    """
+    path: Path
+    max_size: int = common.default_cache_size
+
+
+class DaemonError(Exception):
+    """Build error reported by server"""
+
+
+env_names: list[str] = ['SOURCE_DATE_EPOCH']
+"""Client environment variables applied by server for each request"""
+
+_path_args = {'src_dir', 'build_dir', 'readme_path', 'license_path',
+              'conf_path', 'dist_info_dir', 'precompile_python'}
+
+
+def serve(socket_path: Path):
+    """Run build server until interrupted or terminated
+
+    Compressed entry caches are kept open between requests. Socket is
+    created with ``0o600`` permissions and removed once server stops
+    (including termination with ``SIGTERM`` when called from main thread).
+
+    """
+    import socketserver
+
+    caches = {}
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+
+            try:
+                request = json.loads(line)
+                result = _build(request, caches)
+                response = result._asdict()
+
+            except Exception as e:
+                response = {'error': f'{type(e).__name__}: {e}'}
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    common.exit_on_sigterm()
+    socket_path.unlink(missing_ok=True)
+
+    # socket is accessible only by current user from its creation
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(socket_path), Handler)
+
+    finally:
+        os.umask(umask)
+
+    with server:
+        try:
+            server.serve_forever()
+
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def send_request(socket_path: Path,
+                 **kwargs
+                 ) -> BuildResult:
+    """Send build request to server
+
+    Keyword arguments are same as for `mkwhl.wheel.create_tagged_wheels`,
+    except `cache` which can also be `CacheParams` and `stats` which is
+    only checked for being set (statistics are returned in result).
+    Relative paths are resolved by server relative to current working
+    directory.
+
+    Raises `OSError` if server is not available and `DaemonError` if
+    build failed.
+
+    """
+    data = json.dumps({'cwd': os.getcwd(),
+                       'env': {name: os.environ.get(name)
+                               for name in env_names},
+                       'kwargs': _encode_kwargs(kwargs)}).encode('utf-8')
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(str(socket_path))
+        s.sendall(data + b'\n')
+
+        with s.makefile('rb') as f:
+            line = f.readline()
+
+    if not line:
+        raise DaemonError('connection closed')
+
+    response = json.loads(line)
+    if 'error' in response:
+        raise DaemonError(response['error'])
+
+    return BuildResult(wheel_names=response['wheel_names'],
+                       cache_hits=response['cache_hits'],
+                       cache_misses=response['cache_misses'],
+                       stats=response.get('stats'))
+
+
+def _build(request: dict[str, typing.Any],
+           caches: dict[tuple[str, int], 'Cache']
+           ) -> BuildResult:
+    from mkwhl.cache import Cache
+    from mkwhl.stats import Stats
+    from mkwhl.wheel import create_tagged_wheels
+
+    os.chdir(request['cwd'])
+
+    # variables not set by client are removed so that previous request's
+    # environment is not reused
+    env = request.get('env', {})
+    for name in env_names:
+        value = env.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+
+        else:
+            os.environ[name] = value
+
+    # dev version date is based on time of each request
+    common.reset_now()
+
+    kwargs = _decode_kwargs(request['kwargs'])
+
+    cache = None
+    if kwargs.get('cache'):
+        path = Path(kwargs['cache']['path']).resolve()
+        max_size = kwargs['cache']['max_size']
+        cache = caches.get((str(path), max_size))
+
+        if cache is None:
+            cache = Cache(path, max_size)
+            caches[(str(path), max_size)] = cache
+
+    kwargs['cache'] = cache
+    hits = cache.hits if cache else 0
+    misses = cache.misses if cache else 0
+
+    stats = Stats() if kwargs.get('stats') else None
+    kwargs['stats'] = stats
+
+    wheel_names = create_tagged_wheels(**kwargs)
+
+    return BuildResult(wheel_names=wheel_names,
+                       cache_hits=(cache.hits - hits if cache else 0),
+                       cache_misses=(cache.misses - misses if cache else 0),
+                       stats=stats.get_report() if stats else None)
+
+
+def _encode_kwargs(kwargs: dict[str, typing.Any]
+                   ) -> dict[str, typing.Any]:
+    result = {}
+
+    for k, v in kwargs.items():
+        if v is None:
+            result[k] = None
+
+        elif k in _path_args:
+            result[k] = str(v)
+
+        elif k == 'data_paths':
+            data_paths = [common.DataPath(*i) for i in v]
+            result[k] = [{**data_path._asdict(),
+                          'src': str(data_path.src),
+                          'dst': str(data_path.dst)}
+                         for data_path in data_paths]
+
+        elif k == 'tag_sets':
+            result[k] = [tag_set._asdict() for tag_set in v]
+
+        elif k == 'compression':
+            result[k] = {**v._asdict(),
+                         'rules': [rule._asdict() for rule in v.rules]}
+
+        elif k == 'cache':
+            result[k] = {'path': str(v.path),
+                         'max_size': v.max_size}
+
+        elif k == 'stats':
+            # statistics are collected by server and returned in response
+            result[k] = True
+
+        elif k == 'conf':
+            # resolved configuration is memoized by server
+            result['conf_path'] = str(v.path)
+
+        elif k in ('src_include_patterns', 'src_exclude_patterns'):
+            result[k] = list(v)
+
+        else:
+            result[k] = v
+
+    return result
+
+
+def _decode_kwargs(kwargs: dict[str, typing.Any]
+                   ) -> dict[str, typing.Any]:
+    result = {}
+
+    for k, v in kwargs.items():
+        if v is None:
+            result[k] = None
+
+        elif k in _path_args:
+            result[k] = Path(v)
+
+        elif k == 'data_paths':
+            result[k] = [common.DataPath(**{**data_path,
+                                            'src': Path(data_path['src']),
+                                            'dst': Path(data_path['dst'])})
+                         for data_path in v]
+
+        elif k == 'tag_sets':
+            result[k] = [common.TagSet(**tag_set) for tag_set in v]
+
+        elif k == 'compression':
+            result[k] = common.CompressionPolicy(
+                **{**v, 'rules': [common.CompressionRule(**rule)
+                                  for rule in v['rules']]})
+
+        elif k in ('authors', 'maintainers'):
+            result[k] = [tuple(i) for i in v]
+
+        else:
+            result[k] = v
+
+    return result
@@ -1,5 +1,8 @@
 """Formating of .dist-info files"""
 
+from pathlib import Path
+import csv
+import email.parser
 import io
 import typing
 
@@ -25,8 +28,15 @@ def get_entry_points_txt(props: common.EntryPointsProps) -> str:
     return stream.getvalue()
 
 
-def get_METADATA(props: common.MetadataProps) -> str:
-    """Create METADATA file content"""
+def get_METADATA(props: common.MetadataProps,
+                 description: str | None = None
+                 ) -> str:
+    """Create METADATA file content
+
+    If `description` is provided, it is used instead of reading content of
+    `props.description_path`.
+
+    """
     stream = io.StringIO()
 
     stream.write("Metadata-Version: 2.1\n")
@@ -87,8 +97,10 @@ def get_METADATA(props: common.MetadataProps) -> str:
     for url_name, url_path in props.project_urls.items():
         stream.write(f"Project-URL: {url_name}, {url_path}\n")
 
-    if props.description_path:
+    if description is None and props.description_path:
         description = props.description_path.read_text('utf-8')
+
+    if description is not None:
         stream.write(f"\n{description}")
 
     return stream.getvalue()
@@ -113,6 +125,17 @@ def get_WHEEL(props: common.WheelProps) -> str:
     return stream.getvalue()
 
 
+def parse_WHEEL(data: str) -> common.WheelProps:
+    """Parse WHEEL file content"""
+    message = email.parser.HeaderParser().parsestr(data)
+
+    build = message.get('Build')
+    return common.WheelProps(
+        is_purelib=message.get('Root-Is-Purelib', '').lower() == 'true',
+        tags=message.get_all('Tag', []),
+        build=int(build) if build is not None else None)
+
+
 def get_RECORD(records: typing.Iterable[common.WheelRecord]) -> str:
     """Create RECORD file content"""
     stream = io.StringIO()
@@ -128,3 +151,32 @@ def get_RECORD(records: typing.Iterable[common.WheelRecord]) -> str:
         stream.write(f"{size}\n")
 
     return stream.getvalue()
+
+
+def parse_RECORD(data: str) -> typing.Iterable[common.WheelRecord]:
+    """Parse RECORD file content
+
+    Only SHA-256 hashes are supported - `ValueError` is raised for other
+    hash algorithms or malformed lines.
+
+    """
+    for row in csv.reader(io.StringIO(data)):
+        if not row:
+            continue
+
+        if len(row) != 3:
+            raise ValueError(f"invalid RECORD line: {','.join(row)}")
+
+        path, digest, size = row
+
+        sha256 = None
+        if digest:
+            algorithm, _, value = digest.partition('=')
+            if algorithm != 'sha256':
+                raise ValueError(f"unsupported hash algorithm: {algorithm}")
+
+            sha256 = common.urlsafe_b64decode_nopad(value)
+
+        yield common.WheelRecord(path=Path(path),
+                                 sha256=sha256,
+                                 size=int(size) if size else None)
@@ -0,0 +1,92 @@
+"""File system utilities"""
+
+from pathlib import Path
+import contextlib
+import os
+import secrets
+import typing
+
+try:
+    import fcntl
+
+except ImportError:
+    fcntl = None
+
+
+@contextlib.contextmanager
+def write_atomic(path: Path) -> typing.Iterator[typing.BinaryIO]:
+    """Context providing temporary file which replaces `path` on exit
+
+    Temporary file is created in same directory as `path`, with default
+    permissions (based on process umask). If context exits without
+    exception, temporary file is flushed, synchronized to disk and moved to
+    `path` with `os.replace`, so readers of `path` see either previous file
+    or complete new file. Otherwise (including `KeyboardInterrupt` and
+    ``SIGTERM`` handled by `common.exit_on_sigterm`), temporary file is
+    removed and `path` is not modified.
+
+    """
+    while True:
+        tmp_path = path.with_name(f'.{path.name}.{secrets.token_hex(4)}.tmp')
+        try:
+            fd = os.open(tmp_path,
+                         (os.O_RDWR | os.O_CREAT | os.O_EXCL |
+                          getattr(os, 'O_BINARY', 0)),
+                         0o666)
+            break
+
+        except FileExistsError:
+            continue
+
+    try:
+        with open(fd, 'w+b') as f:
+            yield f
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    _fsync_dir(path.parent)
+
+
+@contextlib.contextmanager
+def lock(path: Path) -> typing.Iterator[typing.BinaryIO]:
+    """Context holding exclusive advisory lock of lock file `path`
+
+    Lock file is created if it does not exist. It is not removed on exit,
+    so that all processes lock same file. Lock holder can store arbitrary
+    data in provided lock file.
+
+    Lock is based on ``fcntl.flock`` - on platforms without `fcntl`, lock
+    file is opened without locking.
+
+    """
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+        yield f
+
+
+def _fsync_dir(dir_path: Path):
+    # directory entry created by rename is persisted only on platforms
+    # which support opening directories
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+
+    except OSError:
+        pass
+
+    finally:
+        os.close(fd)
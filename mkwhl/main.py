@@ -1,12 +1,19 @@
-"""Command line interface"""
+"""Command line interface
+
+Wheel creation and subcommand modules are imported only once they are
+needed, so that sending build request to server (``--daemon``) does not
+pay their import time.
+
+"""
 
 from pathlib import Path
 import argparse
 import collections
-import email.utils
+import json
 import sys
 
-from mkwhl.wheel import create_wheel
+from mkwhl import common
+from mkwhl import daemon
 
 
 default_src_dir = Path('.')
@@ -19,6 +26,8 @@ default_src_exclude = ['**/__pycache__/**/*',
 default_python_tag = 'py3'
 default_abi_tag = 'none'
 default_platform_tag = 'any'
+default_cache_size = common.default_cache_size
+default_large_file_size = common.default_large_file_size
 
 
 def create_argument_parser() -> argparse.ArgumentParser:
@@ -31,6 +40,10 @@ def create_argument_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         '--build-dir', metavar='PATH', type=Path, default=default_build_dir,
         help=f"output directory (default {repr(str(default_build_dir))})")
+    parser.add_argument(
+        '--output', metavar='PATH', type=Path, default=None,
+        help="write wheel to file (or stdout if path is '-') instead of "
+             "output directory")
     parser.add_argument(
         '--name', metavar='NAME', default=None,
         help="override name from pyproject.toml")
@@ -105,8 +118,29 @@ def create_argument_parser() -> argparse.ArgumentParser:
         help=f"source exclude pattern - can be provided multiple times "
              f"(default {repr(default_src_exclude)})")
     parser.add_argument(
-        '--data', metavar='SRC_PATH:DST_PATH', action='append',
-        help="data source:destination path - can be provided multiple times")
+        '--data', metavar='[SCHEME:]SRC_PATH:DST_PATH', action='append',
+        help=f"data source:destination file or directory path with optional "
+             f"scheme ({', '.join(common.data_schemes)}; default 'data') - "
+             f"can be provided multiple times")
+    parser.add_argument(
+        '--data-include', metavar='PATTERN', action='append',
+        help="data directory include pattern - can be provided multiple "
+             "times (default ['**/*'])")
+    parser.add_argument(
+        '--data-exclude', metavar='PATTERN', action='append',
+        help="data directory exclude pattern - can be provided multiple "
+             "times")
+    parser.add_argument(
+        '--precompile', action='store_true',
+        help="include bytecode of python sources compiled by target "
+             "interpreter")
+    parser.add_argument(
+        '--precompile-optimize', metavar='N', type=int, default=0,
+        help="bytecode optimization level (default 0)")
+    parser.add_argument(
+        '--precompile-python', metavar='PATH', type=Path, default=None,
+        help="target interpreter used for bytecode compilation "
+             "(default current interpreter)")
     parser.add_argument(
         '--build-tag', metavar='N', type=int, default=None,
         help="optional build tag")
@@ -119,39 +153,192 @@ def create_argument_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         '--platform-tag', metavar='TAG', default=default_platform_tag,
         help=f"platform tag (default {repr(default_platform_tag)})")
+    parser.add_argument(
+        '--tag-set', metavar='[BUILD-]PYTHON-ABI-PLATFORM', action='append',
+        help="create wheel for tag set (overrides other tag arguments) - "
+             "can be provided multiple times")
     parser.add_argument(
         '--not-purelib', action='store_true',
         help="is not purelib")
+    parser.add_argument(
+        '--jobs', metavar='N', type=_positive_int, default=1,
+        help="number of concurrent file compression jobs (default 1)")
+    parser.add_argument(
+        '--cache-dir', metavar='PATH', type=Path, default=None,
+        help="optional compressed file cache directory")
+    parser.add_argument(
+        '--cache-size', metavar='BYTES', type=int, default=default_cache_size,
+        help=f"maximum compressed file cache size "
+             f"(default {default_cache_size})")
+    parser.add_argument(
+        '--compress-level', metavar='N', type=int, default=None,
+        help="deflate compression level 0-9 (default zlib default level)")
+    parser.add_argument(
+        '--compression-rule', metavar='PATTERN:TYPE[:N]', action='append',
+        help="compression type ('stored' or 'deflated') and optional level "
+             "of members matching pattern - can be provided multiple times")
+    parser.add_argument(
+        '--compress-min-size', metavar='BYTES', type=int, default=0,
+        help="store members smaller than provided size (default 0)")
+    parser.add_argument(
+        '--compress-min-ratio', metavar='RATIO', type=float, default=None,
+        help="store members whose compressed size exceeds provided ratio "
+             "of original size")
+    parser.add_argument(
+        '--large-file-size', metavar='BYTES', type=int,
+        default=default_large_file_size,
+        help=f"minimum size of files which are memory mapped and, if not "
+             f"compressed, copied by kernel (default {default_large_file_size})")  # NOQA
+    parser.add_argument(
+        '--daemon', metavar='PATH', type=Path, default=None,
+        help="send build request to server listening on unix socket "
+             "(build is done in current process if server is not available)")
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="update previously created wheel by copying members whose "
+             "source files are not modified")
+    parser.add_argument(
+        '--lock', action='store_true',
+        help="hold advisory lock of wheel name during build and reuse "
+             "wheel previously created from same unmodified sources")
+    parser.add_argument(
+        '--reproducible', action='store_true',
+        help="create byte-reproducible wheel (member timestamps are based "
+             "on SOURCE_DATE_EPOCH)")
+    parser.add_argument(
+        '--stats', metavar='PATH', nargs='?', type=Path, const=Path('-'),
+        default=None,
+        help="write JSON build statistics to file "
+             "(or stderr if path is not provided)")
     parser.add_argument(
         '--quiet', action='store_true',
         help="skip outputing wheel name to stdout")
     return parser
 
 
+def create_batch_argument_parser() -> argparse.ArgumentParser:
+    """Create batch command argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='mkwhl batch',
+        description="Create Python wheels for multiple projects")
+    parser.add_argument(
+        '--glob', metavar='PATTERN', action='append',
+        help="pattern used for discovery of project directories containing "
+             "pyproject.toml - can be provided multiple times")
+    parser.add_argument(
+        '--build-dir', metavar='PATH', type=Path, default=None,
+        help="output directory (default 'build' directory of each project)")
+    parser.add_argument(
+        '--jobs', metavar='N', type=_positive_int, default=None,
+        help="number of concurrent build processes (default number of CPUs)")
+    parser.add_argument(
+        '--editable', action='store_true',
+        help="create editable wheels")
+    parser.add_argument(
+        '--summary', metavar='PATH', type=Path, default=None,
+        help="write JSON summary to file instead of stdout")
+    parser.add_argument(
+        'project_dirs', metavar='PATH', type=Path, nargs='*',
+        help="project directory containing pyproject.toml")
+    return parser
+
+
+def create_verify_argument_parser() -> argparse.ArgumentParser:
+    """Create verify command argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='mkwhl verify',
+        description="Verify wheels content against RECORD")
+    parser.add_argument(
+        '--jobs', metavar='N', type=_positive_int, default=None,
+        help="number of worker threads (default number of CPUs)")
+    parser.add_argument(
+        '--summary', metavar='PATH', type=Path, default=None,
+        help="write JSON summary to file instead of stdout")
+    parser.add_argument(
+        'paths', metavar='PATH', type=Path, nargs='+',
+        help="wheel path or directory containing wheels")
+    return parser
+
+
+def create_retag_argument_parser() -> argparse.ArgumentParser:
+    """Create retag command argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='mkwhl retag',
+        description="Create copy of existing wheel with new tags or "
+                    "dependencies")
+    parser.add_argument(
+        '--build-dir', metavar='PATH', type=Path, default=None,
+        help="output directory (default directory containing wheel)")
+    parser.add_argument(
+        '--build-tag', metavar='N', type=int, default=None,
+        help="new build tag (non-negative integer)")
+    parser.add_argument(
+        '--no-build-tag', action='store_true',
+        help="remove build tag")
+    parser.add_argument(
+        '--python-tag', metavar='TAG', default=None,
+        help="new python tag")
+    parser.add_argument(
+        '--abi-tag', metavar='TAG', default=None,
+        help="new abi tag")
+    parser.add_argument(
+        '--platform-tag', metavar='TAG', default=None,
+        help="new platform tag")
+    parser.add_argument(
+        '--requires-dist', metavar='REQUIREMENT', action='append',
+        help="replace METADATA Requires-Dist entries - can be provided "
+             "multiple times")
+    parser.add_argument(
+        '--quiet', action='store_true',
+        help="skip outputing wheel name to stdout")
+    parser.add_argument(
+        'wheel_path', metavar='PATH', type=Path,
+        help="existing wheel path")
+    return parser
+
+
+def create_serve_argument_parser() -> argparse.ArgumentParser:
+    """Create serve command argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='mkwhl serve',
+        description="Run build server listening on unix socket")
+    parser.add_argument(
+        '--socket', metavar='PATH', type=Path, required=True,
+        help="unix socket path")
+    return parser
+
+
 def main():
-    """Main entry point"""
+    """Main entry point
+
+    ``SIGTERM`` is handled same as `KeyboardInterrupt`, so that partially
+    written outputs and temporary files are removed on termination.
+
+    """
+    common.exit_on_sigterm()
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        sys.exit(main_batch(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        sys.exit(main_serve(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'verify':
+        sys.exit(main_verify(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'retag':
+        sys.exit(main_retag(sys.argv[2:]))
+
     parser = create_argument_parser()
     args = parser.parse_args()
 
-    authors = []
-    for author in (args.author or []):
-        if not author:
-            continue
-        name, mail = email.utils.parseaddr(author)
-        if not name:
-            authors.append((author, None))
-        else:
-            authors.append((name, mail or None))
+    authors = [_parse_person(author)
+               for author in (args.author or [])
+               if author]
 
-    maintainers = []
-    for maintainer in (args.maintainer or []):
-        if not maintainer:
-            continue
-        name, mail = email.utils.parseaddr(maintainer)
-        if not name:
-            maintainers.append((maintainer, None))
-        else:
-            maintainers.append((name, mail or None))
+    maintainers = [_parse_person(maintainer)
+                   for maintainer in (args.maintainer or [])
+                   if maintainer]
 
     urls = {}
     for url in (args.url or []):
@@ -190,15 +377,70 @@ def main():
                    else args.src_exclude)
 
     data_paths = []
-    for src_dst_path in (args.data or []):
+    for data in (args.data or []):
+        scheme, _, src_dst_path = data.partition(':')
+        if scheme not in common.data_schemes or ':' not in src_dst_path:
+            scheme, src_dst_path = 'data', data
+
         src_path, dst_path = src_dst_path.split(':', 1)
         if not src_path or not dst_path:
             continue
-        data_paths.append((Path(src_path), Path(dst_path)))
+        data_paths.append(common.DataPath(
+            src=Path(src_path),
+            dst=Path(dst_path),
+            scheme=scheme,
+            include_patterns=args.data_include or ['**/*'],
+            exclude_patterns=args.data_exclude or []))
+
+    compression_rules = []
+    for compression_rule in (args.compression_rule or []):
+        pattern, compress_type, *compress_level = compression_rule.split(':')
+        if not pattern or compress_type not in common.compress_types:
+            continue
+        compression_rules.append(common.CompressionRule(
+            pattern=pattern,
+            compress_type=common.compress_types[compress_type],
+            compress_level=(int(compress_level[0]) if compress_level
+                            else None)))
+
+    compression = common.CompressionPolicy(
+        compress_level=args.compress_level,
+        rules=compression_rules,
+        min_size=args.compress_min_size,
+        min_ratio=args.compress_min_ratio)
+
+    tag_sets = []
+    for tag_set in (args.tag_set or []):
+        tags = tag_set.split('-')
+        if (len(tags) not in (3, 4) or not all(tags) or
+                (len(tags) == 4 and not tags[0].isdigit())):
+            parser.error(f"argument --tag-set: invalid tag set: {tag_set!r} "
+                         f"(expected [BUILD-]PYTHON-ABI-PLATFORM)")
+
+        if len(tags) == 3:
+            tag_sets.append(common.TagSet(*tags))
+        else:
+            tag_sets.append(common.TagSet(*tags[1:], build_tag=int(tags[0])))
+
+    if not tag_sets:
+        tag_sets.append(common.TagSet(python_tag=args.python_tag,
+                                      abi_tag=args.abi_tag,
+                                      platform_tag=args.platform_tag,
+                                      build_tag=args.build_tag))
 
-    wheel_name = create_wheel(
+    if args.output is not None and len(tag_sets) > 1:
+        sys.exit("error: --output supports only single tag set")
+
+    if args.output is not None and args.incremental:
+        sys.exit("error: --output is not supported with --incremental")
+
+    if args.output is not None and args.lock:
+        sys.exit("error: --output is not supported with --lock")
+
+    build_args = dict(
         src_dir=args.src_dir,
         build_dir=args.build_dir,
+        tag_sets=tag_sets,
         name=args.name,
         version=args.version,
         description=args.description,
@@ -220,15 +462,223 @@ def main():
         src_include_patterns=src_include,
         src_exclude_patterns=src_exclude,
         data_paths=data_paths,
+        precompile=args.precompile,
+        precompile_optimize=args.precompile_optimize,
+        precompile_python=args.precompile_python,
+        is_purelib=not args.not_purelib,
+        jobs=args.jobs,
+        compression=compression,
+        large_file_size=args.large_file_size,
+        reproducible=args.reproducible,
+        incremental=args.incremental,
+        lock=args.lock)
+
+    result = None
+    if args.daemon and args.output is None:
+        try:
+            result = daemon.send_request(
+                args.daemon,
+                **build_args,
+                cache=(daemon.CacheParams(path=args.cache_dir,
+                                          max_size=args.cache_size)
+                       if args.cache_dir else None),
+                stats=True if args.stats else None)
+
+        except OSError:
+            pass
+
+        except daemon.DaemonError as e:
+            sys.exit(f"error: {e}")
+
+    if result is None:
+        from mkwhl import cache
+        from mkwhl import stats
+        from mkwhl.wheel import create_tagged_wheels
+
+        entry_cache = (cache.Cache(args.cache_dir, args.cache_size)
+                       if args.cache_dir else None)
+
+        build_args['cache'] = entry_cache
+        build_args['stats'] = stats.Stats() if args.stats else None
+
+        if args.output is None:
+            wheel_names = create_tagged_wheels(**build_args)
+
+        elif args.output == Path('-'):
+            wheel_names = create_tagged_wheels(**build_args,
+                                               outputs=[sys.stdout.buffer])
+
+        else:
+            with open(args.output, 'w+b') as f:
+                wheel_names = create_tagged_wheels(**build_args,
+                                                   outputs=[f])
+
+        result = daemon.BuildResult(
+            wheel_names=wheel_names,
+            cache_hits=entry_cache.hits if entry_cache else 0,
+            cache_misses=entry_cache.misses if entry_cache else 0,
+            stats=(build_args['stats'].get_report() if build_args['stats']
+                   else None))
+
+    if args.stats:
+        stats_json = json.dumps(result.stats, indent=2)
+
+        if args.stats == Path('-'):
+            print(stats_json, file=sys.stderr)
+
+        else:
+            args.stats.write_text(stats_json, 'utf-8')
+
+    if not args.quiet:
+        # wheel written to stdout is not followed by its name
+        for wheel_name in result.wheel_names:
+            print(wheel_name, file=(sys.stderr if args.output == Path('-')
+                                    else sys.stdout))
+
+        if args.cache_dir:
+            print(f"cache: {result.cache_hits} hits, "
+                  f"{result.cache_misses} misses",
+                  file=sys.stderr)
+
+
+def main_batch(argv: list[str]) -> int:
+    """Batch command entry point"""
+    from mkwhl import batch
+
+    parser = create_batch_argument_parser()
+    args = parser.parse_args(argv)
+
+    project_dirs = list(args.project_dirs)
+    if args.glob:
+        project_dirs.extend(batch.find_projects(Path('.'), args.glob))
+
+    results = batch.create_wheels(project_dirs=project_dirs,
+                                  build_dir=args.build_dir,
+                                  editable=args.editable,
+                                  processes=args.jobs)
+
+    summary = {'projects': [{'project_dir': str(result.project_dir),
+                             'wheel_name': result.wheel_name,
+                             'error': result.error,
+                             'duration': result.duration}
+                            for result in results],
+               'failed': sum(1 for result in results
+                             if result.error is not None)}
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    return 1 if summary['failed'] else 0
+
+
+def main_verify(argv: list[str]) -> int:
+    """Verify command entry point"""
+    from mkwhl import verify
+
+    parser = create_verify_argument_parser()
+    args = parser.parse_args(argv)
+
+    wheel_paths = collections.deque()
+    for path in args.paths:
+        if path.is_dir():
+            wheel_paths.extend(sorted(path.glob('*.whl')))
+
+        else:
+            wheel_paths.append(path)
+
+    results = verify.verify_wheels(wheel_paths=wheel_paths,
+                                   jobs=args.jobs)
+
+    summary = {'wheels': [{'wheel_path': str(result.wheel_path),
+                           'errors': result.errors}
+                          for result in results],
+               'failed': sum(1 for result in results if result.errors)}
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    return 1 if summary['failed'] else 0
+
+
+def main_retag(argv: list[str]) -> int:
+    """Retag command entry point"""
+    from mkwhl import retag
+
+    parser = create_retag_argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.build_tag is not None and args.no_build_tag:
+        parser.error("argument --no-build-tag: not allowed with argument "
+                     "--build-tag")
+
+    if args.build_tag is not None and args.build_tag < 0:
+        parser.error(f"argument --build-tag: invalid build tag: "
+                     f"{args.build_tag} (should be non-negative integer)")
+
+    wheel_name = retag.retag_wheel(
+        wheel_path=args.wheel_path,
+        build_dir=(args.build_dir if args.build_dir is not None
+                   else args.wheel_path.parent),
         build_tag=args.build_tag,
+        clear_build_tag=args.no_build_tag,
         python_tag=args.python_tag,
         abi_tag=args.abi_tag,
         platform_tag=args.platform_tag,
-        is_purelib=not args.not_purelib)
+        requires_dists=args.requires_dist)
 
     if not args.quiet:
         print(wheel_name)
 
+    return 0
+
+
+def main_serve(argv: list[str]) -> int:
+    """Serve command entry point"""
+    parser = create_serve_argument_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        daemon.serve(args.socket)
+
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def _positive_int(value: str) -> int:
+    try:
+        result = int(value)
+
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+
+    if result < 1:
+        raise argparse.ArgumentTypeError(
+            f"invalid positive int value: {value!r}")
+
+    return result
+
+
+def _parse_person(value: str) -> tuple[str, str | None]:
+    import email.utils
+
+    name, mail = email.utils.parseaddr(value)
+    if not name:
+        return value, None
+
+    return name, mail or None
+
 
 if __name__ == '__main__':
     sys.argv[0] = 'mkwhl'
@@ -153,6 +153,30 @@ def get_metadata_props(project: common.Project | None,
                                 provides_extras=provides_extras)
 
 
+def get_license_path(project: common.Project | None,
+                     license_path: Path | None
+                     ) -> Path | None:
+    """Get license file path
+
+    If `license_path` is ``None``, license file is based on project
+    configuration or, if not configured, existence of ``LICENSE`` or
+    ``LICENSE.txt`` file.
+
+    """
+    if license_path is None and project:
+        license_path_str = project.conf.get('license', {}).get('file')
+        if license_path_str:
+            license_path = project.path / license_path_str
+
+    if license_path is None:
+        for i in [Path('LICENSE'), Path('LICENSE.txt')]:
+            if i.exists():
+                license_path = i
+                break
+
+    return license_path
+
+
 def get_wheel_props(build_tag: int | None,
                     python_tag: str,
                     abi_tag: str,
@@ -0,0 +1,223 @@
+"""Retagging and metadata patching of existing wheels"""
+
+from pathlib import Path
+import copy
+import hashlib
+import zipfile
+
+from mkwhl import archive
+from mkwhl import common
+from mkwhl import dist_info
+from mkwhl import fs
+from mkwhl import props
+
+
+def retag_wheel(wheel_path: Path,
+                build_dir: Path,
+                *,
+                build_tag: int | None = None,
+                clear_build_tag: bool = False,
+                python_tag: str | None = None,
+                abi_tag: str | None = None,
+                platform_tag: str | None = None,
+                requires_dists: list[str] | None = None
+                ) -> str:
+    """Create copy of existing wheel with new tags or dependencies
+
+    New wheel is created in `build_dir` and its name is returned. Tags
+    which are ``None`` are taken from existing wheel name. If
+    `clear_build_tag` is set, new wheel does not have build tag. If
+    `requires_dists` is not ``None``, it replaces all METADATA
+    ``Requires-Dist`` entries - other METADATA lines are preserved as is.
+
+    Only WHEEL, METADATA (if `requires_dists` is provided) and RECORD are
+    regenerated. All other members are copied without decompression.
+
+    If wheel does not contain .dist-info directory named after wheel name,
+    its only .dist-info directory containing WHEEL is used. `ValueError`
+    is raised if .dist-info directory or its files are not found.
+
+    """
+    if build_tag is not None and clear_build_tag:
+        raise ValueError("build tag can not be both set and cleared")
+
+    if build_tag is not None and build_tag < 0:
+        raise ValueError("build tag should be non-negative integer")
+
+    name, version, old_build_tag, old_tag_set = _parse_wheel_name(
+        wheel_path.name)
+
+    if clear_build_tag:
+        old_build_tag = None
+
+    tag_set = common.TagSet(
+        python_tag=python_tag or old_tag_set.python_tag,
+        abi_tag=abi_tag or old_tag_set.abi_tag,
+        platform_tag=platform_tag or old_tag_set.platform_tag,
+        build_tag=build_tag if build_tag is not None else old_build_tag)
+
+    wheel_name = common.get_wheel_name(name=name,
+                                       version=version,
+                                       build_tag=tag_set.build_tag,
+                                       python_tag=tag_set.python_tag,
+                                       abi_tag=tag_set.abi_tag,
+                                       platform_tag=tag_set.platform_tag)
+
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    with zipfile.ZipFile(wheel_path) as src_whl:
+        dist_info_path = _get_dist_info_path(src_whl=src_whl,
+                                             name=name,
+                                             version=version)
+        wheel_member = (dist_info_path / 'WHEEL').as_posix()
+        metadata_member = (dist_info_path / 'METADATA').as_posix()
+        record_member = (dist_info_path / 'RECORD').as_posix()
+
+        old_wheel_props = dist_info.parse_WHEEL(
+            _read_member(src_whl, wheel_member).decode('utf-8'))
+        wheel_props = props.get_wheel_props(
+            build_tag=tag_set.build_tag,
+            python_tag=tag_set.python_tag,
+            abi_tag=tag_set.abi_tag,
+            platform_tag=tag_set.platform_tag,
+            is_purelib=old_wheel_props.is_purelib)
+
+        data = {wheel_member: dist_info.get_WHEEL(wheel_props)}
+
+        if requires_dists is not None:
+            data[metadata_member] = _replace_requires_dists(
+                _read_member(src_whl, metadata_member).decode('utf-8'),
+                requires_dists)
+
+        records = {record.path.as_posix(): record
+                   for record in dist_info.parse_RECORD(
+                       _read_member(src_whl, record_member).decode('utf-8'))}
+
+        with fs.write_atomic(build_dir / wheel_name) as f:
+            with zipfile.ZipFile(f, 'w') as dst_whl:
+                for zinfo in src_whl.infolist():
+                    if zinfo.filename == record_member:
+                        continue
+
+                    if zinfo.filename not in data:
+                        archive.copy_member(src_whl=src_whl,
+                                            zinfo=zinfo,
+                                            dst_whl=dst_whl)
+                        continue
+
+                    member_data = data[zinfo.filename].encode('utf-8')
+                    records[zinfo.filename] = common.WheelRecord(
+                        path=Path(zinfo.filename),
+                        sha256=hashlib.sha256(member_data).digest(),
+                        size=len(member_data))
+
+                    dst_whl.writestr(copy.copy(zinfo), member_data)
+
+                record_zinfo = src_whl.getinfo(record_member)
+                record_data = dist_info.get_RECORD(
+                    [*(record for path, record in records.items()
+                       if path != record_member),
+                     common.WheelRecord(path=Path(record_member),
+                                        sha256=None,
+                                        size=None)])
+
+                dst_whl.writestr(copy.copy(record_zinfo),
+                                 record_data.encode('utf-8'))
+
+    return wheel_name
+
+
+def _replace_requires_dists(metadata: str,
+                            requires_dists: list[str]
+                            ) -> str:
+    # METADATA is patched line by line, so that all other fields and
+    # description are preserved as is
+    lines = metadata.splitlines(keepends=True)
+    headers = []
+    position = None
+    skip = False
+
+    for i, line in enumerate(lines):
+        if not line.strip():
+            break
+
+        # continuation lines belong to previous header
+        if line[0] in ' \t':
+            if not skip:
+                headers.append(line)
+            continue
+
+        skip = line.split(':', 1)[0].strip().lower() == 'requires-dist'
+        if skip:
+            if position is None:
+                position = len(headers)
+            continue
+
+        headers.append(line)
+
+    else:
+        i = len(lines)
+
+    if position is None:
+        position = len(headers)
+
+    # last header is not terminated if METADATA has no description
+    if headers and not headers[-1].endswith('\n'):
+        headers[-1] += '\n'
+
+    headers[position:position] = [f'Requires-Dist: {requires_dist}\n'
+                                  for requires_dist in requires_dists]
+
+    return ''.join([*headers, *lines[i:]])
+
+
+def _get_dist_info_path(src_whl: zipfile.ZipFile,
+                        name: str,
+                        version: str
+                        ) -> Path:
+    dist_info_path = Path(common.get_dist_info_name(name=name,
+                                                    version=version))
+    if (dist_info_path / 'WHEEL').as_posix() in src_whl.NameToInfo:
+        return dist_info_path
+
+    # name of .dist-info directory created by other tools can differ from
+    # name derived from wheel name (e.g. in case or normalization)
+    dist_info_paths = {Path(i).parent for i in src_whl.NameToInfo
+                       if i.count('/') == 1 and
+                       i.endswith('.dist-info/WHEEL')}
+    if len(dist_info_paths) == 1:
+        return dist_info_paths.pop()
+
+    raise ValueError(f"{dist_info_path.as_posix()}/WHEEL not found in "
+                     f"{src_whl.filename}")
+
+
+def _read_member(src_whl: zipfile.ZipFile, member: str) -> bytes:
+    try:
+        return src_whl.read(member)
+
+    except KeyError:
+        raise ValueError(f"{member} not found in {src_whl.filename}")
+
+
+def _parse_wheel_name(wheel_name: str
+                      ) -> tuple[str, str, int | None, common.TagSet]:
+    if not wheel_name.endswith('.whl'):
+        raise ValueError(f"invalid wheel name: {wheel_name}")
+
+    segments = wheel_name[:-len('.whl')].split('-')
+
+    if len(segments) == 5:
+        name, version, python_tag, abi_tag, platform_tag = segments
+        build_tag = None
+
+    elif len(segments) == 6:
+        name, version, build_tag, python_tag, abi_tag, platform_tag = segments
+        build_tag = int(build_tag)
+
+    else:
+        raise ValueError(f"invalid wheel name: {wheel_name}")
+
+    return name, version, build_tag, common.TagSet(python_tag=python_tag,
+                                                   abi_tag=abi_tag,
+                                                   platform_tag=platform_tag)
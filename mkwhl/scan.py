@@ -0,0 +1,313 @@
+"""Source file scanning based on glob patterns"""
+
+from pathlib import Path
+import fnmatch
+import os
+import re
+import sys
+import typing
+
+from mkwhl import common
+
+
+_Segment: typing.TypeAlias = typing.Callable[[str], bool] | None
+"""Compiled pattern segment (``None`` represents recursive ``**``)"""
+
+_Pattern: typing.TypeAlias = list[_Segment]
+
+_State: typing.TypeAlias = list[frozenset[int]]
+"""Matched segment positions for each pattern"""
+
+_trailing_recursive_matches_files: bool = sys.version_info[:2] >= (3, 13)
+
+
+def get_paths(src_dir: Path,
+              include_patterns: typing.Iterable[str],
+              exclude_patterns: typing.Iterable[str]
+              ) -> typing.Iterable[Path]:
+    """Get file paths selected by include and exclude patterns
+
+    Patterns are `pathlib.Path.glob` patterns relative to `src_dir`.
+    Resulting paths include all files matching at least one include
+    pattern which don't match any of exclude patterns.
+
+    Directory tree is walked once, in sorted order, and paths are yielded
+    as they are found. Directories whose content can not be matched by any
+    include pattern, or is matched completely by exclude pattern, are not
+    traversed. Recursive ``**`` segments do not follow symbolic links to
+    directories and do not descend into directories which are already
+    being walked (cycles) - these directories are still matched by
+    non-recursive segments. Consequently, directory matched completely by
+    exclude pattern is still traversed if include pattern could match
+    files through symbolic link inside it.
+
+    Same as with `pathlib.Path.glob`, last non-wildcard segment does not
+    match broken symbolic link and no paths are yielded if `src_dir` does
+    not exist.
+
+    """
+    includes = [_compile_pattern(i) for i in include_patterns]
+    excludes = [_compile_pattern(i) for i in exclude_patterns]
+
+    include_state = [_closure(i, [0]) for i in includes]
+    exclude_state = [_closure(i, [0]) for i in excludes]
+
+    try:
+        stat = src_dir.stat()
+
+    except (FileNotFoundError, NotADirectoryError):
+        return
+
+    ancestors = {(stat.st_dev, stat.st_ino)}
+
+    yield from _walk(src_dir, includes, include_state, excludes,
+                     exclude_state, ancestors)
+
+
+def get_data_paths(data_path: common.DataPath | tuple[Path, Path]
+                   ) -> typing.Iterable[tuple[Path, Path]]:
+    """Get (destination path, source path) pairs of data path files
+
+    Destination paths are relative to wheel data directory (they start
+    with data path's scheme). Directories are walked lazily with
+    `get_paths`. Data path can also be provided as (source, destination)
+    tuple, in which case ``data`` scheme and default patterns are used.
+
+    """
+    data_path = common.DataPath(*data_path)
+    if data_path.scheme not in common.data_schemes:
+        raise ValueError(f"unsupported data scheme: {data_path.scheme}")
+
+    dst_path = Path(data_path.scheme) / data_path.dst
+
+    if not data_path.src.is_dir():
+        yield dst_path, data_path.src
+        return
+
+    for src_path in get_paths(data_path.src, data_path.include_patterns,
+                              data_path.exclude_patterns):
+        yield dst_path / src_path.relative_to(data_path.src), src_path
+
+
+def _walk(dir_path: Path,
+          includes: list[_Pattern],
+          include_state: _State,
+          excludes: list[_Pattern],
+          exclude_state: _State,
+          ancestors: set[tuple[int, int]]
+          ) -> typing.Iterable[Path]:
+    try:
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda i: i.name)
+
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+
+        except OSError:
+            is_dir = False
+
+        if not is_dir:
+            exists = not entry.is_symlink() or os.path.exists(entry.path)
+
+            if (_matches(includes, include_state, entry.name, exists) and
+                    not _matches(excludes, exclude_state, entry.name,
+                                 exists)):
+                yield dir_path / entry.name
+
+            continue
+
+        recursive = not entry.is_symlink()
+
+        entry_states = _descend_entry(entry.name, includes, include_state,
+                                      excludes, exclude_state, recursive)
+        if not entry_states:
+            continue
+
+        try:
+            stat = entry.stat()
+
+        except OSError:
+            continue
+
+        # recursive segments would descend into cycle indefinitely, while
+        # non-recursive segments are limited by pattern length
+        identity = stat.st_dev, stat.st_ino
+        cycle = identity in ancestors
+        if cycle and recursive:
+            entry_states = _descend_entry(entry.name, includes, include_state,
+                                          excludes, exclude_state, False)
+            if not entry_states:
+                continue
+
+        entry_include_state, entry_exclude_state = entry_states
+
+        if not cycle:
+            ancestors.add(identity)
+
+        yield from _walk(dir_path / entry.name, includes, entry_include_state,
+                         excludes, entry_exclude_state, ancestors)
+
+        if not cycle:
+            ancestors.remove(identity)
+
+
+def _descend_entry(name: str,
+                   includes: list[_Pattern],
+                   include_state: _State,
+                   excludes: list[_Pattern],
+                   exclude_state: _State,
+                   recursive: bool
+                   ) -> tuple[_State, _State] | None:
+    entry_include_state = [
+        _descend(pattern, positions, name, recursive)
+        for pattern, positions in zip(includes, include_state)]
+    if not any(entry_include_state):
+        return
+
+    entry_exclude_state = [
+        _descend(pattern, positions, name, recursive)
+        for pattern, positions in zip(excludes, exclude_state)]
+    # recursive segments of exclude patterns do not follow symbolic links,
+    # so files reachable through them are not excluded
+    if (any(_matches_all(pattern, positions)
+            for pattern, positions in zip(excludes, entry_exclude_state)) and
+            not any(_follows_links(pattern, positions)
+                    for pattern, positions in zip(includes,
+                                                  entry_include_state))):
+        return
+
+    return entry_include_state, entry_exclude_state
+
+
+def _compile_pattern(pattern: str) -> _Pattern:
+    path = Path(pattern)
+    if path.anchor:
+        raise NotImplementedError("Non-relative patterns are unsupported")
+
+    if not path.parts:
+        raise ValueError(f"Unacceptable pattern: {pattern!r}")
+
+    return [_compile_segment(i) for i in path.parts]
+
+
+def _compile_segment(segment: str) -> _Segment:
+    if segment == '**':
+        return None
+
+    if segment == '*':
+        return _match_any
+
+    if not any(i in segment for i in '*?['):
+        return _Name(segment)
+
+    flags = re.IGNORECASE if os.name == 'nt' else 0
+    return re.compile(fnmatch.translate(segment), flags).fullmatch
+
+
+def _match_any(name: str) -> bool:
+    return True
+
+
+class _Name(str):
+    """Non-wildcard segment matching single name"""
+
+    __call__ = str.__eq__
+
+
+def _closure(pattern: _Pattern,
+             positions: typing.Iterable[int]
+             ) -> frozenset[int]:
+    result = set()
+
+    for position in positions:
+        result.add(position)
+
+        while position < len(pattern) and pattern[position] is None:
+            position += 1
+            result.add(position)
+
+    return frozenset(result)
+
+
+def _descend(pattern: _Pattern,
+             positions: frozenset[int],
+             name: str,
+             recursive: bool
+             ) -> frozenset[int]:
+    result = set()
+
+    for position in positions:
+        if position >= len(pattern) - 1:
+            if (_trailing_recursive_matches_files and
+                    position == len(pattern) - 1 and
+                    pattern[position] is None and
+                    recursive):
+                result.add(position)
+
+            continue
+
+        segment = pattern[position]
+        if segment is None:
+            if recursive:
+                result.add(position)
+
+        elif segment(name):
+            result.add(position + 1)
+
+    return _closure(pattern, result)
+
+
+def _matches(patterns: list[_Pattern],
+             state: _State,
+             name: str,
+             exists: bool
+             ) -> bool:
+    for pattern, positions in zip(patterns, state):
+        last = len(pattern) - 1
+
+        if last not in positions:
+            continue
+
+        segment = pattern[last]
+        if segment is None:
+            if _trailing_recursive_matches_files:
+                return True
+
+        # non-wildcard segment matches only existing files
+        elif segment(name) and (exists or not isinstance(segment, _Name)):
+            return True
+
+    return False
+
+
+def _matches_all(pattern: _Pattern,
+                 positions: frozenset[int]
+                 ) -> bool:
+    last = len(pattern) - 1
+
+    for position in positions:
+        if pattern[position:] == [None, _match_any]:
+            return True
+
+        if (_trailing_recursive_matches_files and
+                position == last and
+                pattern[position] is None):
+            return True
+
+    return False
+
+
+def _follows_links(pattern: _Pattern,
+                   positions: frozenset[int]
+                   ) -> bool:
+    # non-recursive segment followed by other segments could match symbolic
+    # link to directory in any of subdirectories
+    if not positions:
+        return False
+
+    return any(segment is not None
+               for segment in pattern[min(positions):-1])
@@ -0,0 +1,271 @@
+"""Create source distribution API"""
+
+from pathlib import Path
+import collections
+import concurrent.futures
+import contextlib
+import io
+import os
+import stat
+import struct
+import tarfile
+import typing
+import zlib
+
+from mkwhl import archive
+from mkwhl import common
+from mkwhl import config
+from mkwhl import dist_info
+from mkwhl import fs
+from mkwhl import props
+from mkwhl import scan
+
+
+default_mtime: int = 315532800
+"""Default member modification time (1980-01-01, same as reproducible
+wheels) used if ``SOURCE_DATE_EPOCH`` is not set"""
+
+_gzip_block_size: int = 1024 * 1024
+_gzip_window_size: int = 32 * 1024
+
+
+def create_sdist(src_dir: Path,
+                 build_dir: Path,
+                 *,
+                 conf_path: Path = Path('pyproject.toml'),
+                 conf: common.Config | None = None,
+                 license_path: Path | None = None,
+                 src_include_patterns: typing.Iterable[str] = ['**/*'],
+                 src_exclude_patterns: typing.Iterable[str] = ['**/__pycache__/**/*'],  # NOQA
+                 data_paths: list[common.DataPath | tuple[Path, Path]] = [],  # NOQA
+                 jobs: int = 1,
+                 compress_level: int | None = None
+                 ) -> str:
+    """Create source distribution and return its name
+
+    Source distribution contains pyproject configuration, PKG-INFO and all
+    files which would be included in wheel created by
+    `mkwhl.wheel.create_wheel` with same `src_dir`, `license_path`,
+    `src_include_patterns`, `src_exclude_patterns` and `data_paths`
+    (including readme referenced by project configuration). Included files
+    keep their paths relative to directory containing pyproject
+    configuration, so all of them should be located inside this directory.
+
+    Project metadata is based only on pyproject configuration read from
+    `conf_path` (or already resolved configuration `conf`).
+
+    Members are sorted by path and have normalized tar headers - owner is
+    ``root``, permissions are ``0o644`` (or ``0o755`` for executable files)
+    and modification time is defined by ``SOURCE_DATE_EPOCH`` environment
+    variable (or `default_mtime` if not set). File content is streamed in
+    chunks into gzip stream compressed with `compress_level` (defaults to
+    zlib default level). Gzip stream is compressed in independent blocks,
+    each using previous 32KiB of data as dictionary, by `jobs` worker
+    threads. Resulting source distribution does not depend on `jobs`.
+
+    Source distribution is atomically written to `build_dir` (see
+    `mkwhl.fs.write_atomic`).
+
+    """
+    if jobs < 1:
+        raise ValueError("jobs should be positive integer")
+
+    if conf is None:
+        conf = config.get_config(conf_path)
+
+    metadata_props = props.get_metadata_props(
+        project=conf.project,
+        name=None,
+        version=None,
+        description=None,
+        readme_path=None,
+        requires_python=None,
+        license=None,
+        authors=None,
+        maintainers=None,
+        keywords=None,
+        classifiers=None,
+        urls=None,
+        dependencies=None,
+        optional_dependencies=None)
+
+    license_path = props.get_license_path(project=conf.project,
+                                          license_path=license_path)
+
+    root_dir = conf.path.parent
+    src_dir_path = _get_member_path(root_dir, src_dir)
+    file_paths = {src_dir_path / src_path.relative_to(src_dir): src_path
+                  for src_path in scan.get_paths(src_dir,
+                                                 src_include_patterns,
+                                                 src_exclude_patterns)}
+
+    for i in data_paths:
+        data_path = common.DataPath(*i)
+        data_src_path = _get_member_path(root_dir, data_path.src)
+
+        for _, src_path in scan.get_data_paths(data_path):
+            path = data_src_path / src_path.relative_to(data_path.src)
+            file_paths[path] = src_path
+
+    src_paths = [conf.path]
+
+    if license_path:
+        src_paths.append(license_path)
+
+    if metadata_props.description_path:
+        src_paths.append(metadata_props.description_path)
+
+    for src_path in src_paths:
+        file_paths[_get_member_path(root_dir, src_path)] = src_path
+
+    sdist_name = common.get_sdist_name(name=metadata_props.name,
+                                       version=metadata_props.version)
+    base_path = Path(sdist_name[:-len('.tar.gz')])
+
+    epoch = common.get_source_date_epoch()
+    mtime = epoch if epoch is not None else default_mtime
+
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    with (concurrent.futures.ThreadPoolExecutor(jobs) if jobs > 1
+          else contextlib.nullcontext()) as executor:
+        with fs.write_atomic(build_dir / sdist_name) as f:
+            gz = _GzipWriter(f=f,
+                             compress_level=compress_level,
+                             executor=executor,
+                             max_pending=2 * jobs,
+                             mtime=mtime)
+
+            with tarfile.open(fileobj=gz,
+                              mode='w',
+                              format=tarfile.PAX_FORMAT,
+                              copybufsize=archive.chunk_size) as tar:
+                data = dist_info.get_METADATA(metadata_props)
+                data = data.encode('utf-8')
+                tarinfo = _create_tarinfo(path=base_path / 'PKG-INFO',
+                                          size=len(data),
+                                          mode=0o644,
+                                          mtime=mtime)
+                tar.addfile(tarinfo, io.BytesIO(data))
+
+                for path in sorted(file_paths, key=Path.as_posix):
+                    src_path = file_paths[path]
+
+                    with open(src_path, 'rb') as src:
+                        st = os.fstat(src.fileno())
+                        mode = 0o755 if st.st_mode & stat.S_IXUSR else 0o644
+                        tarinfo = _create_tarinfo(path=base_path / path,
+                                                  size=st.st_size,
+                                                  mode=mode,
+                                                  mtime=mtime)
+                        tar.addfile(tarinfo, src)
+
+            gz.close()
+
+    return sdist_name
+
+
+class _GzipWriter:
+
+    def __init__(self,
+                 f: typing.BinaryIO,
+                 compress_level: int | None,
+                 executor: concurrent.futures.Executor | None,
+                 max_pending: int,
+                 mtime: int):
+        self._f = f
+        self._compress_level = (compress_level if compress_level is not None
+                                else zlib.Z_DEFAULT_COMPRESSION)
+        self._executor = executor
+        self._max_pending = max_pending
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._dictionary = b''
+        self._crc = 0
+        self._size = 0
+
+        xfl = (2 if self._compress_level == 9 else
+               4 if self._compress_level == 1 else 0)
+        f.write(struct.pack('<BBBBIBB', 0x1f, 0x8b, 8, 0, mtime, xfl, 255))
+
+    def tell(self) -> int:
+        return self._size + len(self._buffer)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+
+        while len(self._buffer) >= _gzip_block_size:
+            block = bytes(self._buffer[:_gzip_block_size])
+            del self._buffer[:_gzip_block_size]
+            self._write_block(block)
+
+        return len(data)
+
+    def close(self):
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer.clear()
+
+        while self._pending:
+            self._f.write(self._pending.popleft().result())
+
+        # blocks end with sync flush - stream is terminated with empty
+        # final block
+        self._f.write(b'\x03\x00')
+        self._f.write(struct.pack('<II', self._crc, self._size & 0xffffffff))
+
+    def _write_block(self, block: bytes):
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+
+        if self._executor:
+            self._pending.append(self._executor.submit(
+                _compress_block, block, self._dictionary,
+                self._compress_level))
+
+            while len(self._pending) > self._max_pending:
+                self._f.write(self._pending.popleft().result())
+
+        else:
+            self._f.write(_compress_block(block, self._dictionary,
+                                          self._compress_level))
+
+        self._dictionary = block[-_gzip_window_size:]
+
+
+def _compress_block(block: bytes,
+                    dictionary: bytes,
+                    compress_level: int
+                    ) -> bytes:
+    args = [compress_level, zlib.DEFLATED, -zlib.MAX_WBITS]
+    if dictionary:
+        args.extend([zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY, dictionary])
+
+    compressor = zlib.compressobj(*args)
+    return compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _get_member_path(root_dir: Path,
+                     src_path: Path
+                     ) -> Path:
+    path = Path(os.path.relpath(src_path, root_dir))
+    if path.parts[:1] == ('..', ):
+        raise Exception(f"{src_path} is not in project directory")
+
+    return path
+
+
+def _create_tarinfo(path: Path,
+                    size: int,
+                    mode: int,
+                    mtime: int
+                    ) -> tarfile.TarInfo:
+    tarinfo = tarfile.TarInfo(path.as_posix())
+    tarinfo.size = size
+    tarinfo.mode = mode
+    tarinfo.mtime = mtime
+    tarinfo.uid = 0
+    tarinfo.gid = 0
+    tarinfo.uname = 'root'
+    tarinfo.gname = 'root'
+    return tarinfo
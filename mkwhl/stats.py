@@ -0,0 +1,169 @@
+"""Build statistics collector"""
+
+from pathlib import Path
+import contextlib
+import heapq
+import threading
+import time
+import typing
+
+
+default_slowest_count: int = 10
+"""Default number of slowest files included in report"""
+
+
+class FileStats(typing.NamedTuple):
+    """Single member statistics
+
+    Duration is wall time of reading, hashing and compressing member
+    content (excluding time spent waiting for worker threads).
+
+    """
+    path: Path
+    size: int
+    compress_size: int
+    duration: float
+
+
+class Stats:
+    """Build statistics collector
+
+    Instance is passed to `mkwhl.wheel.create_wheel` (or other wheel
+    creating functions) which record per-phase wall and CPU time and
+    per-member sizes during build. Single instance can be used for
+    multiple builds - all values are accumulated.
+
+    Phases measured concurrently by multiple worker threads accumulate
+    time of each thread, so phase wall time can exceed total wall time.
+    Phase CPU time is CPU time of thread measuring phase.
+
+    """
+
+    def __init__(self, slowest_count: int = default_slowest_count):
+        self._slowest_count = slowest_count
+        self._lock = threading.Lock()
+        self._wall = 0
+        self._cpu = 0
+        self._phases = {}
+        self._files = 0
+        self._size = 0
+        self._compress_size = 0
+        self._copied = 0
+        self._wheels = []
+        self._slowest = []
+        self._counter = 0
+
+    @contextlib.contextmanager
+    def measure(self, phase: str) -> typing.Iterator[None]:
+        """Context measuring time spent in `phase`"""
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+
+        try:
+            yield
+
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+
+            with self._lock:
+                phase_wall, phase_cpu = self._phases.get(phase, (0, 0))
+                self._phases[phase] = phase_wall + wall, phase_cpu + cpu
+
+    @contextlib.contextmanager
+    def measure_total(self) -> typing.Iterator[None]:
+        """Context measuring total build time"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield
+
+        finally:
+            with self._lock:
+                self._wall += time.perf_counter() - wall
+                self._cpu += time.process_time() - cpu
+
+    def add_file(self, file_stats: FileStats):
+        """Record member added to wheel"""
+        with self._lock:
+            self._files += 1
+            self._size += file_stats.size
+            self._compress_size += file_stats.compress_size
+
+            # counter prevents comparison of paths with same duration
+            item = file_stats.duration, self._counter, file_stats
+            self._counter += 1
+
+            if len(self._slowest) < self._slowest_count:
+                heapq.heappush(self._slowest, item)
+
+            elif self._slowest and item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def add_copied(self, size: int):
+        """Record number of bytes copied between user space buffers
+
+        Data copied by kernel (memory mapped files, ``os.copy_file_range``)
+        is not included.
+
+        """
+        with self._lock:
+            self._copied += size
+
+    def add_wheel(self, path: Path, size: int | None = None):
+        """Record created wheel
+
+        If `size` is not provided, it is size of file `path`.
+
+        """
+        if size is None:
+            size = path.stat().st_size
+
+        with self._lock:
+            self._wheels.append((path.name, size))
+
+    def get_report(self) -> dict[str, typing.Any]:
+        """Get JSON serializable report"""
+        with self._lock:
+            slowest = sorted(self._slowest, reverse=True)
+
+            return {
+                'wall': self._wall,
+                'cpu': self._cpu,
+                'phases': {phase: {'wall': wall, 'cpu': cpu}
+                           for phase, (wall, cpu) in self._phases.items()},
+                'files': self._files,
+                'bytes_in': self._size,
+                'bytes_compressed': self._compress_size,
+                'bytes_out': sum(size for _, size in self._wheels),
+                'bytes_copied': self._copied,
+                'compression_ratio': (self._compress_size / self._size
+                                      if self._size else None),
+                'copy_ratio': (self._copied / self._size
+                               if self._size else None),
+                'wheels': [{'name': name, 'size': size}
+                           for name, size in self._wheels],
+                'slowest_files': [{'path': str(i.path),
+                                   'size': i.size,
+                                   'compress_size': i.compress_size,
+                                   'duration': i.duration}
+                                  for _, _, i in slowest]}
+
+
+def measure(stats: Stats | None,
+            phase: str
+            ) -> typing.ContextManager[None]:
+    """Measure phase if `stats` is not ``None``"""
+    if stats is None:
+        return contextlib.nullcontext()
+
+    return stats.measure(phase)
+
+
+def measure_total(stats: Stats | None) -> typing.ContextManager[None]:
+    """Measure total build time if `stats` is not ``None``"""
+    if stats is None:
+        return contextlib.nullcontext()
+
+    return stats.measure_total()
@@ -0,0 +1,165 @@
+"""Wheel verification based on RECORD"""
+
+from pathlib import Path
+import collections
+import concurrent.futures
+import hashlib
+import os
+import typing
+import zipfile
+import zlib
+
+from mkwhl import archive
+from mkwhl import dist_info
+
+
+# errors raised by zipfile while reading member (unsupported compression
+# method raises NotImplementedError and encrypted member RuntimeError)
+_member_errors = (OSError, EOFError, RuntimeError, NotImplementedError,
+                  zlib.error, zipfile.BadZipFile)
+
+
+class VerifyResult(typing.NamedTuple):
+    """Single wheel verification result
+
+    Wheel is valid if `errors` is empty.
+
+    """
+    wheel_path: Path
+    errors: list[str]
+
+
+def verify_wheels(wheel_paths: typing.Iterable[Path],
+                  jobs: int | None = None
+                  ) -> list[VerifyResult]:
+    """Verify wheels content against their RECORD files
+
+    Each wheel member is decompressed and hashed with SHA-256 by one of
+    `jobs` worker threads (defaults to number of CPUs). Member content is
+    streamed in chunks, so memory usage does not depend on member sizes.
+    At most ``2 * jobs`` wheels are opened at the same time.
+
+    Wheel is considered invalid if RECORD is missing or malformed, if
+    member can not be read (including unsupported compression methods and
+    encrypted members), if member's hash or size differs from its RECORD
+    entry, if member is not listed in RECORD or if RECORD entry references
+    missing member. RECORD signature files (``RECORD.jws`` and
+    ``RECORD.p7s``) do not have to be listed in RECORD.
+
+    Results are returned in same order as `wheel_paths`.
+
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = []
+    pending = collections.deque()
+
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        for wheel_path in wheel_paths:
+            pending.append(_Verification(executor, Path(wheel_path)))
+
+            while len(pending) > 2 * jobs:
+                results.append(pending.popleft().get_result())
+
+        while pending:
+            results.append(pending.popleft().get_result())
+
+    return results
+
+
+class _Verification:
+
+    def __init__(self,
+                 executor: concurrent.futures.Executor,
+                 wheel_path: Path):
+        self._wheel_path = wheel_path
+        self._errors = []
+        self._futures = collections.deque()
+        self._whl = None
+
+        try:
+            self._whl = zipfile.ZipFile(wheel_path)
+            self._submit(executor)
+
+        except (ValueError, *_member_errors) as e:
+            self._errors.append(f"invalid wheel: {e}")
+
+    def get_result(self) -> VerifyResult:
+        try:
+            for name, record, future in self._futures:
+                try:
+                    sha256, size = future.result()
+
+                except _member_errors as e:
+                    self._errors.append(f"{name}: {e}")
+                    continue
+
+                if record.sha256 != sha256:
+                    self._errors.append(f"{name}: hash mismatch")
+
+                if record.size is not None and record.size != size:
+                    self._errors.append(f"{name}: size mismatch")
+
+        finally:
+            if self._whl:
+                self._whl.close()
+
+        return VerifyResult(wheel_path=self._wheel_path,
+                            errors=self._errors)
+
+    def _submit(self, executor: concurrent.futures.Executor):
+        infos = [i for i in self._whl.infolist() if not i.is_dir()]
+
+        record_names = [i.filename for i in infos
+                        if i.filename.count('/') == 1 and
+                        i.filename.endswith('.dist-info/RECORD')]
+        if len(record_names) != 1:
+            raise ValueError('RECORD not found' if not record_names
+                             else 'multiple RECORD files')
+
+        record_name = record_names[0]
+        signature_names = {f'{record_name}.jws', f'{record_name}.p7s'}
+        records = {}
+        for record in dist_info.parse_RECORD(
+                self._whl.read(record_name).decode('utf-8')):
+            name = record.path.as_posix()
+            if name in records:
+                self._errors.append(f"{name}: duplicate RECORD entry")
+
+            records[name] = record
+
+        for info in infos:
+            record = records.pop(info.filename, None)
+
+            if record is None:
+                if info.filename not in signature_names:
+                    self._errors.append(f"{info.filename}: not in RECORD")
+
+            elif record.sha256 is None:
+                if info.filename != record_name:
+                    self._errors.append(f"{info.filename}: missing hash")
+
+            else:
+                future = executor.submit(_hash_member, self._whl, info)
+                self._futures.append((info.filename, record, future))
+
+        for name in records:
+            self._errors.append(f"{name}: missing from wheel")
+
+
+def _hash_member(whl: zipfile.ZipFile,
+                 info: zipfile.ZipInfo
+                 ) -> tuple[bytes, int]:
+    sha256 = hashlib.sha256()
+    size = 0
+
+    # CRC is checked by zipfile once all data is read
+    with whl.open(info) as f:
+        while True:
+            chunk = f.read(archive.chunk_size)
+            if not chunk:
+                break
+
+            sha256.update(chunk)
+            size += len(chunk)
+
+    return sha256.digest(), size
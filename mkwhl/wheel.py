@@ -2,14 +2,75 @@
 
 from pathlib import Path
 import collections
+import concurrent.futures
+import contextlib
+import copy
 import hashlib
-import itertools
+import importlib.machinery
+import io
+import json
+import shutil
+import stat
+import tempfile
+import threading
+import time
 import typing
 import zipfile
 
+from mkwhl import archive
+from mkwhl import bytecode
 from mkwhl import common
+from mkwhl import config
 from mkwhl import dist_info
+from mkwhl import fs
 from mkwhl import props
+from mkwhl import scan
+from mkwhl import stats as stats_
+from mkwhl.cache import Cache
+
+
+_batch_max_size: int = 1024 * 1024
+_batch_max_count: int = 64
+_priority_min_size: int = 16 * 1024 * 1024
+_priority_max_count: int = 64
+
+# top-level names are resolved with single dictionary lookup - submodules
+# are found by standard path finder based on package's search locations
+_editable_finder_template: str = """\
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+
+_locations = {locations}
+
+
+class _Finder:
+
+    @classmethod
+    def find_spec(cls, fullname, path=None, target=None):
+        location = _locations.get(fullname)
+        if location is None:
+            return None
+
+        if not os.path.isdir(location):
+            return importlib.util.spec_from_file_location(fullname, location)
+
+        init_path = os.path.join(location, '__init__.py')
+        if os.path.isfile(init_path):
+            return importlib.util.spec_from_file_location(
+                fullname, init_path, submodule_search_locations=[location])
+
+        spec = importlib.machinery.ModuleSpec(fullname, None, is_package=True)
+        spec.submodule_search_locations = [location]
+        return spec
+
+
+def install():
+    if _Finder not in sys.meta_path:
+        sys.meta_path.insert(0, _Finder)
+"""
 
 
 def create_wheel(src_dir: Path,
@@ -32,15 +93,33 @@ def create_wheel(src_dir: Path,
                  dependencies: list[str] | None = None,
                  optional_dependencies: dict[str, list[str]] | None = None,
                  conf_path: Path | None = Path('pyproject.toml'),
+                 conf: common.Config | None = None,
                  editable: bool = False,
+                 editable_finder: bool = False,
                  src_include_patterns: typing.Iterable[str] = ['**/*'],
                  src_exclude_patterns: typing.Iterable[str] = ['**/__pycache__/**/*'],  # NOQA
-                 data_paths: list[tuple[Path, Path]] = [],
+                 data_paths: list[common.DataPath | tuple[Path, Path]] = [],  # NOQA
+                 precompile: bool = False,
+                 precompile_optimize: int = 0,
+                 precompile_python: Path | None = None,
                  build_tag: int | None = None,
                  python_tag: str = 'py3',
                  abi_tag: str = 'none',
                  platform_tag: str = 'any',
-                 is_purelib: bool = True
+                 is_purelib: bool = True,
+                 jobs: int = 1,
+                 executor: concurrent.futures.Executor | None = None,
+                 cache: Cache | None = None,
+                 compression: common.CompressionPolicy = common.CompressionPolicy(),  # NOQA
+                 large_file_size: int | None = archive.default_large_file_size,  # NOQA
+                 dist_info_dir: Path | None = None,
+                 stats: stats_.Stats | None = None,
+                 reproducible: bool = False,
+                 incremental: bool = False,
+                 lock: bool = False,
+                 output: typing.BinaryIO | None = None,
+                 progress: typing.Callable[[common.Progress], None] | None = None,  # NOQA
+                 abort: threading.Event | None = None
                  ) -> str:
     """Create wheel and return wheel name
 
@@ -61,6 +140,9 @@ def create_wheel(src_dir: Path,
 
     If `conf_path` is ``None``, resulting wheel will be created based only
     on provided arguments without parsing of pyproject configuration.
+    Parsed configuration is memoized (see `mkwhl.config.get_config`).
+    Already resolved configuration can be provided with `conf`, in which
+    case `conf_path` is ignored.
 
     Arguments `src_include_patterns` and `src_exclude_patterns` provide
     list of strings used as `pathlib.Path.glob` patterns applied to
@@ -69,14 +151,735 @@ def create_wheel(src_dir: Path,
     included in resulting wheel, even if same file is specified by include
     pattern.
 
-    Argument `data_paths` defines list of (source, destination) paths to be
-    included in wheel's data directory.
+    Argument `data_paths` defines list of data paths included in wheel's
+    data directory (see `mkwhl.common.DataPath`). Each data path can also
+    be provided as (source, destination) tuple of file or directory
+    included in ``data`` scheme.
+
+    If `editable` is set, source files are not included in wheel. Instead,
+    wheel contains .pth file which adds `src_dir` to beginning of
+    `sys.path`. If `editable_finder` is also set, `src_dir` is scanned
+    with `src_include_patterns` and `src_exclude_patterns` and wheel
+    contains meta path finder which maps only found top-level packages and
+    modules to their locations, so other imports do not search `src_dir`.
+
+    If `precompile` is set (and `editable` is not set), included ``.py``
+    source files are compiled by target interpreter `precompile_python`
+    (defaults to current interpreter) with optimization level
+    `precompile_optimize` and resulting ``__pycache__`` entries are
+    included in wheel (see `mkwhl.bytecode.compile_files`). Existing
+    ``__pycache__`` directories in `src_dir` are not used, so they should
+    remain excluded by `src_exclude_patterns`.
+
+    If `jobs` is greater than 1, files are read, hashed and compressed
+    concurrently by `jobs` worker threads, while members are still added
+    to wheel in same order as in sequential mode. Largest files (up to 64
+    files not smaller than 16MiB) are compressed first and their
+    compressed data is stored in temporary files in `build_dir` until it
+    is written. Other files are compressed in batches - at most
+    ``2 * jobs`` batches are compressed ahead of writing, which bounds
+    memory used by compressed data. If `executor` is provided, files are
+    read, hashed and compressed by its workers instead of newly created
+    worker threads (this allows sharing of bounded executor between
+    concurrent builds).
+
+    If `cache` is provided, compressed content of files not changed since
+    previous build is taken from cache instead of reading and compressing
+    files. Cache is flushed once wheel is created.
+
+    Argument `compression` defines compression type and level of each
+    wheel member (see `mkwhl.common.CompressionPolicy`).
+
+    Files not smaller than `large_file_size` are memory mapped instead of
+    read into buffers and, if stored without compression, copied to wheel
+    by kernel (see `mkwhl.archive.compress_file`). Large file I/O path is
+    disabled if `large_file_size` is ``None``.
+
+    If `dist_info_dir` is provided, it should reference .dist-info
+    directory previously created with `create_dist_info`. Content of this
+    directory is included in wheel instead of generating new .dist-info
+    files.
+
+    If `stats` is provided, per-phase timing and member sizes are recorded
+    (see `mkwhl.stats.Stats`).
+
+    If `reproducible` is set, wheel content depends only on inputs: source
+    and data members are sorted by member path, all members have timestamp
+    defined by ``SOURCE_DATE_EPOCH`` environment variable (or 1980-01-01 if
+    not set) and permissions are normalized to ``0o644`` (or ``0o755`` for
+    executable files).
+
+    If `incremental` is set and wheel with same name was previously created
+    in `build_dir` with `incremental` set, members whose source files are
+    not modified (based on size, modification time, inode and mode stored
+    alongside previous wheel) are copied from previous wheel without
+    recompression. Resulting wheel is same as wheel created without
+    `incremental`.
+
+    If `lock` is set, exclusive advisory lock of wheel name (lock file in
+    `build_dir`, see `mkwhl.fs.lock`) is held during wheel creation, so
+    concurrent builds of same wheel in same `build_dir` wait for each
+    other. If wheel was previously created with `lock` set, from same
+    arguments and unmodified source files (based on size, modification
+    time, inode and mode), and was not replaced since, existing wheel is
+    reused instead of being created again.
+
+    If `output` is provided, wheel is written to this writable binary
+    stream instead of file in `build_dir`, which is then used only for
+    temporary files (see `write_wheel`). Seekable and readable stream (e.g.
+    `io.BytesIO` or file opened in ``'w+b'`` mode) is written same as file
+    in `build_dir`. Other streams (e.g. pipes or stdout) are written
+    sequentially, without seeking, so members whose size is not known in
+    advance are followed by data descriptors. Stream is not closed and it
+    is not truncated if wheel creation fails. Arguments `incremental` and
+    `lock` are not supported with `output`.
+
+    If `progress` is provided, it is called with `mkwhl.common.Progress`
+    once source files are scanned and after each file member is added to
+    wheel. Exception raised by `progress` aborts wheel creation. Progress
+    is not reported if existing wheel is reused (see `lock`).
+
+    If `abort` is provided and set (possibly from other thread), wheel
+    creation is aborted with `mkwhl.common.AbortedError`. Abort is checked
+    while scanning source files, during bytecode compilation and while
+    reading each file, so large files are not read to the end.
+
+    Wheel is written to temporary file in `build_dir` which is synchronized
+    to disk and renamed to wheel name once wheel is complete, so existing
+    wheel with same name is atomically replaced. If wheel creation fails
+    (or is interrupted), temporary file is removed and existing wheel is
+    not modified.
+
+    """
+    tag_set = common.TagSet(python_tag=python_tag,
+                            abi_tag=abi_tag,
+                            platform_tag=platform_tag,
+                            build_tag=build_tag)
+
+    wheel_names = create_tagged_wheels(
+        src_dir=src_dir,
+        build_dir=build_dir,
+        tag_sets=[tag_set],
+        name=name,
+        version=version,
+        description=description,
+        readme_path=readme_path,
+        requires_python=requires_python,
+        license=license,
+        license_path=license_path,
+        authors=authors,
+        maintainers=maintainers,
+        keywords=keywords,
+        classifiers=classifiers,
+        urls=urls,
+        scripts=scripts,
+        gui_scripts=gui_scripts,
+        dependencies=dependencies,
+        optional_dependencies=optional_dependencies,
+        conf_path=conf_path,
+        conf=conf,
+        editable=editable,
+        editable_finder=editable_finder,
+        src_include_patterns=src_include_patterns,
+        src_exclude_patterns=src_exclude_patterns,
+        data_paths=data_paths,
+        precompile=precompile,
+        precompile_optimize=precompile_optimize,
+        precompile_python=precompile_python,
+        is_purelib=is_purelib,
+        jobs=jobs,
+        executor=executor,
+        cache=cache,
+        compression=compression,
+        large_file_size=large_file_size,
+        dist_info_dir=dist_info_dir,
+        stats=stats,
+        reproducible=reproducible,
+        incremental=incremental,
+        lock=lock,
+        outputs=[output] if output is not None else None,
+        progress=progress,
+        abort=abort)
+
+    return wheel_names[0]
+
+
+def write_wheel(src_dir: Path,
+                f: typing.BinaryIO,
+                *,
+                build_dir: Path | None = None,
+                **kwargs
+                ) -> common.WheelOutput:
+    """Create wheel, write it to binary stream and return its name, digest
+    and size
+
+    Wheel is created by `create_wheel`, called with provided arguments, and
+    written to writable binary stream `f` (e.g. `io.BytesIO`, spooled
+    temporary file, pipe or upload stream). SHA256 digest and size of
+    wheel are computed while writing to sequential stream. Seekable and
+    readable stream is written without data descriptors, so its digest is
+    computed by reading written data back.
+
+    Temporary files are created in `build_dir` (defaults to new temporary
+    directory removed once wheel is written).
+
+    """
+    writer = _StreamWriter(f)
+
+    with (contextlib.nullcontext(build_dir) if build_dir is not None
+          else tempfile.TemporaryDirectory()) as tmp_dir:
+        wheel_name = create_wheel(src_dir=src_dir,
+                                  build_dir=Path(tmp_dir),
+                                  output=writer,
+                                  **kwargs)
+
+    return common.WheelOutput(name=wheel_name,
+                              sha256=writer.sha256,
+                              size=writer.size)
+
+
+def create_tagged_wheels(src_dir: Path,
+                         build_dir: Path,
+                         tag_sets: list[common.TagSet],
+                         *,
+                         name: str | None = None,
+                         version: str | None = None,
+                         description: str | None = None,
+                         readme_path: Path | None = None,
+                         requires_python: str | None = None,
+                         license: str | None = None,
+                         license_path: Path | None = None,
+                         authors: list[tuple[str | None, str | None]] | None = None,  # NOQA
+                         maintainers: list[tuple[str | None, str | None]] | None = None,  # NOQA
+                         keywords: list[str] | None = None,
+                         classifiers: list[str] | None = None,
+                         urls: dict[str, str] | None = None,
+                         scripts: dict[str, str] | None = None,
+                         gui_scripts: dict[str, str] | None = None,
+                         dependencies: list[str] | None = None,
+                         optional_dependencies: dict[str, list[str]] | None = None,  # NOQA
+                         conf_path: Path | None = Path('pyproject.toml'),
+                         conf: common.Config | None = None,
+                         editable: bool = False,
+                         editable_finder: bool = False,
+                         src_include_patterns: typing.Iterable[str] = ['**/*'],  # NOQA
+                         src_exclude_patterns: typing.Iterable[str] = ['**/__pycache__/**/*'],  # NOQA
+                         data_paths: list[common.DataPath | tuple[Path, Path]] = [],  # NOQA
+                         precompile: bool = False,
+                         precompile_optimize: int = 0,
+                         precompile_python: Path | None = None,
+                         is_purelib: bool = True,
+                         jobs: int = 1,
+                         executor: concurrent.futures.Executor | None = None,
+                         cache: Cache | None = None,
+                         compression: common.CompressionPolicy = common.CompressionPolicy(),  # NOQA
+                         large_file_size: int | None = archive.default_large_file_size,  # NOQA
+                         dist_info_dir: Path | None = None,
+                         stats: stats_.Stats | None = None,
+                         reproducible: bool = False,
+                         incremental: bool = False,
+                         lock: bool = False,
+                         outputs: list[typing.BinaryIO] | None = None,
+                         progress: typing.Callable[[common.Progress], None] | None = None,  # NOQA
+                         abort: threading.Event | None = None
+                         ) -> list[str]:
+    """Create wheels with same content for multiple tag sets
+
+    Source files are scanned, hashed and compressed only once. For each tag
+    set, new wheel containing same compressed members is created - only
+    wheel name and .dist-info WHEEL and RECORD files differ between wheels.
+    List of resulting wheel names, in same order as `tag_sets`, is
+    returned.
+
+    If `outputs` is provided, it contains binary stream for each tag set
+    (in same order as `tag_sets`) used instead of file in `build_dir` (see
+    `output` argument of `create_wheel`).
+
+    All other arguments have same meaning as in `create_wheel`.
 
     """
-    conf = common.get_conf(conf_path) if conf_path else {}
-    project = (common.Project(conf=conf['project'],
-                              path=conf_path.parent)
-               if 'project' in conf else None)
+    if jobs < 1:
+        raise ValueError("jobs should be positive integer")
+
+    writers = None
+    if outputs is not None:
+        if len(outputs) != len(tag_sets):
+            raise ValueError("number of outputs differs from number of "
+                             "tag sets")
+
+        if incremental:
+            raise ValueError("incremental is not supported with outputs")
+
+        if lock:
+            raise ValueError("lock is not supported with outputs")
+
+        writers = [i if isinstance(i, _StreamWriter) else _StreamWriter(i)
+                   for i in outputs]
+
+    with stats_.measure_total(stats), contextlib.ExitStack() as lock_stack:
+        with stats_.measure(stats, 'config'):
+            dist_props = _get_props(
+                name=name,
+                version=version,
+                description=description,
+                readme_path=readme_path,
+                requires_python=requires_python,
+                license=license,
+                license_path=license_path,
+                authors=authors,
+                maintainers=maintainers,
+                keywords=keywords,
+                classifiers=classifiers,
+                urls=urls,
+                scripts=scripts,
+                gui_scripts=gui_scripts,
+                dependencies=dependencies,
+                optional_dependencies=optional_dependencies,
+                conf_path=conf_path,
+                conf=conf)
+        metadata_props = dist_props.metadata
+
+        wheel_names = [
+            common.get_wheel_name(name=metadata_props.name,
+                                  version=metadata_props.version,
+                                  build_tag=tag_set.build_tag,
+                                  python_tag=tag_set.python_tag,
+                                  abi_tag=tag_set.abi_tag,
+                                  platform_tag=tag_set.platform_tag)
+            for tag_set in tag_sets]
+
+        wheels_props = [
+            props.get_wheel_props(build_tag=tag_set.build_tag,
+                                  python_tag=tag_set.python_tag,
+                                  abi_tag=tag_set.abi_tag,
+                                  platform_tag=tag_set.platform_tag,
+                                  is_purelib=is_purelib)
+            for tag_set in tag_sets]
+
+        dist_info_name = common.get_dist_info_name(
+            name=metadata_props.name,
+            version=metadata_props.version)
+        dist_info_path = Path(dist_info_name)
+
+        data_name = common.get_data_name(name=metadata_props.name,
+                                         version=metadata_props.version)
+        data_path = Path(data_name)
+
+        build_dir.mkdir(parents=True,
+                        exist_ok=True)
+
+        # locks are acquired in same order by all builds
+        lock_files = {}
+        if lock:
+            with stats_.measure(stats, 'lock'):
+                for wheel_name in sorted(set(wheel_names)):
+                    lock_files[wheel_name] = lock_stack.enter_context(
+                        fs.lock(build_dir / f'.{wheel_name}.lock'))
+
+        file_paths = collections.deque()
+        data_file_paths = collections.deque()
+        finder_locations = None
+        with stats_.measure(stats, 'scan'):
+            if editable and editable_finder:
+                finder_locations = _get_editable_finder_locations(
+                    src_dir=src_dir,
+                    include_patterns=src_include_patterns,
+                    exclude_patterns=src_exclude_patterns)
+
+            if not editable:
+                for src_path in scan.get_paths(src_dir, src_include_patterns,
+                                               src_exclude_patterns):
+                    common.check_abort(abort)
+                    file_paths.append((src_path.relative_to(src_dir),
+                                       src_path))
+
+                for i in data_paths:
+                    for dst_path, src_path in scan.get_data_paths(i):
+                        common.check_abort(abort)
+                        data_file_paths.append((data_path / dst_path,
+                                                src_path))
+
+        date_time = _get_reproducible_date_time() if reproducible else None
+
+        build_key = None
+        if lock:
+            with stats_.measure(stats, 'lock'):
+                build_key = _get_build_key(
+                    params=repr((dist_props, wheels_props,
+                                 src_dir.resolve(), data_paths, editable,
+                                 finder_locations, precompile,
+                                 precompile_optimize, precompile_python,
+                                 compression, date_time)),
+                    src_paths=[
+                        *(src_path for _, src_path in file_paths),
+                        *(src_path for _, src_path in data_file_paths),
+                        *(sorted(dist_info_dir.iterdir()) if dist_info_dir
+                          else []),
+                        *filter(None, [dist_props.license_path,
+                                       metadata_props.description_path])])
+
+                built = _is_built(build_dir=build_dir,
+                                  lock_files=lock_files,
+                                  build_key=build_key)
+
+            if built:
+                if stats:
+                    for wheel_name in wheel_names:
+                        stats.add_wheel(build_dir / wheel_name)
+
+                return wheel_names
+
+        # temporary directory is removed once wheel is created, if
+        # compilation fails (or is aborted) or when garbage collected if
+        # wheel creation fails after compilation
+        bytecode_dir = None
+        if precompile and not editable:
+            with stats_.measure(stats, 'precompile'):
+                bytecode_dir = tempfile.TemporaryDirectory(dir=build_dir)
+
+                try:
+                    file_paths.extend(bytecode.compile_files(
+                        paths=[(path, src_path)
+                               for path, src_path in file_paths
+                               if path.suffix == '.py'],
+                        dst_dir=Path(bytecode_dir.name),
+                        optimize=precompile_optimize,
+                        python=precompile_python,
+                        abort=abort))
+
+                except BaseException:
+                    bytecode_dir.cleanup()
+                    raise
+
+        with stats_.measure(stats, 'scan'):
+            if not editable:
+                file_paths.extend(data_file_paths)
+
+                if reproducible:
+                    file_paths = collections.deque(
+                        sorted(file_paths, key=lambda i: i[0].as_posix()))
+
+            if dist_info_dir:
+                for src_path in sorted(dist_info_dir.iterdir()):
+                    if (src_path.name in ('RECORD', 'WHEEL') or
+                            src_path.is_dir()):
+                        continue
+
+                    file_paths.append((dist_info_path / src_path.name,
+                                       src_path))
+
+            elif dist_props.license_path:
+                file_paths.append(
+                    (dist_info_path / dist_props.license_path.name,
+                     dist_props.license_path))
+
+        records = collections.deque()
+
+        index_path = build_dir / f'.{wheel_names[0]}.incremental'
+        index_params = repr((compression, date_time))
+        index = {}
+        reusable = {}
+
+        total_files = len(file_paths)
+        files = 0
+        size = 0
+        if progress:
+            progress(common.Progress(files=files,
+                                     total_files=total_files,
+                                     size=size))
+
+        with contextlib.ExitStack() as exit_stack:
+            if bytecode_dir:
+                exit_stack.enter_context(bytecode_dir)
+
+            # temporary files replace existing wheels only after previous
+            # wheel and new archives are closed
+            dsts = writers or [
+                exit_stack.enter_context(
+                    fs.write_atomic(build_dir / wheel_name))
+                for wheel_name in wheel_names]
+
+            if incremental:
+                with stats_.measure(stats, 'incremental'):
+                    previous = _open_previous(
+                        wheel_path=build_dir / wheel_names[0],
+                        index_path=index_path,
+                        index_params=index_params)
+
+                    if previous:
+                        exit_stack.enter_context(previous.whl)
+
+                    reusable = _get_reusable(previous=previous,
+                                             file_paths=file_paths,
+                                             index=index)
+
+            # index is valid only for successfully created wheel
+            if writers is None:
+                index_path.unlink(missing_ok=True)
+
+            whls = [exit_stack.enter_context(
+                        zipfile.ZipFile(
+                            dst, "w", zipfile.ZIP_DEFLATED,
+                            compresslevel=compression.compress_level))
+                    for dst in dsts]
+
+            if editable and editable_finder:
+                finder_name = _get_editable_finder_name(metadata_props.name)
+                data = _get_editable_finder(finder_locations)
+                record = _whls_write(whls=whls,
+                                     path=Path(f'{finder_name}.py'),
+                                     data=data.encode('utf-8'),
+                                     date_time=date_time,
+                                     stats=stats)
+                records.append(record)
+
+                data = f"import {finder_name}; {finder_name}.install()\n"
+                record = _whls_write(whls=whls,
+                                     path=Path(f'{metadata_props.name}.pth'),
+                                     data=data.encode('utf-8'),
+                                     date_time=date_time,
+                                     stats=stats)
+                records.append(record)
+
+            elif editable:
+                data = _get_editable_pth(src_dir)
+                record = _whls_write(whls=whls,
+                                     path=Path(f'{metadata_props.name}.pth'),
+                                     data=data.encode('utf-8'),
+                                     date_time=date_time,
+                                     stats=stats)
+                records.append(record)
+
+            if jobs > 1 or executor or cache or len(whls) > 1:
+                file_records = _whls_write_files_compressed(
+                    whls=whls,
+                    file_paths=file_paths,
+                    jobs=jobs,
+                    executor=executor,
+                    compression=compression,
+                    spool_dir=build_dir,
+                    compress_file=(cache.compress_file if cache
+                                   else archive.compress_file),
+                    large_file_size=large_file_size,
+                    date_time=date_time,
+                    reusable=reusable,
+                    stats=stats,
+                    abort=abort)
+
+            else:
+                file_records = _whl_write_files(
+                    whls=whls,
+                    file_paths=file_paths,
+                    compression=compression,
+                    large_file_size=large_file_size,
+                    spool_dir=build_dir,
+                    date_time=date_time,
+                    reusable=reusable,
+                    stats=stats,
+                    abort=abort)
+
+            # generator is closed before archives so that pending
+            # compressions are cancelled if adding of members is aborted
+            exit_stack.enter_context(contextlib.closing(file_records))
+
+            for record in file_records:
+                common.check_abort(abort)
+                records.append(record)
+
+                if progress:
+                    files += 1
+                    size += record.size
+                    progress(common.Progress(files=files,
+                                             total_files=total_files,
+                                             size=size))
+
+            if not dist_info_dir:
+                with stats_.measure(stats, 'metadata'):
+                    dist_info_files = list(_get_dist_info_files(dist_props))
+
+                for file_name, data in dist_info_files:
+                    record = _whls_write(whls=whls,
+                                         path=dist_info_path / file_name,
+                                         data=data,
+                                         date_time=date_time,
+                                         stats=stats)
+                    records.append(record)
+
+            for whl, wheel_props in zip(whls, wheels_props):
+                with stats_.measure(stats, 'metadata'):
+                    data = dist_info.get_WHEEL(wheel_props)
+
+                wheel_record = _whls_write(whls=[whl],
+                                           path=dist_info_path / 'WHEEL',
+                                           data=data.encode('utf-8'),
+                                           date_time=date_time,
+                                           stats=stats)
+
+                record_record = common.WheelRecord(
+                    path=dist_info_path / 'RECORD',
+                    sha256=None,
+                    size=None)
+
+                with stats_.measure(stats, 'record'):
+                    data = dist_info.get_RECORD([*records, wheel_record,
+                                                 record_record])
+
+                _whls_write(whls=[whl],
+                            path=record_record.path,
+                            data=data.encode('utf-8'),
+                            date_time=date_time,
+                            stats=stats)
+
+        if incremental:
+            for record in records:
+                key = index.get(record.path.as_posix())
+                if key is not None:
+                    key.append(record.sha256.hex())
+
+            index_path.write_text(json.dumps({'params': index_params,
+                                              'members': index}),
+                                  'utf-8')
+
+        if lock:
+            with stats_.measure(stats, 'lock'):
+                _write_build_stamps(build_dir=build_dir,
+                                    lock_files=lock_files,
+                                    build_key=build_key)
+
+        if cache:
+            with stats_.measure(stats, 'cache'):
+                cache.flush()
+
+        if stats:
+            for i, wheel_name in enumerate(wheel_names):
+                if writers is None:
+                    stats.add_wheel(build_dir / wheel_name)
+
+                else:
+                    stats.add_wheel(Path(wheel_name), writers[i].size)
+
+    return wheel_names
+
+
+def create_dist_info(metadata_dir: Path,
+                     *,
+                     name: str | None = None,
+                     version: str | None = None,
+                     description: str | None = None,
+                     readme_path: Path | None = None,
+                     requires_python: str | None = None,
+                     license: str | None = None,
+                     license_path: Path | None = None,
+                     authors: list[tuple[str | None, str | None]] | None = None,  # NOQA
+                     maintainers: list[tuple[str | None, str | None]] | None = None,  # NOQA
+                     keywords: list[str] | None = None,
+                     classifiers: list[str] | None = None,
+                     urls: dict[str, str] | None = None,
+                     scripts: dict[str, str] | None = None,
+                     gui_scripts: dict[str, str] | None = None,
+                     dependencies: list[str] | None = None,
+                     optional_dependencies: dict[str, list[str]] | None = None,  # NOQA
+                     conf_path: Path | None = Path('pyproject.toml'),
+                     conf: common.Config | None = None,
+                     build_tag: int | None = None,
+                     python_tag: str = 'py3',
+                     abi_tag: str = 'none',
+                     platform_tag: str = 'any',
+                     is_purelib: bool = True
+                     ) -> str:
+    """Create .dist-info directory and return its name
+
+    Argument `metadata_dir` is path to directory where .dist-info directory
+    will be created. Directory contains all .dist-info files which would
+    be included in wheel created by `create_wheel`, except RECORD.
+    Source files are not scanned.
+
+    All other arguments have same meaning as in `create_wheel`.
+
+    """
+    dist_props = _get_props(name=name,
+                            version=version,
+                            description=description,
+                            readme_path=readme_path,
+                            requires_python=requires_python,
+                            license=license,
+                            license_path=license_path,
+                            authors=authors,
+                            maintainers=maintainers,
+                            keywords=keywords,
+                            classifiers=classifiers,
+                            urls=urls,
+                            scripts=scripts,
+                            gui_scripts=gui_scripts,
+                            dependencies=dependencies,
+                            optional_dependencies=optional_dependencies,
+                            conf_path=conf_path,
+                            conf=conf)
+
+    wheel_props = props.get_wheel_props(build_tag=build_tag,
+                                        python_tag=python_tag,
+                                        abi_tag=abi_tag,
+                                        platform_tag=platform_tag,
+                                        is_purelib=is_purelib)
+
+    dist_info_name = common.get_dist_info_name(
+        name=dist_props.metadata.name,
+        version=dist_props.metadata.version)
+    dist_info_path = metadata_dir / dist_info_name
+    dist_info_path.mkdir(parents=True, exist_ok=True)
+
+    if dist_props.license_path:
+        shutil.copyfile(dist_props.license_path,
+                        dist_info_path / dist_props.license_path.name)
+
+    for file_name, data in _get_dist_info_files(dist_props):
+        (dist_info_path / file_name).write_bytes(data)
+
+    data = dist_info.get_WHEEL(wheel_props)
+    (dist_info_path / 'WHEEL').write_text(data, encoding='utf-8')
+
+    return dist_info_name
+
+
+class _Props(typing.NamedTuple):
+    entry_points: common.EntryPointsProps
+    metadata: common.MetadataProps
+    license_path: Path | None
+
+
+class _Previous(typing.NamedTuple):
+    whl: zipfile.ZipFile
+    members: dict[str, list]
+
+
+class _Reused(typing.NamedTuple):
+    whl: zipfile.ZipFile
+    zinfo: zipfile.ZipInfo
+    record: common.WheelRecord
+
+
+def _get_props(name: str | None,
+               version: str | None,
+               description: str | None,
+               readme_path: Path | None,
+               requires_python: str | None,
+               license: str | None,
+               license_path: Path | None,
+               authors: list[tuple[str | None, str | None]] | None,
+               maintainers: list[tuple[str | None, str | None]] | None,
+               keywords: list[str] | None,
+               classifiers: list[str] | None,
+               urls: dict[str, str] | None,
+               scripts: dict[str, str] | None,
+               gui_scripts: dict[str, str] | None,
+               dependencies: list[str] | None,
+               optional_dependencies: dict[str, list[str]] | None,
+               conf_path: Path | None,
+               conf: common.Config | None
+               ) -> _Props:
+    if conf is None and conf_path:
+        conf = config.get_config(conf_path)
+    project = conf.project if conf else None
 
     entry_points_props = props.get_entry_points_props(
         project=project,
@@ -99,129 +902,577 @@ def create_wheel(src_dir: Path,
         dependencies=dependencies,
         optional_dependencies=optional_dependencies)
 
-    wheel_props = props.get_wheel_props(build_tag=build_tag,
-                                        python_tag=python_tag,
-                                        abi_tag=abi_tag,
-                                        platform_tag=platform_tag,
-                                        is_purelib=is_purelib)
+    license_path = props.get_license_path(project=project,
+                                          license_path=license_path)
 
-    if license_path is None and project:
-        license_path_str = project.conf.get('license', {}).get('file')
-        if license_path_str:
-            license_path = project.path / license_path_str
-    if license_path is None:
-        for i in [Path('LICENSE'), Path('LICENSE.txt')]:
-            if i.exists():
-                license_path = i
-                break
-
-    wheel_name = common.get_wheel_name(name=metadata_props.name,
-                                       version=metadata_props.version,
-                                       build_tag=build_tag,
-                                       python_tag=python_tag,
-                                       abi_tag=abi_tag,
-                                       platform_tag=platform_tag)
-    wheel_path = build_dir / wheel_name
-
-    dist_info_name = common.get_dist_info_name(name=metadata_props.name,
-                                               version=metadata_props.version)
-    dist_info_path = Path(dist_info_name)
-
-    data_name = common.get_data_name(name=metadata_props.name,
-                                     version=metadata_props.version)
-    data_path = Path(data_name)
-
-    records = collections.deque()
-    wheel_path.parent.mkdir(parents=True,
-                            exist_ok=True)
-    with zipfile.ZipFile(wheel_path, "w", zipfile.ZIP_DEFLATED) as whl:
-        if editable:
-            data = _get_editable_pth(src_dir)
-            record = _whl_write(whl=whl,
-                                path=Path(f'{metadata_props.name}.pth'),
-                                data=data.encode('utf-8'))
-            records.append(record)
+    return _Props(entry_points=entry_points_props,
+                  metadata=metadata_props,
+                  license_path=license_path)
 
-        else:
-            for src_path in _get_src_paths(src_dir, src_include_patterns,
-                                           src_exclude_patterns):
-                record = _whl_write(whl=whl,
-                                    path=src_path.relative_to(src_dir),
-                                    data=src_path.read_bytes())
-                records.append(record)
 
-            for src_path, dst_path in data_paths:
-                record = _whl_write(
-                    whl=whl,
-                    path=data_path / 'data' / dst_path,
-                    data=src_path.read_bytes())
-                records.append(record)
+def _get_dist_info_files(dist_props: _Props
+                         ) -> typing.Iterable[tuple[str, bytes]]:
+    data = dist_info.get_entry_points_txt(dist_props.entry_points)
+    if data:
+        yield 'entry_points.txt', data.encode('utf-8')
+
+    data = dist_info.get_METADATA(dist_props.metadata)
+    yield 'METADATA', data.encode('utf-8')
+
+
+def _whls_write(whls: list[zipfile.ZipFile],
+                path: Path,
+                data: bytes,
+                date_time: tuple[int, ...] | None,
+                stats: stats_.Stats | None
+                ) -> common.WheelRecord:
+    with stats_.measure(stats, 'hash'):
+        record = common.WheelRecord(path=path,
+                                    sha256=hashlib.sha256(data).digest(),
+                                    size=len(data))
+
+    with stats_.measure(stats, 'write'):
+        for whl in whls:
+            whl.writestr(_create_zinfo(whl=whl,
+                                       path=record.path,
+                                       src_path=None,
+                                       date_time=date_time),
+                         data)
 
-        if license_path:
-            record = _whl_write(whl=whl,
-                                path=dist_info_path / license_path.name,
-                                data=license_path.read_bytes())
-            records.append(record)
-
-        data = dist_info.get_entry_points_txt(entry_points_props)
-        if data:
-            record = _whl_write(whl=whl,
-                                path=dist_info_path / 'entry_points.txt',
-                                data=data.encode('utf-8'))
-            records.append(record)
-
-        data = dist_info.get_METADATA(metadata_props)
-        record = _whl_write(whl=whl,
-                            path=dist_info_path / 'METADATA',
-                            data=data.encode('utf-8'))
-        records.append(record)
-
-        data = dist_info.get_WHEEL(wheel_props)
-        record = _whl_write(whl=whl,
-                            path=dist_info_path / 'WHEEL',
-                            data=data.encode('utf-8'))
-        records.append(record)
-
-        record = common.WheelRecord(path=dist_info_path / 'RECORD',
-                                    sha256=None,
-                                    size=None)
-        records.append(record)
-        data = dist_info.get_RECORD(records)
-        _whl_write(whl=whl,
-                   path=record.path,
-                   data=data.encode('utf-8'))
-
-    return wheel_name
-
-
-def _whl_write(whl: zipfile.ZipFile,
-               path: Path,
-               data: bytes
-               ) -> common.WheelRecord:
-    record = common.WheelRecord(path=path,
-                                sha256=hashlib.sha256(data).digest(),
-                                size=len(data))
-    whl.writestr(str(record.path), data)
     return record
 
 
-def _get_src_paths(src_dir: Path,
-                   src_include_patterns: typing.Iterable[str],
-                   src_exclude_patterns: typing.Iterable[str]
-                   ) -> typing.Iterable[Path]:
-    src_include_paths = set(itertools.chain.from_iterable(
-        src_dir.glob(pattern) for pattern in src_include_patterns))
-    src_exclude_paths = set(itertools.chain.from_iterable(
-        src_dir.glob(pattern) for pattern in src_exclude_patterns))
+def _whl_write_files(whls: list[zipfile.ZipFile],
+                     file_paths: typing.Iterable[tuple[Path, Path]],
+                     compression: common.CompressionPolicy,
+                     large_file_size: int | None,
+                     spool_dir: Path,
+                     date_time: tuple[int, ...] | None,
+                     reusable: dict[str, _Reused],
+                     stats: stats_.Stats | None,
+                     abort: threading.Event | None
+                     ) -> typing.Iterable[common.WheelRecord]:
+    for path, src_path in file_paths:
+        reused = reusable.get(path.as_posix())
+        if reused:
+            yield _whls_copy(whls=whls,
+                             path=path,
+                             reused=reused,
+                             stats=stats)
+
+        else:
+            yield _whl_write_file(whl=whls[0],
+                                  path=path,
+                                  src_path=src_path,
+                                  compression=compression,
+                                  large_file_size=large_file_size,
+                                  spool_dir=spool_dir,
+                                  date_time=date_time,
+                                  stats=stats,
+                                  abort=abort)
+
+
+def _whl_write_file(whl: zipfile.ZipFile,
+                    path: Path,
+                    src_path: Path,
+                    compression: common.CompressionPolicy,
+                    large_file_size: int | None,
+                    spool_dir: Path,
+                    date_time: tuple[int, ...] | None,
+                    stats: stats_.Stats | None,
+                    abort: threading.Event | None
+                    ) -> common.WheelRecord:
+    start = time.perf_counter()
+    zinfo = _create_zinfo(whl=whl,
+                          path=path,
+                          src_path=src_path,
+                          date_time=date_time)
+    member_compression = archive.get_compression(policy=compression,
+                                                 path=path,
+                                                 size=zinfo.file_size)
+    large = (large_file_size is not None and
+             zinfo.file_size > 0 and
+             zinfo.file_size >= large_file_size)
+
+    # large stored files are copied to archive by kernel
+    if (member_compression.min_ratio is not None or
+            (large and
+             member_compression.compress_type == zipfile.ZIP_STORED)):
+        compressed = archive.compress_file(
+            path=src_path,
+            compress_type=member_compression.compress_type,
+            compress_level=member_compression.compress_level,
+            min_ratio=member_compression.min_ratio,
+            spool_dir=spool_dir,
+            stats=stats,
+            large_file_size=large_file_size,
+            abort=abort)
+
+        with compressed.data:
+            with stats_.measure(stats, 'write'):
+                archive.write_compressed(whl=whl,
+                                         zinfo=zinfo,
+                                         compressed=compressed,
+                                         stats=stats)
+
+        if stats:
+            stats.add_file(stats_.FileStats(
+                path=path,
+                size=compressed.size,
+                compress_size=compressed.compress_size,
+                duration=time.perf_counter() - start))
+
+        return common.WheelRecord(path=path,
+                                  sha256=compressed.sha256,
+                                  size=compressed.size)
+
+    zinfo.compress_type = member_compression.compress_type
+    zinfo._compresslevel = member_compression.compress_level
+    force_zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT
+
+    sha256 = hashlib.sha256()
+    size = 0
+
+    # deflate compression is done while writing to archive
+    write_phase = ('compress' if zinfo.compress_type == zipfile.ZIP_DEFLATED
+                   else 'write')
+
+    with open(src_path, 'rb') as src:
+        with whl.open(zinfo, 'w', force_zip64=force_zip64) as dst:
+            for chunk in archive.read_chunks(src,
+                                             mapped=large,
+                                             drop_cache=large,
+                                             stats=stats):
+                common.check_abort(abort)
+
+                with stats_.measure(stats, 'hash'):
+                    sha256.update(chunk)
+
+                with stats_.measure(stats, write_phase):
+                    dst.write(chunk)
+
+                size += len(chunk)
+
+    if stats:
+        stats.add_copied(zinfo.compress_size)
+        stats.add_file(stats_.FileStats(path=path,
+                                        size=size,
+                                        compress_size=zinfo.compress_size,
+                                        duration=time.perf_counter() - start))
+
+    return common.WheelRecord(path=path,
+                              sha256=sha256.digest(),
+                              size=size)
+
+
+def _whls_write_files_compressed(whls: list[zipfile.ZipFile],
+                                 file_paths: typing.Iterable[tuple[Path, Path]],  # NOQA
+                                 jobs: int,
+                                 executor: concurrent.futures.Executor | None,  # NOQA
+                                 compression: common.CompressionPolicy,
+                                 spool_dir: Path,
+                                 compress_file: typing.Callable[..., archive.CompressedData],  # NOQA
+                                 large_file_size: int | None,
+                                 date_time: tuple[int, ...] | None,
+                                 reusable: dict[str, _Reused],
+                                 stats: stats_.Stats | None,
+                                 abort: threading.Event | None
+                                 ) -> typing.Iterable[common.WheelRecord]:
+    file_paths = list(file_paths)
+    file_sizes = [src_path.stat().st_size for _, src_path in file_paths]
+    indexes = [i for i, (path, _) in enumerate(file_paths)
+               if path.as_posix() not in reusable]
 
-    for src_path in src_include_paths:
-        if src_path.is_dir():
+    # largest files are compressed first, so that compression of large
+    # file near the end of write order does not extend build time - their
+    # compressed data is not held in memory while waiting for writing
+    priority_indexes = sorted(
+        (i for i in indexes if file_sizes[i] >= _priority_min_size),
+        key=lambda i: file_sizes[i],
+        reverse=True)[:_priority_max_count]
+    priority_index_set = set(priority_indexes)
+
+    # small files are compressed in batches to reduce per task overhead -
+    # batches are created and submitted in write order, so that only
+    # limited number of compressed batches wait for writing
+    batches = collections.deque()
+    batch = []
+    batch_size = 0
+    for i in indexes:
+        if i in priority_index_set:
             continue
 
-        if src_path in src_exclude_paths:
+        batch.append(i)
+        batch_size += file_sizes[i]
+
+        if batch_size >= _batch_max_size or len(batch) >= _batch_max_count:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+
+    if batch:
+        batches.append(batch)
+
+    def compress(batch, spooled=False):
+        results = []
+
+        try:
+            for i in batch:
+                path, src_path = file_paths[i]
+                member_compression = archive.get_compression(
+                    policy=compression,
+                    path=path,
+                    size=file_sizes[i])
+
+                start = time.perf_counter()
+                compressed = compress_file(
+                    path=src_path,
+                    compress_type=member_compression.compress_type,
+                    compress_level=member_compression.compress_level,
+                    min_ratio=member_compression.min_ratio,
+                    spool_dir=spool_dir,
+                    stats=stats,
+                    large_file_size=large_file_size,
+                    abort=abort)
+                results.append((compressed, time.perf_counter() - start))
+
+                if spooled and isinstance(compressed.data,
+                                          tempfile.SpooledTemporaryFile):
+                    compressed.data.rollover()
+
+        except BaseException:
+            for compressed, _ in results:
+                compressed.data.close()
+            raise
+
+        return results
+
+    with (contextlib.nullcontext(executor) if executor
+          else concurrent.futures.ThreadPoolExecutor(jobs)) as executor:
+        futures = collections.deque()
+        priority_futures = []
+        positions = [None] * len(file_paths)
+        max_futures = 2 * max(jobs, 1)
+
+        for i in priority_indexes:
+            future = executor.submit(compress, [i], True)
+            priority_futures.append(future)
+            positions[i] = future, 0
+
+        def submit():
+            batch = batches.popleft()
+            future = executor.submit(compress, batch)
+            futures.append(future)
+
+            for position, i in enumerate(batch):
+                positions[i] = future, position
+
+        try:
+            for i, (path, src_path) in enumerate(file_paths):
+                if path.as_posix() in reusable:
+                    reused = reusable[path.as_posix()]
+                    yield _whls_copy(whls=whls,
+                                     path=path,
+                                     reused=reused,
+                                     stats=stats)
+                    continue
+
+                if i not in priority_index_set:
+                    # batches preceding batch of current file are written
+                    while futures and (positions[i] is None or
+                                       futures[0] is not positions[i][0]):
+                        futures.popleft()
+
+                    while batches and (positions[i] is None or
+                                       len(futures) < max_futures):
+                        submit()
+
+                future, position = positions[i]
+                compressed, duration = future.result()[position]
+
+                with compressed.data:
+                    zinfo = _create_zinfo(whl=whls[0],
+                                          path=path,
+                                          src_path=src_path,
+                                          date_time=date_time)
+
+                    with stats_.measure(stats, 'write'):
+                        for whl in whls:
+                            compressed.data.seek(0)
+                            archive.write_compressed(whl=whl,
+                                                     zinfo=copy.copy(zinfo),
+                                                     compressed=compressed,
+                                                     stats=stats)
+
+                if stats:
+                    stats.add_file(stats_.FileStats(
+                        path=path,
+                        size=compressed.size,
+                        compress_size=compressed.compress_size,
+                        duration=duration))
+
+                yield common.WheelRecord(path=path,
+                                         sha256=compressed.sha256,
+                                         size=compressed.size)
+
+        finally:
+            # closing already written data has no effect
+            for future in [*priority_futures, *futures]:
+                if not future.cancel() and not future.exception():
+                    for compressed, _ in future.result():
+                        compressed.data.close()
+
+
+class _StreamWriter:
+
+    def __init__(self, f: typing.BinaryIO):
+        self._f = f
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+
+        # seekable and readable streams are written same as files, with
+        # offsets relative to initial position, and digest is computed by
+        # reading written data back
+        try:
+            self._seekable = f.seekable() and f.readable()
+
+        except AttributeError:
+            self._seekable = False
+
+        self._start = f.tell() if self._seekable else 0
+
+    @property
+    def sha256(self) -> bytes:
+        if not self._seekable:
+            return self._sha256.digest()
+
+        end = self._f.tell()
+        sha256 = hashlib.sha256()
+        self._f.seek(self._start)
+
+        try:
+            while (size := end - self._f.tell()) > 0:
+                data = self._f.read(min(size, 1024 * 1024))
+                if not data:
+                    break
+
+                sha256.update(data)
+
+        finally:
+            self._f.seek(end)
+
+        return sha256.digest()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def write(self, data: bytes) -> int:
+        self._f.write(data)
+
+        if self._seekable:
+            self._size = max(self._size, self.tell())
+
+        else:
+            self._sha256.update(data)
+            self._size += len(data)
+
+        return len(data)
+
+    def tell(self) -> int:
+        if not self._seekable:
+            return self._size
+
+        return self._f.tell() - self._start
+
+    # zipfile writes data descriptors instead of updating local headers if
+    # stream is not seekable
+    def seekable(self) -> bool:
+        return self._seekable
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if not self._seekable:
+            raise io.UnsupportedOperation('seek')
+
+        if whence == io.SEEK_SET:
+            offset += self._start
+
+        return self._f.seek(offset, whence) - self._start
+
+    def flush(self):
+        self._f.flush()
+
+
+def _open_previous(wheel_path: Path,
+                   index_path: Path,
+                   index_params: str
+                   ) -> _Previous | None:
+    try:
+        index = json.loads(index_path.read_text('utf-8'))
+
+    except (FileNotFoundError, ValueError):
+        return
+
+    if index.get('params') != index_params:
+        return
+
+    # new wheel is written to temporary file, so previous wheel remains in
+    # place until it is replaced
+    try:
+        whl = zipfile.ZipFile(wheel_path)
+
+    except (OSError, zipfile.BadZipFile):
+        return
+
+    return _Previous(whl=whl,
+                     members=index.get('members', {}))
+
+
+def _get_build_key(params: str,
+                   src_paths: typing.Iterable[Path]
+                   ) -> str:
+    data = [params]
+
+    for src_path in src_paths:
+        st = src_path.stat()
+        data.append([str(src_path), st.st_size, st.st_mtime_ns, st.st_ino,
+                     st.st_mode])
+
+    return hashlib.sha256(json.dumps(data).encode('utf-8')).hexdigest()
+
+
+def _get_wheel_key(wheel_path: Path) -> list[int]:
+    st = wheel_path.stat()
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _is_built(build_dir: Path,
+              lock_files: dict[str, typing.BinaryIO],
+              build_key: str
+              ) -> bool:
+    for wheel_name, f in lock_files.items():
+        f.seek(0)
+        try:
+            stamp = json.loads(f.read() or b'{}')
+            if stamp['key'] != build_key:
+                return False
+
+            # wheel could be replaced by build which did not use lock
+            if stamp['wheel'] != _get_wheel_key(build_dir / wheel_name):
+                return False
+
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    return True
+
+
+def _write_build_stamps(build_dir: Path,
+                        lock_files: dict[str, typing.BinaryIO],
+                        build_key: str):
+    for wheel_name, f in lock_files.items():
+        stamp = {'key': build_key,
+                 'wheel': _get_wheel_key(build_dir / wheel_name)}
+
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(stamp).encode('utf-8'))
+        f.flush()
+
+
+def _get_reusable(previous: _Previous | None,
+                  file_paths: typing.Iterable[tuple[Path, Path]],
+                  index: dict[str, list]
+                  ) -> dict[str, _Reused]:
+    reusable = {}
+
+    for path, src_path in file_paths:
+        name = path.as_posix()
+        st = src_path.stat()
+        key = [st.st_size, st.st_mtime_ns, st.st_ino, st.st_mode]
+        index[name] = key
+
+        # previous member is stored as key followed by sha256 hex digest
+        member = previous.members.get(name) if previous else None
+        if not member or member[:-1] != key:
             continue
 
-        yield src_path
+        try:
+            zinfo = previous.whl.getinfo(name)
+
+        except KeyError:
+            continue
+
+        if zinfo.file_size != st.st_size:
+            continue
+
+        record = common.WheelRecord(path=path,
+                                    sha256=bytes.fromhex(member[-1]),
+                                    size=st.st_size)
+        reusable[name] = _Reused(whl=previous.whl,
+                                 zinfo=zinfo,
+                                 record=record)
+
+    return reusable
+
+
+def _whls_copy(whls: list[zipfile.ZipFile],
+               path: Path,
+               reused: _Reused,
+               stats: stats_.Stats | None
+               ) -> common.WheelRecord:
+    start = time.perf_counter()
+
+    with stats_.measure(stats, 'copy'):
+        for whl in whls:
+            archive.copy_member(src_whl=reused.whl,
+                                zinfo=reused.zinfo,
+                                dst_whl=whl,
+                                stats=stats)
+
+    if stats:
+        stats.add_file(stats_.FileStats(path=path,
+                                        size=reused.zinfo.file_size,
+                                        compress_size=reused.zinfo.compress_size,  # NOQA
+                                        duration=time.perf_counter() - start))
+
+    return reused.record
+
+
+def _get_reproducible_date_time() -> tuple[int, ...]:
+    epoch = common.get_source_date_epoch()
+
+    # zip format does not support timestamps prior to 1980
+    min_epoch = 315532800
+    epoch = max(epoch, min_epoch) if epoch is not None else min_epoch
+
+    return time.gmtime(epoch)[:6]
+
+
+def _create_zinfo(whl: zipfile.ZipFile,
+                  path: Path,
+                  src_path: Path | None,
+                  date_time: tuple[int, ...] | None
+                  ) -> zipfile.ZipInfo:
+    if src_path:
+        zinfo = zipfile.ZipInfo.from_file(src_path, str(path),
+                                          strict_timestamps=False)
+
+    else:
+        # same as default `ZipFile.writestr` member
+        zinfo = zipfile.ZipInfo(str(path), time.localtime()[:6])
+        zinfo.external_attr = 0o600 << 16
+        zinfo.compress_type = whl.compression
+        zinfo._compresslevel = whl.compresslevel
+
+    if date_time is not None:
+        executable = (zinfo.external_attr >> 16) & 0o111
+        zinfo.date_time = date_time
+        zinfo.create_system = 3
+        zinfo.external_attr = (stat.S_IFREG |
+                               (0o755 if executable else 0o644)) << 16
+
+    return zinfo
 
 
 def _get_editable_pth(src_dir: Path) -> str:
@@ -230,3 +1481,38 @@ def _get_editable_pth(src_dir: Path) -> str:
     return (f"import sys; "
             f"sys.path = [{src_dir_repr}, "
             f"*(i for i in sys.path if i != {src_dir_repr})]\n")
+
+
+def _get_editable_finder_locations(src_dir: Path,
+                                   include_patterns: typing.Iterable[str],
+                                   exclude_patterns: typing.Iterable[str]
+                                   ) -> dict[str, str]:
+    suffixes = importlib.machinery.all_suffixes()
+    src_dir = src_dir.resolve()
+    locations = {}
+
+    for path in scan.get_paths(src_dir, include_patterns, exclude_patterns):
+        if not any(path.name.endswith(suffix) for suffix in suffixes):
+            continue
+
+        parts = path.relative_to(src_dir).parts
+        if len(parts) > 1:
+            name = parts[0]
+            location = src_dir / name
+
+        else:
+            name = path.name.split('.', 1)[0]
+            location = path
+
+        if name.isidentifier() and name not in locations:
+            locations[name] = str(location)
+
+    return dict(sorted(locations.items()))
+
+
+def _get_editable_finder_name(name: str) -> str:
+    return f"_mkwhl_editable_{common.normalize_name(name).replace('-', '_')}"
+
+
+def _get_editable_finder(locations: dict[str, str]) -> str:
+    return _editable_finder_template.replace('{locations}', repr(locations))